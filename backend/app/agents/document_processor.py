@@ -9,17 +9,18 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
-import cv2
-import numpy as np
-from PIL import Image
-import pytesseract
-import pdfplumber
-import pandas as pd
-from openai import AsyncOpenAI
-
 from app.core.config import settings
+from app.core.metrics import stage
 from app.schemas.expense import ExpenseCreate
+from app.services.openai_gateway import openai_gateway
 from app.utils.file_processing import FileProcessor
+from app.utils.lazy_import import lazy_import
+
+# Carregadas só quando o primeiro documento do formato é processado
+cv2 = lazy_import("cv2")
+pytesseract = lazy_import("pytesseract")
+pdfplumber = lazy_import("pdfplumber")
+pd = lazy_import("pandas")
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,7 @@ class DocumentProcessorAgent:
     """Agente para processamento de documentos financeiros"""
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.openai_client = openai_gateway.client
         self.file_processor = FileProcessor()
     
     async def process_document(self, file_path: str, user_id: str) -> Dict[str, Any]:
@@ -71,6 +72,7 @@ class DocumentProcessorAgent:
             logger.error(f"Erro ao processar documento: {str(e)}")
             raise
     
+    @stage("parse")
     async def _process_pdf(self, file_path: str) -> Dict[str, Any]:
         """Processar arquivo PDF"""
         try:
@@ -98,6 +100,7 @@ class DocumentProcessorAgent:
             logger.error(f"Erro ao processar PDF: {str(e)}")
             raise
     
+    @stage("parse")
     async def _process_excel(self, file_path: str) -> Dict[str, Any]:
         """Processar arquivo Excel"""
         try:
@@ -122,6 +125,7 @@ class DocumentProcessorAgent:
             logger.error(f"Erro ao processar Excel: {str(e)}")
             raise
     
+    @stage("parse")
     async def _process_csv(self, file_path: str) -> Dict[str, Any]:
         """Processar arquivo CSV"""
         try:
@@ -148,6 +152,7 @@ class DocumentProcessorAgent:
             logger.error(f"Erro ao processar CSV: {str(e)}")
             raise
     
+    @stage("ocr")
     async def _process_image(self, file_path: str) -> Dict[str, Any]:
         """Processar imagem usando OCR"""
         try:
@@ -184,7 +189,8 @@ class DocumentProcessorAgent:
             # Criar prompt para OpenAI
             prompt = self._create_extraction_prompt(raw_data)
             
-            response = await self.openai_client.chat.completions.create(
+            response = await openai_gateway.chat(
+                "document_processor", self.openai_client,
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {
@@ -217,7 +223,8 @@ class DocumentProcessorAgent:
             
             # Processar resposta
             ai_response = response.choices[0].message.content
-            processed_data = eval(ai_response)  # Converter JSON string para dict
+            with stage("validation"):
+                processed_data = eval(ai_response)  # Converter JSON string para dict
             
             return processed_data
             
@@ -10,21 +10,58 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import re
 
-from openai import AsyncOpenAI
-
 from app.core.config import settings, BRAZILIAN_EXPENSE_CATEGORIES
+from app.core.metrics import stage
 from app.schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseCategory
+from app.services.merchant_index import MerchantIndex
+from app.services.micro_batcher import MicroBatcher
+from app.services.openai_gateway import openai_gateway
 
 logger = logging.getLogger(__name__)
 
+# Exemplos do prompt de sistema (descrição, categoria, subcategoria)
+PROMPT_EXAMPLES = [
+    ("Pão de Açúcar", "alimentacao", "supermercado"),
+    ("Uber", "transporte", "uber"),
+    ("Posto Ipiranga", "transporte", "combustivel"),
+    ("Farmácia Droga Raia", "saude", "farmacia"),
+    ("Cinema Cinemark", "lazer", "cinema"),
+]
+
+def build_category_codes(categories: Dict[str, Any]) -> Dict[int, Tuple[str, str]]:
+    """Código numérico de cada par (categoria, subcategoria), na ordem da configuração"""
+    
+    codes = {}
+    for category, info in categories.items():
+        for subcategory in info["subcategories"]:
+            codes[len(codes) + 1] = (category, subcategory)
+    return codes
+
 class ExpenseCategorizerAgent:
     """Agente para categorização automática de despesas"""
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.openai_client = openai_gateway.client
         self.categories = BRAZILIAN_EXPENSE_CATEGORIES
         self.learning_cache = {}  # Cache para aprendizado
+        self.merchant_index = MerchantIndex()  # Estabelecimentos conhecidos e aprendidos
+        
+        # Prompt e schema montados uma única vez: o modelo responde só com
+        # códigos numéricos de subcategoria (saída estruturada)
+        self.category_codes = build_category_codes(self.categories)
+        self.code_by_category = {pair: code for code, pair in self.category_codes.items()}
+        self.system_prompt = self._build_system_prompt()
+        self.response_format = self._build_response_format()
+        
+        # Categorizações individuais de todos os usuários agrupadas em lotes
+        self.batcher: MicroBatcher[Tuple[ExpenseCreate, str], Dict[str, Any]] = MicroBatcher(
+            "expense_categorizer",
+            self._categorize_items_with_ai,
+            batch_size=settings.CATEGORIZATION_BATCH_SIZE,
+            batch_window_ms=settings.CATEGORIZATION_BATCH_WINDOW_MS
+        )
     
+    @stage("categorize")
     async def categorize_single(self, expense: ExpenseCreate, user_id: str) -> ExpenseResponse:
         """
         Categorizar uma única despesa
@@ -68,6 +105,7 @@ class ExpenseCategorizerAgent:
             logger.error(f"Erro ao categorizar despesa: {str(e)}")
             raise
     
+    @stage("categorize")
     async def categorize_batch(self, expenses: List[ExpenseCreate], user_id: str) -> List[ExpenseResponse]:
         """
         Categorizar múltiplas despesas em lote
@@ -110,33 +148,13 @@ class ExpenseCategorizerAgent:
             return cached_result
         
         try:
-            # Criar prompt para categorização
-            prompt = self._create_categorization_prompt(expense, user_id)
-            
-            response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,  # Baixa criatividade para consistência
-                response_format={"type": "json_object"}
-            )
-            
-            # Processar resposta
-            ai_response = json.loads(response.choices[0].message.content)
-            
-            # Validar e normalizar resposta
-            categorization = self._validate_ai_response(ai_response)
-            
-            return categorization
+            # Com micro-batching, a despesa entra no próximo lote (de
+            # qualquer usuário) em vez de gerar uma chamada própria
+            if settings.CATEGORIZATION_BATCHING:
+                return await self.batcher.submit((expense, user_id))
             
+            return (await self._categorize_items_with_ai([(expense, user_id)]))[0]
+        
         except Exception as e:
             logger.error(f"Erro na categorização AI: {str(e)}")
             # Fallback para categorização básica
@@ -146,37 +164,17 @@ class ExpenseCategorizerAgent:
         """Categorizar lote de despesas usando OpenAI"""
         
         try:
-            # Criar prompt para lote
-            prompt = self._create_batch_prompt(expenses, user_id)
-            
-            response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_batch_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-            
-            # Processar resposta
-            ai_response = json.loads(response.choices[0].message.content)
+            # Estabelecimentos já conhecidos não vão para a LLM
+            categorizations = [self._check_cache(user_id, expense.description) for expense in expenses]
+            misses = [i for i, categorization in enumerate(categorizations) if categorization is None]
+            if misses:
+                resolved = await self._categorize_items_with_ai([(expenses[i], user_id) for i in misses])
+                for i, categorization in zip(misses, resolved):
+                    categorizations[i] = categorization
             
             # Criar objetos de resposta
             results = []
-            for i, expense in enumerate(expenses):
-                categorization = ai_response.get("categorizations", [{}])[i] if i < len(ai_response.get("categorizations", [])) else {}
-                
-                # Validar categorização
-                validated_cat = self._validate_ai_response(categorization)
-                
-                # Criar response
+            for expense, validated_cat in zip(expenses, categorizations):
                 response_obj = ExpenseResponse(
                     id=0,
                     user_id=user_id,
@@ -207,101 +205,136 @@ class ExpenseCategorizerAgent:
             # Fallback para categorização individual
             return [await self.categorize_single(expense, user_id) for expense in expenses]
     
-    def _get_system_prompt(self) -> str:
-        """Obter prompt do sistema para categorização"""
-        
-        categories_text = ""
-        for key, category in self.categories.items():
-            categories_text += f"- {key}: {category['name']} {category['icon']}\n"
-            categories_text += f"  Subcategorias: {', '.join(category['subcategories'])}\n"
-        
-        return f"""
-        Você é um assistente financeiro brasileiro especializado em categorizar despesas pessoais.
-        
-        CATEGORIAS DISPONÍVEIS:
-        {categories_text}
-        
-        INSTRUÇÕES:
-        1. Analise a descrição da despesa
-        2. Identifique padrões de estabelecimentos brasileiros
-        3. Classifique na categoria mais apropriada
-        4. Sugira uma subcategoria específica
-        5. Avalie sua confiança (0-1)
-        6. Explique brevemente seu raciocínio
-        
-        FORMATO DE RESPOSTA (JSON):
-        {{
-            "category": "categoria_principal",
-            "subcategory": "subcategoria_especifica",
-            "confidence": 0.95,
-            "suggested_category": "categoria_sugerida",
-            "reasoning": "explicação_breve"
-        }}
-        
-        EXEMPLOS BRASILEIROS:
-        - "Pão de Açúcar" → alimentacao/supermercado
-        - "Uber" → transporte/uber
-        - "Posto Ipiranga" → transporte/combustivel
-        - "Farmácia Droga Raia" → saude/farmacia
-        - "Cinema Cinemark" → lazer/cinema
+    async def _categorize_items_with_ai(self, items: List[Tuple[ExpenseCreate, str]]) -> List[Dict[str, Any]]:
         """
-    
-    def _get_batch_system_prompt(self) -> str:
-        """Prompt para categorização em lote"""
-        return self._get_system_prompt() + """
+        Categorizar (despesa, usuário) em uma única chamada OpenAI
         
-        FORMATO PARA LOTE:
-        {
-            "categorizations": [
-                {
-                    "category": "categoria1",
-                    "subcategory": "sub1",
-                    "confidence": 0.9,
-                    "suggested_category": "sugestao1",
-                    "reasoning": "explicacao1"
-                },
-                ...
-            ]
-        }
+        Usado pelo lote de um usuário e pelo micro-batcher, que mistura
+        despesas de vários usuários; o histórico só entra no prompt quando
+        todas as despesas são do mesmo usuário. Erros são propagados.
         """
-    
-    def _create_categorization_prompt(self, expense: ExpenseCreate, user_id: str) -> str:
-        """Criar prompt para categorização individual"""
         
-        user_history = self._get_user_history(user_id)
+        expenses = [expense for expense, _ in items]
+        user_ids = {user_id for _, user_id in items}
+        prompt = self._create_batch_prompt(expenses, user_ids.pop() if len(user_ids) == 1 else None)
         
-        return f"""
-        Categorize a seguinte despesa:
-        
-        Data: {expense.date}
-        Descrição: "{expense.description}"
-        Valor: R$ {expense.amount}
-        Tipo: {expense.type}
+        response = await openai_gateway.chat(
+            "expense_categorizer", self.openai_client,
+            model=settings.OPENAI_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": self.system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.1,
+            response_format=self.response_format
+        )
+        
+        # Processar resposta: {"items": [{"n": 1, "c": 12, "p": 0.9}, ...]}
+        ai_response = json.loads(response.choices[0].message.content)
+        coded = {}
+        for item in ai_response.get("items", []):
+            if isinstance(item, dict) and isinstance(item.get("n"), int):
+                coded[item["n"]] = item
+        
+        # Validar categorização (itens ausentes ou códigos inválidos recebem os valores padrão)
+        return [self._validate_ai_response(self._decode_item(coded.get(i + 1))) for i in range(len(expenses))]
+    
+    def _decode_item(self, item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Converter item codificado da resposta no formato de _validate_ai_response"""
         
-        {user_history}
+        if not item or item.get("c") not in self.category_codes:
+            return {}
         
-        Retorne apenas um JSON válido com a categorização.
-        """
+        category, subcategory = self.category_codes[item["c"]]
+        return {
+            "category": category,
+            "subcategory": subcategory,
+            "confidence": item.get("p", 0.5),
+            "suggested_category": category,
+            "reasoning": f"Classificado pela IA como {self.categories[category]['name']} / {subcategory}"
+        }
     
-    def _create_batch_prompt(self, expenses: List[ExpenseCreate], user_id: str) -> str:
-        """Criar prompt para lote de despesas"""
-        
-        user_history = self._get_user_history(user_id)
-        expenses_text = ""
+    def _build_system_prompt(self) -> str:
+        """Prompt de sistema compacto: lista de códigos, formato de entrada e exemplos"""
         
-        for i, expense in enumerate(expenses):
-            expenses_text += f"{i+1}. {expense.date} - \"{expense.description}\" - R$ {expense.amount}\n"
+        codes_text = "\n".join(
+            f"{key}: " + ", ".join(
+                f"{self.code_by_category[(key, subcategory)]} {subcategory}"
+                for subcategory in category["subcategories"]
+            )
+            for key, category in self.categories.items()
+        )
+        examples_text = "; ".join(
+            f"{description}={self.code_by_category[(category, subcategory)]}"
+            for description, category, subcategory in PROMPT_EXAMPLES
+        )
+        
+        return (
+            "Categorize despesas pessoais brasileiras pelo código da subcategoria.\n"
+            f"Códigos:\n{codes_text}\n"
+            "Entrada: uma despesa por linha no formato n|descrição|valor em R$. "
+            "Histórico, se houver: categorizações anteriores do usuário (descrição=código).\n"
+            "Para cada linha responda n, c (código) e p (confiança 0-1).\n"
+            f"Exemplos: {examples_text}"
+        )
+    
+    def _build_response_format(self) -> Dict[str, Any]:
+        """JSON schema estrito da resposta (structured outputs)"""
         
-        return f"""
-        Categorize as seguintes despesas:
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "categorizacoes",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "items": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "n": {"type": "integer"},
+                                    "c": {"type": "integer", "minimum": 1, "maximum": len(self.category_codes)},
+                                    "p": {"type": "number"}
+                                },
+                                "required": ["n", "c", "p"],
+                                "additionalProperties": False
+                            }
+                        }
+                    },
+                    "required": ["items"],
+                    "additionalProperties": False
+                }
+            }
+        }
+    
+    def _create_batch_prompt(self, expenses: List[ExpenseCreate], user_id: Optional[str]) -> str:
+        """Criar prompt para lote de despesas (sem histórico se user_id for None)"""
         
-        {expenses_text}
+        lines = [
+            f"{i + 1}|{self._prompt_text(expense.description)}|{expense.amount}"
+            for i, expense in enumerate(expenses)
+        ]
         
-        {user_history}
+        user_history = self._get_user_history(user_id) if user_id is not None else ""
+        if user_history:
+            lines.append(user_history)
         
-        Retorne um JSON com array de categorizações na mesma ordem.
-        """
+        return "\n".join(lines)
     
+    @staticmethod
+    def _prompt_text(description: str) -> str:
+        """Descrição em uma linha, sem o separador de campos"""
+        return " ".join(description.replace("|", "/").split())
+    
+    @stage("validation")
     def _validate_ai_response(self, ai_response: Dict[str, Any]) -> Dict[str, Any]:
         """Validar e normalizar resposta da IA"""
         
@@ -391,6 +424,11 @@ class ExpenseCategorizerAgent:
         if description in user_cache:
             return user_cache[description]
         
+        # Estabelecimento normalizado: histórico do usuário e catálogo,
+        # por chave exata, prefixo ou vizinho aproximado
+        if settings.MERCHANT_INDEX_ENABLED:
+            return self.merchant_index.lookup(user_id, description)
+        
         # Buscar por similaridade (implementação simples)
         for cached_desc, categorization in user_cache.items():
             if self._calculate_similarity(description, cached_desc) > 0.8:
@@ -405,12 +443,14 @@ class ExpenseCategorizerAgent:
             self.learning_cache[user_id] = {}
         
         self.learning_cache[user_id][description] = categorization
+        self.merchant_index.learn(user_id, description, categorization)
         
         # Limitar tamanho do cache
         if len(self.learning_cache[user_id]) > 1000:
             # Remove entradas mais antigas
             items = list(self.learning_cache[user_id].items())
             self.learning_cache[user_id] = dict(items[-500:])
+            self.merchant_index.rebuild(user_id, items[-500:])
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Calcular similaridade entre textos (implementação simples)"""
@@ -441,11 +481,13 @@ class ExpenseCategorizerAgent:
         # Pegar exemplos recentes
         recent_examples = list(user_cache.items())[-5:]
         
-        history_text = "EXEMPLOS ANTERIORES DO USUÁRIO:\n"
+        examples = []
         for description, categorization in recent_examples:
-            history_text += f"- \"{description}\" → {categorization['category']}/{categorization['subcategory']}\n"
+            code = self.code_by_category.get((categorization["category"], categorization["subcategory"]))
+            if code is not None:
+                examples.append(f"{self._prompt_text(description)}={code}")
         
-        return history_text
+        return f"Histórico: {'; '.join(examples)}" if examples else ""
     
     def get_brazilian_categories(self) -> Dict[str, Any]:
         """Obter categorias brasileiras"""
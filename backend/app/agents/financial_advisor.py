@@ -6,16 +6,20 @@ Responsável por gerar insights, relatórios e recomendações financeiras
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from statistics import mean, median
 
-from openai import AsyncOpenAI
+from sqlalchemy import select
 
 from app.core.config import settings
 from app.schemas.expense import ExpenseResponse, ExpenseStats
 from app.schemas.fire import FireCalculationRequest
+from app.services.database import db_service
+from app.services.expense_rollup import RollupSummary, expense_rollup_service
+from app.services.openai_gateway import openai_gateway
+from app.utils.expense_frame import ExpenseFrame
+from app.utils.money import cents_to_float, divide_cents
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +27,7 @@ class FinancialAdvisorAgent:
     """Agente consultor financeiro para insights e recomendações"""
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.openai_client = openai_gateway.client
     
     async def generate_dashboard(self, user_id: str) -> Dict[str, Any]:
         """
@@ -36,14 +40,27 @@ class FinancialAdvisorAgent:
             Dados do dashboard
         """
         try:
-            # TODO: Integrar com banco de dados real
-            # Por enquanto, dados simulados
-            mock_expenses = self._get_mock_expenses(user_id)
+            # Métricas principais a partir do rollup mensal (O(categorias))
+            current_month = date.today().replace(day=1)
+            previous_month = (current_month - timedelta(days=1)).replace(day=1)
+            rollup = await self._get_rollup_summary(
+                user_id, previous_month.strftime("%Y-%m"), current_month.strftime("%Y-%m")
+            )
             
-            # Calcular métricas principais
-            current_month_expenses = self._calculate_current_month_expenses(mock_expenses)
-            expense_trend = self._calculate_expense_trend(mock_expenses)
-            category_breakdown = self._calculate_category_breakdown(mock_expenses)
+            if rollup is not None:
+                current = rollup.for_month(current_month.strftime("%Y-%m"))
+                previous = rollup.for_month(previous_month.strftime("%Y-%m"))
+                
+                current_month_expenses = current.current_month_expenses()
+                expense_trend = self._calculate_trend_from_rollup(current, previous)
+                category_breakdown = current.category_breakdown()
+            else:
+                # Sem dados reais: usar dados simulados
+                frame = ExpenseFrame.from_records(self._get_mock_expenses(user_id))
+                
+                current_month_expenses = self._calculate_current_month_expenses(frame)
+                expense_trend = self._calculate_expense_trend(frame)
+                category_breakdown = self._calculate_category_breakdown(frame)
             
             # Métricas FIRE
             fire_metrics = self._calculate_fire_metrics(user_id, current_month_expenses)
@@ -83,18 +100,28 @@ class FinancialAdvisorAgent:
             Insights detalhados
         """
         try:
-            # Obter dados do usuário
-            mock_expenses = self._get_mock_expenses(user_id)
-            expense_stats = self._calculate_comprehensive_stats(mock_expenses)
+            # Obter dados do usuário na janela de análise (colunar, montado uma vez por requisição)
+            start_date, end_date = self._analysis_window()
+            frame = await self._get_expense_frame(user_id, start_date, end_date)
+            rollup = await self._get_rollup_summary(
+                user_id, start_date.strftime("%Y-%m"), end_date.strftime("%Y-%m")
+            )
+            
+            if rollup is not None:
+                expense_stats = rollup.comprehensive_stats()
+                if len(frame):
+                    expense_stats["median"] = cents_to_float(frame.stats_cents()["median"])
+            else:
+                expense_stats = self._calculate_comprehensive_stats(frame)
             
             # Gerar insights com IA
             ai_insights = await self._generate_ai_insights(expense_stats, user_id)
             
             # Análise de padrões
-            pattern_analysis = self._analyze_spending_patterns(mock_expenses)
+            pattern_analysis = self._analyze_spending_patterns(frame)
             
             # Oportunidades de economia
-            savings_opportunities = self._identify_savings_opportunities(mock_expenses)
+            savings_opportunities = self._identify_savings_opportunities(frame)
             
             # Recomendações de investimento
             investment_recommendations = await self._generate_investment_recommendations(
@@ -134,11 +161,22 @@ class FinancialAdvisorAgent:
             else:
                 report_date = datetime.now().replace(day=1)
             
-            # Obter dados do mês
-            mock_expenses = self._get_mock_expenses_for_month(user_id, report_date)
-            
-            # Calcular métricas do mês
-            monthly_stats = self._calculate_monthly_stats(mock_expenses, report_date)
+            # Obter dados dos últimos 12 meses até o fim do mês do relatório
+            month_start = report_date.date()
+            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            history_start = (month_start - timedelta(days=335)).replace(day=1)
+            history = await self._get_expense_frame(user_id, history_start, month_end, report_date)
+            month_frame = history.between(month_start, month_end)
+            report_month = report_date.strftime("%Y-%m")
+            rollup = await self._get_rollup_summary(user_id, report_month, report_month)
+            
+            # Calcular métricas do mês (mediana a partir das despesas do mês)
+            if rollup is not None:
+                monthly_stats = rollup.comprehensive_stats()
+                if len(month_frame):
+                    monthly_stats["median"] = cents_to_float(month_frame.stats_cents()["median"])
+            else:
+                monthly_stats = self._calculate_monthly_stats(month_frame, report_date)
             
             # Comparar com mês anterior
             comparison = self._compare_with_previous_month(user_id, report_date)
@@ -152,7 +190,7 @@ class FinancialAdvisorAgent:
             monthly_goals = self._evaluate_monthly_goals(monthly_stats, user_id)
             
             # Projeções para próximo mês
-            next_month_projections = self._project_next_month(mock_expenses, monthly_stats)
+            next_month_projections = self._project_next_month(history, monthly_stats)
             
             report = {
                 "period": {
@@ -174,6 +212,68 @@ class FinancialAdvisorAgent:
             logger.error(f"Erro ao gerar relatório mensal: {str(e)}")
             raise
     
+    def _analysis_window(self, today: Optional[date] = None) -> Tuple[date, date]:
+        """Primeiro e último dia da janela de análise (ADVISOR_ANALYSIS_MONTHS meses até o atual)"""
+        
+        today = today or date.today()
+        months_back = max(settings.ADVISOR_ANALYSIS_MONTHS, 1) - 1
+        year, month_index = divmod(today.year * 12 + today.month - 1 - months_back, 12)
+        
+        start_date = date(year, month_index + 1, 1)
+        end_date = (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return start_date, end_date
+    
+    async def _get_rollup_summary(self, user_id: str, start_month: Optional[str] = None,
+                                  end_month: Optional[str] = None) -> Optional[RollupSummary]:
+        """Obter rollup mensal do usuário (None quando não há dados reais)"""
+        
+        if db_service.engine is None:
+            return None
+        
+        try:
+            async with await db_service.get_session() as session:
+                summary = await expense_rollup_service.get_summary(
+                    session, user_id, start_month, end_month
+                )
+        except Exception as e:
+            logger.error(f"Erro ao ler rollup de despesas: {str(e)}")
+            return None
+        
+        return summary if summary.cells else None
+    
+    async def _get_expense_frame(self, user_id: str, start_date: Optional[date] = None,
+                                 end_date: Optional[date] = None,
+                                 mock_month: Optional[datetime] = None) -> ExpenseFrame:
+        """Carregar despesas do usuário em formato colunar
+        
+        Lê apenas as colunas usadas nas análises; sem dados reais, usa os
+        dados simulados.
+        """
+        
+        if db_service.engine is not None:
+            from app.models.expense import Expense
+            
+            query = select(
+                Expense.date, Expense.amount, Expense.category,
+                Expense.subcategory, Expense.payment_method
+            ).where(Expense.user_id == user_id, Expense.type == "expense")
+            if start_date:
+                query = query.where(Expense.date >= start_date)
+            if end_date:
+                query = query.where(Expense.date <= end_date)
+            
+            try:
+                async with await db_service.get_session() as session:
+                    rows = (await session.execute(query)).all()
+                if rows:
+                    return ExpenseFrame.from_columns(*zip(*rows))
+            except Exception as e:
+                logger.error(f"Erro ao carregar despesas: {str(e)}")
+        
+        if mock_month is not None:
+            return ExpenseFrame.from_records(self._get_mock_expenses_for_month(user_id, mock_month))
+        return ExpenseFrame.from_records(self._get_mock_expenses(user_id))
+    
     def _get_mock_expenses(self, user_id: str) -> List[Dict[str, Any]]:
         """Gerar dados mock de despesas para desenvolvimento"""
         
@@ -224,11 +324,11 @@ class FinancialAdvisorAgent:
         # Simular dados do mês
         return self._get_mock_expenses(user_id)
     
-    def _calculate_current_month_expenses(self, expenses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_current_month_expenses(self, frame: ExpenseFrame) -> Dict[str, Any]:
         """Calcular gastos do mês atual"""
         
-        total = sum(expense["amount"] for expense in expenses)
-        count = len(expenses)
+        count = len(frame)
+        total = cents_to_float(frame.total_cents)
         average = total / count if count > 0 else 0
         
         return {
@@ -238,7 +338,7 @@ class FinancialAdvisorAgent:
             "currency": "BRL"
         }
     
-    def _calculate_expense_trend(self, expenses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_expense_trend(self, frame: ExpenseFrame) -> Dict[str, Any]:
         """Calcular tendência de gastos"""
         
         # Simulação de tendência
@@ -248,24 +348,49 @@ class FinancialAdvisorAgent:
             "description": "Gastos aumentaram 5.2% em relação ao mês anterior"
         }
     
-    def _calculate_category_breakdown(self, expenses: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calcular breakdown por categoria"""
+    def _calculate_trend_from_rollup(self, current: RollupSummary, previous: RollupSummary) -> Dict[str, Any]:
+        """Calcular tendência comparando totais mensais do rollup"""
         
-        category_totals = {}
-        total_amount = sum(expense["amount"] for expense in expenses)
+        current_total = current.expense_total_cents
+        previous_total = previous.expense_total_cents
+        
+        if previous_total == 0:
+            return {
+                "direction": "stable",
+                "percentage": 0.0,
+                "description": "Sem dados do mês anterior para comparação"
+            }
+        
+        percentage = round((current_total - previous_total) / previous_total * 100, 1)
+        
+        if percentage > 0:
+            direction, verb = "increasing", "aumentaram"
+        elif percentage < 0:
+            direction, verb = "decreasing", "diminuíram"
+        else:
+            return {
+                "direction": "stable",
+                "percentage": 0.0,
+                "description": "Gastos estáveis em relação ao mês anterior"
+            }
+        
+        return {
+            "direction": direction,
+            "percentage": abs(percentage),
+            "description": f"Gastos {verb} {abs(percentage)}% em relação ao mês anterior"
+        }
+    
+    def _calculate_category_breakdown(self, frame: ExpenseFrame) -> Dict[str, Any]:
+        """Calcular breakdown por categoria"""
         
-        for expense in expenses:
-            category = expense["category"]
-            if category not in category_totals:
-                category_totals[category] = 0
-            category_totals[category] += expense["amount"]
+        total_cents = frame.total_cents
         
         # Calcular percentuais
         breakdown = {}
-        for category, amount in category_totals.items():
-            percentage = (amount / total_amount) * 100 if total_amount > 0 else 0
+        for category, group in frame.group_by("category").items():
+            percentage = (group["total"] / total_cents) * 100 if total_cents > 0 else 0
             breakdown[category] = {
-                "amount": amount,
+                "amount": cents_to_float(group["total"]),
                 "percentage": round(percentage, 1),
                 "currency": "BRL"
             }
@@ -313,7 +438,8 @@ class FinancialAdvisorAgent:
             Forneça insights práticos e acionáveis para um brasileiro.
             """
             
-            response = await self.openai_client.chat.completions.create(
+            response = await openai_gateway.chat(
+                "financial_advisor", self.openai_client,
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {
@@ -342,21 +468,21 @@ class FinancialAdvisorAgent:
                 "Revise gastos mensais para identificar oportunidades de economia"
             ]
     
-    def _calculate_comprehensive_stats(self, expenses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_comprehensive_stats(self, frame: ExpenseFrame) -> Dict[str, Any]:
         """Calcular estatísticas abrangentes"""
         
-        if not expenses:
+        if not len(frame):
             return {"total": 0, "count": 0, "average": 0}
         
-        amounts = [expense["amount"] for expense in expenses]
+        stats = frame.stats_cents()
         
         return {
-            "total": sum(amounts),
-            "count": len(amounts),
-            "average": mean(amounts),
-            "median": median(amounts),
-            "min": min(amounts),
-            "max": max(amounts),
+            "total": cents_to_float(stats["total"]),
+            "count": stats["count"],
+            "average": cents_to_float(stats["average"]),
+            "median": cents_to_float(stats["median"]),
+            "min": cents_to_float(stats["min"]),
+            "max": cents_to_float(stats["max"]),
             "currency": "BRL"
         }
     
@@ -364,19 +490,23 @@ class FinancialAdvisorAgent:
         """Gerar insights com IA"""
         
         try:
+            # Mediana só existe quando as estatísticas vêm das despesas individuais
+            median_line = f"- Mediana: R$ {stats['median']:,.2f}" if "median" in stats else ""
+            
             prompt = f"""
             Analise os dados financeiros e forneça insights específicos:
             
             Estatísticas:
             - Total gasto: R$ {stats['total']:,.2f}
             - Média por transação: R$ {stats['average']:,.2f}
-            - Mediana: R$ {stats['median']:,.2f}
+            {median_line}
             - Número de transações: {stats['count']}
             
             Forneça 5 insights práticos para otimização financeira no Brasil.
             """
             
-            response = await self.openai_client.chat.completions.create(
+            response = await openai_gateway.chat(
+                "financial_advisor", self.openai_client,
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {
@@ -401,24 +531,24 @@ class FinancialAdvisorAgent:
             logger.error(f"Erro ao gerar insights AI: {str(e)}")
             return ["Análise de insights temporariamente indisponível"]
     
-    def _analyze_spending_patterns(self, expenses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_spending_patterns(self, frame: ExpenseFrame) -> Dict[str, Any]:
         """Analisar padrões de gastos"""
         
         # Análise por categoria
-        category_patterns = {}
-        for expense in expenses:
-            category = expense["category"]
-            if category not in category_patterns:
-                category_patterns[category] = []
-            category_patterns[category].append(expense["amount"])
-        
         patterns = {}
-        for category, amounts in category_patterns.items():
+        for category, group in frame.group_by("category").items():
             patterns[category] = {
-                "frequency": len(amounts),
-                "average": mean(amounts),
-                "total": sum(amounts),
-                "pattern": "regular" if len(amounts) > 2 else "occasional"
+                "frequency": group["count"],
+                "average": cents_to_float(group["total"]) / group["count"],
+                "total": cents_to_float(group["total"]),
+                "pattern": "regular" if group["count"] > 2 else "occasional"
+            }
+        
+        if not patterns:
+            return {
+                "category_patterns": {},
+                "most_frequent_category": None,
+                "highest_spending_category": None
             }
         
         return {
@@ -427,26 +557,19 @@ class FinancialAdvisorAgent:
             "highest_spending_category": max(patterns.keys(), key=lambda x: patterns[x]["total"])
         }
     
-    def _identify_savings_opportunities(self, expenses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _identify_savings_opportunities(self, frame: ExpenseFrame) -> List[Dict[str, Any]]:
         """Identificar oportunidades de economia"""
         
         opportunities = []
         
-        # Análise por categoria
-        category_totals = {}
-        for expense in expenses:
-            category = expense["category"]
-            if category not in category_totals:
-                category_totals[category] = 0
-            category_totals[category] += expense["amount"]
-        
         # Identificar categorias com maior potencial
-        for category, total in category_totals.items():
+        for category, group in frame.group_by("category").items():
+            total = cents_to_float(group["total"])
             if total > 200:  # Limiar para sugestão
                 opportunities.append({
                     "category": category,
                     "current_spending": total,
-                    "potential_savings": total * 0.1,  # 10% de economia
+                    "potential_savings": cents_to_float(divide_cents(group["total"], 1, 10)),  # 10% de economia
                     "recommendation": f"Considere revisar gastos em {category}",
                     "difficulty": "easy"
                 })
@@ -482,10 +605,10 @@ class FinancialAdvisorAgent:
         
         return recommendations
     
-    def _calculate_monthly_stats(self, expenses: List[Dict[str, Any]], month: datetime) -> Dict[str, Any]:
+    def _calculate_monthly_stats(self, frame: ExpenseFrame, month: datetime) -> Dict[str, Any]:
         """Calcular estatísticas mensais"""
         
-        return self._calculate_comprehensive_stats(expenses)
+        return self._calculate_comprehensive_stats(frame)
     
     def _compare_with_previous_month(self, user_id: str, current_month: datetime) -> Dict[str, Any]:
         """Comparar com mês anterior"""
@@ -528,7 +651,7 @@ class FinancialAdvisorAgent:
             "performance": "on_track" if stats["total"] <= 5000 else "over_budget"
         }
     
-    def _project_next_month(self, expenses: List[Dict[str, Any]], 
+    def _project_next_month(self, frame: ExpenseFrame, 
                            current_stats: Dict[str, Any]) -> Dict[str, Any]:
         """Projetar próximo mês"""
         
@@ -5,17 +5,35 @@ Responsável por calcular projeções de independência financeira adaptadas ao
 
 import math
 import logging
+from dataclasses import replace
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, date
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
-from openai import AsyncOpenAI
+import numpy as np
 
 from app.core.config import settings, BRAZILIAN_INVESTMENT_TYPES
+from app.core.metrics import stage
 from app.schemas.fire import (
     FireCalculationRequest, FireCalculationResponse, FireProjection,
     FireScenario, InvestmentProfile, FireScenarioComparison,
-    FireOptimization, CoastFireCalculation, BaristaFireCalculation
+    FireOptimization, CoastFireCalculation, BaristaFireCalculation,
+    FireGoalSeekRequest, FireGoalSeekResponse, GoalSeekTarget,
+    FireProjectionRequest, FireProjectionResponse,
+    WithdrawalSimulationRequest, WithdrawalSimulationResponse,
+    FireBacktestRequest, FireBacktestResponse, FireBacktestProfileResult
+)
+from app.services.cache import canonical_key, fire_insights_cache
+from app.services.openai_gateway import openai_gateway
+from app.utils.backtest import load_market_history, rolling_withdrawal_backtest
+from app.utils.decumulation import regime_codes, simulate_withdrawals, sustainable_withdrawal_rate
+from app.utils.fire_math import (
+    FireAssumptions, annuity_factor, future_value, future_value_return_derivative,
+    growth_factor, monthly_rate, months_to_target, months_to_target_grid,
+    projection_factors, required_contribution, solve_increasing
+)
+from app.utils.money import (
+    cents_to_float, divide_cents, float_to_cents, float_to_cents_array, from_cents, to_cents
 )
 
 logger = logging.getLogger(__name__)
@@ -24,7 +42,7 @@ class FireCalculatorAgent:
     """Agente para cálculos FIRE brasileiros"""
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.openai_client = openai_gateway.client
         self.investment_types = BRAZILIAN_INVESTMENT_TYPES
         
         # Configurações brasileiras
@@ -35,6 +53,13 @@ class FireCalculatorAgent:
             InvestmentProfile.AGRESSIVO: Decimal('0.12'),     # 12% ao ano
         }
         
+        # Fração em renda variável de cada perfil (backtest histórico)
+        self.equity_weights = {
+            InvestmentProfile.CONSERVADOR: 0.30,
+            InvestmentProfile.MODERADO: 0.50,
+            InvestmentProfile.AGRESSIVO: 0.70,
+        }
+        
         # Cenários FIRE brasileiros
         self.fire_scenarios = {
             FireScenario.LEAN_FIRE: Decimal('3000'),     # R$ 3.000/mês
@@ -54,27 +79,30 @@ class FireCalculatorAgent:
             Projeções FIRE completas
         """
         try:
-            # Calcular configurações
-            assumptions = self._calculate_assumptions(request)
-            
-            # Calcular número FIRE
-            fire_number = self._calculate_fire_number(request, assumptions)
-            
-            # Calcular tempo para FIRE
-            years_to_fire, monthly_savings_needed = self._calculate_time_to_fire(
-                request, fire_number, assumptions
-            )
-            
-            # Gerar projeções anuais
-            projections = self._generate_projections(
-                request, fire_number, years_to_fire, monthly_savings_needed, assumptions
-            )
-            
-            # Calcular cenários alternativos
-            scenarios = await self._calculate_scenarios(request, user_id)
+            with stage("fire_math"):
+                # Calcular configurações
+                assumptions = self._calculate_assumptions(request)
+                
+                # Calcular número FIRE
+                fire_number = self._calculate_fire_number(request, assumptions)
+                
+                # Calcular tempo para FIRE
+                years_to_fire, monthly_savings_needed = self._calculate_time_to_fire(
+                    request, fire_number, assumptions
+                )
+                
+                # Gerar projeções anuais
+                projections = self._generate_projections(
+                    request, fire_number, years_to_fire, monthly_savings_needed, assumptions
+                )
+                
+                # Calcular cenários alternativos
+                scenarios = await self._calculate_scenarios(request, user_id, assumptions)
             
             # Gerar insights
-            insights = await self._generate_insights(request, years_to_fire, monthly_savings_needed, user_id)
+            insights, insights_fallback = await self._generate_insights(
+                request, years_to_fire, monthly_savings_needed, user_id
+            )
             
             # Gerar warnings
             warnings = self._generate_warnings(request, years_to_fire, monthly_savings_needed)
@@ -90,9 +118,10 @@ class FireCalculatorAgent:
                 savings_rate=savings_rate,
                 projections=projections,
                 scenarios=scenarios,
-                assumptions=assumptions,
+                assumptions=assumptions.as_dict(),
                 insights=insights,
-                warnings=warnings
+                warnings=warnings,
+                insights_fallback=insights_fallback
             )
             
             return response
@@ -101,7 +130,7 @@ class FireCalculatorAgent:
             logger.error(f"Erro no cálculo FIRE: {str(e)}")
             raise
     
-    def _calculate_assumptions(self, request: FireCalculationRequest) -> Dict[str, Any]:
+    def _calculate_assumptions(self, request: FireCalculationRequest) -> FireAssumptions:
         """Calcular premissas do cálculo"""
         
         # Taxa de retorno baseada no perfil
@@ -113,81 +142,74 @@ class FireCalculatorAgent:
         # Gastos mensais alvo
         target_expenses = request.target_monthly_expenses or request.monthly_expenses
         
-        # Taxa real de retorno (descontando inflação)
-        real_return = (1 + expected_return) / (1 + inflation_rate) - 1
-        
-        return {
-            "expected_return": float(expected_return),
-            "inflation_rate": float(inflation_rate),
-            "real_return": float(real_return),
-            "target_monthly_expenses": float(target_expenses),
-            "fire_multiplier": 25,  # Regra 25x
-            "withdrawal_rate": 0.04,  # Regra 4%
-            "consider_tax": request.consider_tax
-        }
+        # Taxas mensais e retorno real ficam na tabela memoizada (assumptions.rates)
+        return FireAssumptions(
+            expected_return=float(expected_return),
+            inflation_rate=float(inflation_rate),
+            target_monthly_expenses=float(target_expenses),
+            consider_tax=request.consider_tax
+        )
     
-    def _calculate_fire_number(self, request: FireCalculationRequest, assumptions: Dict[str, Any]) -> Decimal:
+    def _calculate_fire_number(self, request: FireCalculationRequest, assumptions: FireAssumptions) -> Decimal:
         """Calcular número FIRE (25x gastos anuais)"""
         
-        target_expenses = Decimal(str(assumptions["target_monthly_expenses"]))
-        annual_expenses = target_expenses * 12
+        target_cents = to_cents(assumptions.target_monthly_expenses)
         
-        # Regra 25x
-        fire_number = annual_expenses * assumptions["fire_multiplier"]
+        # Regra 25x sobre os gastos anuais
+        fire_cents = target_cents * 12 * assumptions.fire_multiplier
         
         # Ajustar para impostos se necessário
-        if assumptions["consider_tax"]:
-            # Considerar IR sobre rendimentos (aproximadamente 15%)
-            fire_number = fire_number * Decimal('1.15')
+        if assumptions.consider_tax:
+            # Considerar IR sobre rendimentos (aproximadamente 15%). Sem a
+            # alocação por classe de ativo não há como aplicar a tabela real;
+            # simulate_withdrawal_plan calcula a taxa sustentável por carteira
+            fire_cents = divide_cents(fire_cents, 115, 100)
         
-        return fire_number.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return from_cents(fire_cents)
     
-    def _calculate_time_to_fire(self, request: FireCalculationRequest, fire_number: Decimal, assumptions: Dict[str, Any]) -> Tuple[int, Decimal]:
+    def _calculate_time_to_fire(self, request: FireCalculationRequest, fire_number: Decimal, assumptions: FireAssumptions) -> Tuple[int, Decimal]:
         """Calcular tempo para FIRE e poupança necessária"""
         
-        current_savings = request.current_savings
-        monthly_income = request.monthly_income
-        monthly_expenses = request.monthly_expenses
+        fire_cents = to_cents(fire_number)
         
         # Capacidade máxima de poupança
-        max_monthly_savings = monthly_income - monthly_expenses
+        max_savings_cents = to_cents(request.monthly_income) - to_cents(request.monthly_expenses)
         
-        if max_monthly_savings <= 0:
+        if max_savings_cents <= 0:
             raise ValueError("Renda insuficiente para poupança")
         
         # Taxa de retorno mensal
-        monthly_return = (1 + Decimal(str(assumptions["expected_return"]))) ** (Decimal('1') / Decimal('12')) - 1
+        r = assumptions.rates.monthly_return
         
         # Calcular usando fórmula de valor futuro da anuidade
         # FV = PV * (1 + r)^n + PMT * [((1 + r)^n - 1) / r]
         # Resolvendo para n (número de meses)
         
-        pv = current_savings
-        fv = fire_number
-        r = monthly_return
+        pv = cents_to_float(to_cents(request.current_savings))
+        fv = cents_to_float(fire_cents)
+        
+        # 70% da capacidade de poupança
+        savings_cents = divide_cents(max_savings_cents, 7, 10)
         
         # Se não há poupança atual, usar fórmula simples
         if pv == 0:
             # FV = PMT * [((1 + r)^n - 1) / r]
             # Resolvendo para n
-            monthly_savings = max_monthly_savings * Decimal('0.7')  # 70% da capacidade
-            
-            if monthly_savings * 12 * 25 < fire_number:  # Verificação rápida
-                monthly_savings = max_monthly_savings * Decimal('0.9')  # 90% da capacidade
+            if savings_cents * 12 * 25 < fire_cents:  # Verificação rápida
+                savings_cents = divide_cents(max_savings_cents, 9, 10)  # 90% da capacidade
             
             # Cálculo iterativo para encontrar n
-            months = self._solve_for_months(fv, monthly_savings, r)
+            months = self._solve_for_months(fv, cents_to_float(savings_cents), r)
             
         else:
             # Com poupança inicial
-            monthly_savings = max_monthly_savings * Decimal('0.7')
-            months = self._solve_for_months_with_pv(fv, pv, monthly_savings, r)
+            months = self._solve_for_months_with_pv(fv, pv, cents_to_float(savings_cents), r)
         
         years = math.ceil(months / 12)
         
-        return years, monthly_savings.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return years, from_cents(savings_cents)
     
-    def _solve_for_months(self, fv: Decimal, pmt: Decimal, r: Decimal) -> int:
+    def _solve_for_months(self, fv: float, pmt: float, r: float) -> int:
         """Resolver para número de meses usando método iterativo"""
         
         if r == 0:
@@ -200,92 +222,423 @@ class FireCalculatorAgent:
             if numerator <= 0:
                 raise ValueError("Valor futuro muito alto para a poupança mensal")
             
-            months = math.log(float(numerator)) / math.log(float(1 + r))
+            months = math.log(numerator) / math.log(1 + r)
             return max(1, int(months))
             
         except (ValueError, ZeroDivisionError):
             # Fallback para método iterativo
             return self._iterative_solve(fv, pmt, r)
     
-    def _solve_for_months_with_pv(self, fv: Decimal, pv: Decimal, pmt: Decimal, r: Decimal) -> int:
+    def _solve_for_months_with_pv(self, fv: float, pv: float, pmt: float, r: float) -> int:
         """Resolver para meses com valor presente"""
         
-        # Método iterativo
-        months = 0
-        current_value = pv
+        # Forma fechada, equivalente ao laço mês a mês (máximo 50 anos)
+        return months_to_target(fv, pv, pmt, r, max_months=600)
+    
+    def _iterative_solve(self, fv: float, pmt: float, r: float) -> int:
+        """Meses até o alvo sem patrimônio inicial"""
         
-        while current_value < fv and months < 600:  # Máximo 50 anos
-            current_value = current_value * (1 + r) + pmt
-            months += 1
+        return months_to_target(fv, 0.0, pmt, r, max_months=600)
+    
+    @stage("fire_math")
+    def goal_seek(self, request: FireGoalSeekRequest) -> FireGoalSeekResponse:
+        """
+        Resolver aporte mínimo, gasto máximo ou retorno necessário para
+        atingir FIRE na idade alvo
+        
+        Aporte e gasto são lineares no valor futuro e têm forma fechada;
+        o retorno usa Newton protegido por bisseção.
+        """
+        
+        assumptions = self._calculate_assumptions(request)
+        months = (request.target_age - request.current_age) * 12
+        pv = cents_to_float(to_cents(request.current_savings))
+        income = cents_to_float(to_cents(request.monthly_income))
+        expenses = cents_to_float(to_cents(request.monthly_expenses))
+        r = assumptions.rates.monthly_return
+        expected_return = assumptions.expected_return
+        message = None
+        evaluations = 1
+        
+        if request.solve_for == GoalSeekTarget.MONTHLY_CONTRIBUTION:
+            fire_number = self._calculate_fire_number(request, assumptions)
+            contribution = required_contribution(float(fire_number), pv, r, months)
+            contribution_cents = math.ceil(contribution * 100 - 1e-6)
+            feasible = contribution_cents <= to_cents(request.monthly_income) - to_cents(request.monthly_expenses)
+            if not feasible:
+                message = "Aporte necessário excede a capacidade atual de poupança"
+        
+        elif request.solve_for == GoalSeekTarget.MONTHLY_EXPENSES:
+            if request.target_monthly_expenses:
+                # Número FIRE fixo: gastar mais significa aportar menos
+                fire_number = self._calculate_fire_number(request, assumptions)
+                contribution = required_contribution(float(fire_number), pv, r, months)
+                expenses = income - contribution
+            else:
+                # Gasto E define o alvo (E * K) e o aporte (renda - E):
+                # PV * G + (renda - E) * A = E * K
+                multiplier = 12 * assumptions.fire_multiplier * (1.15 if assumptions.consider_tax else 1)
+                growth, annuity = growth_factor(r, months), annuity_factor(r, months)
+                expenses = (pv * growth + income * annuity) / (annuity + multiplier)
+            
+            # Gasto máximo: arredondar para baixo
+            expenses_cents = min(math.floor(expenses * 100 + 1e-6), to_cents(request.monthly_income))
+            expenses = cents_to_float(expenses_cents)
+            if not request.target_monthly_expenses:
+                assumptions = replace(assumptions, target_monthly_expenses=expenses)
+            fire_number = self._calculate_fire_number(request, assumptions)
+            contribution_cents = to_cents(request.monthly_income) - expenses_cents
+            feasible = expenses_cents > 0
+            if not feasible:
+                message = "Nem zerando os gastos a meta é atingida na idade alvo"
         
-        return months
+        else:
+            fire_number = self._calculate_fire_number(request, assumptions)
+            contribution = float(request.monthly_contribution) if request.monthly_contribution is not None else income - expenses
+            contribution_cents = to_cents(contribution)
+            contribution = cents_to_float(contribution_cents)
+            target = float(fire_number)
+            
+            def gap(annual_return: float) -> float:
+                return future_value(pv, contribution, monthly_rate(annual_return), months) - target
+            
+            def slope(annual_return: float) -> float:
+                return future_value_return_derivative(pv, contribution, annual_return, months)
+            
+            low, high = -0.5, 1.0
+            gap_low = gap(low)
+            if gap_low >= 0:
+                expected_return, feasible, evaluations = low, True, 1
+                message = "Meta atingida mesmo com retorno de -50% ao ano"
+            else:
+                gap_high = gap(high)
+                if gap_high < 0:
+                    expected_return, feasible, evaluations = high, False, 2
+                    message = "Nem com retorno de 100% ao ano a meta é atingida"
+                else:
+                    # Extremos já avaliados: o solver não os recalcula
+                    expected_return, solver_evaluations = solve_increasing(
+                        gap, low, high, derivative=slope, f_low=gap_low, f_high=gap_high
+                    )
+                    evaluations = 2 + solver_evaluations
+                    feasible = True
+        
+        real_return = (1 + expected_return) / (1 + assumptions.inflation_rate) - 1
+        contribution_value = from_cents(max(0, contribution_cents))
+        
+        return FireGoalSeekResponse(
+            solve_for=request.solve_for,
+            target_age=request.target_age,
+            months_to_target=months,
+            feasible=feasible,
+            fire_number=fire_number,
+            monthly_contribution=contribution_value,
+            monthly_expenses=from_cents(to_cents(expenses)),
+            expected_return=Decimal(str(round(expected_return, 6))),
+            real_return=Decimal(str(round(real_return, 6))),
+            savings_rate=(contribution_value / request.monthly_income * 100).quantize(Decimal("0.01")),
+            evaluations=evaluations,
+            message=message
+        )
     
-    def _iterative_solve(self, fv: Decimal, pmt: Decimal, r: Decimal) -> int:
-        """Método iterativo para resolver equação"""
+    @stage("withdrawal_simulation")
+    def simulate_withdrawal_plan(self, request: WithdrawalSimulationRequest) -> WithdrawalSimulationResponse:
+        """
+        Taxa de retirada sustentável considerando o IR de cada classe de ativo
         
-        months = 0
-        current_value = Decimal('0')
+        Tabela regressiva, isenção de LCI/LCA e de vendas de ações até
+        R$ 20 mil/mês e come-cotas semestral; saques corrigidos pela inflação.
+        """
         
-        while current_value < fv and months < 600:  # Máximo 50 anos
-            current_value = current_value * (1 + r) + pmt
-            months += 1
+        buckets = request.buckets
+        values = np.array([[cents_to_float(to_cents(bucket.amount)) for bucket in buckets]])
+        cost_basis = np.array([[
+            cents_to_float(to_cents(bucket.cost_basis if bucket.cost_basis is not None else bucket.amount))
+            for bucket in buckets
+        ]])
+        total = float(values.sum())
+        if total <= 0:
+            raise ValueError("Patrimônio inicial deve ser positivo")
+        
+        regimes = regime_codes(bucket.tax_regime for bucket in buckets)
+        monthly_returns = np.array([monthly_rate(float(bucket.annual_return)) for bucket in buckets])
+        holding_days = np.array([bucket.holding_days for bucket in buckets], dtype=np.float64)
+        monthly_inflation = monthly_rate(float(request.inflation_rate or self.default_inflation))
+        months = request.years * 12
+        start_month = request.start_month or datetime.now().month
+        
+        rate = float(sustainable_withdrawal_rate(
+            values, cost_basis, regimes, monthly_returns, months,
+            monthly_inflation=monthly_inflation,
+            holding_days=holding_days,
+            start_month=start_month
+        )[0])
+        
+        response = WithdrawalSimulationResponse(
+            total_amount=from_cents(float_to_cents(total)),
+            sustainable_withdrawal_rate=Decimal(str(round(rate, 4))),
+            sustainable_monthly_withdrawal=from_cents(math.floor(total * rate / 12 * 100)),
+            implied_fire_multiplier=Decimal(str(round(1 / rate, 2))) if rate > 0 else Decimal("0"),
+            flat_tax_multiplier=Decimal(str(settings.FIRE_MULTIPLIER)) * Decimal("1.15")
+        )
+        
+        if request.monthly_withdrawal is not None:
+            result = simulate_withdrawals(
+                values, cost_basis, regimes, monthly_returns,
+                monthly_withdrawal=cents_to_float(to_cents(request.monthly_withdrawal)),
+                months=months,
+                monthly_inflation=monthly_inflation,
+                holding_days=holding_days,
+                start_month=start_month
+            )
+            depleted_month = int(result.depleted_month[0])
+            response.depleted_after_months = depleted_month if depleted_month >= 0 else None
+            response.final_balance = from_cents(float_to_cents(float(result.final_balance[0])))
+            response.total_taxes = from_cents(float_to_cents(float(result.taxes_paid[0])))
+            response.effective_tax_rate = Decimal(str(round(float(result.effective_tax_rate[0]), 4)))
         
-        return months
+        return response
+    
+    @stage("backtest")
+    def backtest(self, request: FireBacktestRequest) -> FireBacktestResponse:
+        """
+        Retiradas corrigidas pelo IPCA em todas as janelas históricas, por perfil
+        
+        Renda fixa rende CDI e renda variável rende Ibovespa, com
+        rebalanceamento mensal; sem impostos.
+        
+        Raises:
+            FileNotFoundError: séries históricas não instaladas
+        """
+        
+        history = load_market_history(settings.BACKTEST_DATA_PATH).since(request.start_month)
+        months = request.years * 12
+        withdrawal_rate = float(request.withdrawal_rate)
+        
+        profiles = {}
+        for profile, equity_weight in self.equity_weights.items():
+            result = rolling_withdrawal_backtest(history, equity_weight, withdrawal_rate, months)
+            profiles[profile.value] = FireBacktestProfileResult(
+                equity_weight=Decimal(str(equity_weight)),
+                windows=result.windows,
+                failure_rate=Decimal(str(round(result.failure_rate, 4))),
+                worst_drawdown=Decimal(str(round(float(result.max_drawdown.max()), 4))),
+                worst_start_month=result.start_months[result.worst_index],
+                safe_withdrawal_rate=Decimal(str(round(float(result.safe_withdrawal_rate.min()), 4))),
+                median_ending_real_balance=Decimal(str(round(float(np.median(result.ending_real_balance)), 2)))
+            )
+        
+        return FireBacktestResponse(
+            withdrawal_rate=request.withdrawal_rate,
+            years=request.years,
+            data_start=history.months[0],
+            data_end=history.months[-1],
+            profiles=profiles,
+            sample_data=history.sample
+        )
+    
+    @stage("fire_math")
+    def optimize(self, request: FireCalculationRequest, grid_size: int = 100,
+                 max_expense_cut: float = 0.5, max_income_raise: float = 0.5,
+                 return_spread: float = 0.04) -> FireOptimization:
+        """
+        Sensibilidade do prazo FIRE a cortes de gastos, aumentos de renda e retorno
+        
+        Varre a grade cortes x aumentos (grid_size x grid_size) e a faixa de
+        retornos numa única avaliação vetorizada da fórmula fechada de meses
+        até o alvo. A fração da capacidade de poupança usada no cálculo
+        principal é mantida em todos os pontos.
+        """
+        
+        base_request = request.model_copy(update={"target_age": None})
+        assumptions = self._calculate_assumptions(base_request)
+        fire_number = self._calculate_fire_number(base_request, assumptions)
+        years_to_fire, monthly_savings = self._calculate_time_to_fire(base_request, fire_number, assumptions)
+        
+        income = float(request.monthly_income)
+        expenses = float(request.monthly_expenses)
+        pv = float(request.current_savings)
+        savings = float(monthly_savings)
+        savings_fraction = savings / (income - expenses)
+        r = assumptions.rates.monthly_return
+        
+        # Sem gasto alvo explícito, cortar gastos também reduz o número FIRE
+        if request.target_monthly_expenses is None:
+            fire_per_expense = 12 * assumptions.fire_multiplier * (1.15 if assumptions.consider_tax else 1.0)
+        else:
+            fire_per_expense = None
+        
+        cuts = np.linspace(0, max_expense_cut, grid_size)
+        raises = np.linspace(0, max_income_raise, grid_size)
+        new_expenses = expenses * (1 - cuts)[:, None]
+        new_income = income * (1 + raises)[None, :]
+        targets = fire_per_expense * new_expenses if fire_per_expense else float(fire_number)
+        
+        grid = months_to_target_grid(targets, pv, savings_fraction * (new_income - new_expenses), r)
+        baseline = grid[0, 0]
+        years_saved_grid = (baseline - grid) / 12
+        
+        # Esforço mensal em reais de cada combinação
+        expense_effort = expenses * cuts
+        income_effort = savings_fraction * income * raises
+        effort = expense_effort[:, None] + income_effort[None, :]
+        
+        returns = np.linspace(max(-0.02, assumptions.expected_return - return_spread),
+                              assumptions.expected_return + return_spread, grid_size)
+        return_months = months_to_target_grid(
+            targets[0, 0] if fire_per_expense else float(fire_number),
+            pv, savings, (1 + returns) ** (1 / 12) - 1
+        )
+        
+        def curve(values: np.ndarray, decimals: int = 2) -> List[float]:
+            return np.round(values, decimals).tolist()
+        
+        def lever(label: str, percents: np.ndarray, amounts: np.ndarray,
+                  months: np.ndarray, step: float = 0.10) -> Dict[str, Any]:
+            index = int(np.abs(percents - step).argmin())
+            years_saved = (baseline - months[index]) / 12
+            per_1000 = years_saved / amounts[index] * 1000 if amounts[index] > 0 else 0.0
+            return {
+                "lever": label,
+                "percent": round(float(percents[index]) * 100, 1),
+                "monthly_amount": round(float(amounts[index]), 2),
+                "years_saved": round(float(years_saved), 2),
+                "years_saved_per_1000": round(float(per_1000), 3)
+            }
+        
+        expense_lever = lever("expense_reduction", cuts, expense_effort, grid[:, 0])
+        income_lever = lever("income_increase", raises, income_effort, grid[0, :])
+        
+        # Combinação mais barata (R$/mês) para antecipar o FIRE em k anos
+        combinations = []
+        for years in range(1, 11):
+            reachable = years_saved_grid >= years
+            if not reachable.any():
+                break
+            i, j = np.unravel_index(np.where(reachable, effort, np.inf).argmin(), effort.shape)
+            combinations.append({
+                "years_saved": years,
+                "expense_reduction_percent": round(float(cuts[i]) * 100, 1),
+                "income_increase_percent": round(float(raises[j]) * 100, 1),
+                "monthly_amount": round(float(effort[i, j]), 2)
+            })
+        
+        return_index = int(np.abs(returns - (assumptions.expected_return + 0.01)).argmin())
+        
+        recommendations = sorted(
+            [expense_lever, income_lever],
+            key=lambda item: item["years_saved_per_1000"], reverse=True
+        )
+        recommendations.append({
+            "lever": "investment_return",
+            "percent": round(float(returns[return_index] - assumptions.expected_return) * 100, 2),
+            "monthly_amount": 0.0,
+            "years_saved": round(float((baseline - return_months[return_index]) / 12), 2),
+            "years_saved_per_1000": None
+        })
+        
+        return FireOptimization(
+            current_savings_rate=(monthly_savings / request.monthly_income * 100).quantize(Decimal("0.01")),
+            current_fire_timeline=years_to_fire,
+            expense_reduction_impact={
+                "reduction_percent": curve(cuts * 100, 1),
+                "monthly_savings": curve(expense_effort),
+                "years_to_fire": curve(grid[:, 0] / 12),
+                "years_saved": curve(years_saved_grid[:, 0]),
+                "at_10_percent": expense_lever
+            },
+            income_increase_impact={
+                "increase_percent": curve(raises * 100, 1),
+                "extra_monthly_savings": curve(income_effort),
+                "years_to_fire": curve(grid[0, :] / 12),
+                "years_saved": curve(years_saved_grid[0, :]),
+                "at_10_percent": income_lever
+            },
+            investment_optimization={
+                "annual_return_percent": curve(returns * 100),
+                "years_to_fire": curve(return_months / 12),
+                "years_saved": curve((baseline - return_months) / 12),
+                "current_return_percent": round(assumptions.expected_return * 100, 2),
+                "cheapest_combinations": combinations
+            },
+            recommendations=recommendations
+        )
     
     def _generate_projections(self, request: FireCalculationRequest, fire_number: Decimal, 
                             years_to_fire: int, monthly_savings: Decimal, 
-                            assumptions: Dict[str, Any]) -> List[FireProjection]:
+                            assumptions: FireAssumptions) -> List[FireProjection]:
         """Gerar projeções anuais"""
         
-        projections = []
-        current_value = request.current_savings
-        monthly_return = (1 + Decimal(str(assumptions["expected_return"]))) ** (Decimal('1') / Decimal('12')) - 1
-        
-        for year in range(1, years_to_fire + 1):
-            # Calcular valor no final do ano
-            for month in range(12):
-                current_value = current_value * (1 + monthly_return) + monthly_savings
-            
-            # Ajustar pela inflação
-            inflation_factor = (1 + Decimal(str(assumptions["inflation_rate"]))) ** year
-            inflation_adjusted = current_value / inflation_factor
-            
-            projection = FireProjection(
-                year=datetime.now().year + year,
+        # Fatores anuais em cache por (taxa, inflação, anos); o saldo é
+        # PV * fator_pv + PMT * fator_pmt, sem simular mês a mês
+        factors = projection_factors(
+            assumptions.rates.monthly_return, assumptions.inflation_rate, years_to_fire
+        )
+        balances = factors.balances(
+            cents_to_float(to_cents(request.current_savings)),
+            cents_to_float(to_cents(monthly_savings))
+        )
+        
+        # Arredondamento para centavos só ao montar o schema
+        accumulated = float_to_cents_array(balances).tolist()
+        adjusted = float_to_cents_array(balances * factors.inflation_discounts).tolist()
+        
+        annual_return = Decimal(str(assumptions.expected_return)) * 100
+        start_year = datetime.now().year
+        
+        return [
+            FireProjection(
+                year=start_year + year,
                 age=request.current_age + year,
-                accumulated_amount=current_value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+                accumulated_amount=from_cents(accumulated[year - 1]),
                 monthly_contribution=monthly_savings,
-                annual_return=Decimal(str(assumptions["expected_return"])) * 100,
-                inflation_adjusted=inflation_adjusted.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                annual_return=annual_return,
+                inflation_adjusted=from_cents(adjusted[year - 1])
             )
-            
-            projections.append(projection)
+            for year in range(1, years_to_fire + 1)
+        ]
+    
+    @stage("fire_math")
+    def project(self, request: FireProjectionRequest) -> FireProjectionResponse:
+        """Projeções anuais com aporte e horizonte opcionais
+        
+        Chamadas repetidas que mudam só aporte ou patrimônio reaproveitam os
+        fatores em cache (superposição linear).
+        """
+        
+        assumptions = self._calculate_assumptions(request)
+        fire_number = self._calculate_fire_number(request, assumptions)
         
-        return projections
+        if request.monthly_contribution is not None and request.years is not None:
+            years, contribution = request.years, request.monthly_contribution
+        else:
+            years_to_fire, savings = self._calculate_time_to_fire(request, fire_number, assumptions)
+            years = request.years or years_to_fire
+            contribution = request.monthly_contribution if request.monthly_contribution is not None else savings
+        
+        contribution = from_cents(to_cents(contribution))
+        
+        return FireProjectionResponse(
+            fire_number=fire_number,
+            years=years,
+            monthly_contribution=contribution,
+            projections=self._generate_projections(request, fire_number, years, contribution, assumptions)
+        )
     
-    async def _calculate_scenarios(self, request: FireCalculationRequest, user_id: str) -> Dict[str, Any]:
+    async def _calculate_scenarios(self, request: FireCalculationRequest, user_id: str,
+                                   assumptions: Optional[FireAssumptions] = None) -> Dict[str, Any]:
         """Calcular cenários alternativos"""
         
         scenarios = {}
+        assumptions = assumptions or self._calculate_assumptions(request)
         
-        # Cenários FIRE
+        # Cenários FIRE: mesmas premissas, apenas o gasto alvo muda
         for scenario, monthly_target in self.fire_scenarios.items():
-            scenario_request = FireCalculationRequest(
-                current_age=request.current_age,
-                current_savings=request.current_savings,
-                monthly_income=request.monthly_income,
-                monthly_expenses=request.monthly_expenses,
-                target_monthly_expenses=monthly_target,
-                investment_profile=request.investment_profile,
-                expected_return=request.expected_return,
-                inflation_rate=request.inflation_rate,
-                consider_tax=request.consider_tax
-            )
+            scenario_assumptions = replace(assumptions, target_monthly_expenses=float(monthly_target))
             
             try:
-                assumptions = self._calculate_assumptions(scenario_request)
-                fire_number = self._calculate_fire_number(scenario_request, assumptions)
-                years, monthly_savings = self._calculate_time_to_fire(scenario_request, fire_number, assumptions)
+                fire_number = self._calculate_fire_number(request, scenario_assumptions)
+                years, monthly_savings = self._calculate_time_to_fire(request, fire_number, scenario_assumptions)
                 
                 scenarios[scenario.value] = {
                     "fire_number": float(fire_number),
@@ -302,16 +655,17 @@ class FireCalculatorAgent:
                 }
         
         # Coast FIRE
-        coast_fire = self._calculate_coast_fire(request)
+        coast_fire = self._calculate_coast_fire(request, assumptions)
         scenarios["coast_fire"] = coast_fire
         
         # Barista FIRE
-        barista_fire = self._calculate_barista_fire(request)
+        barista_fire = self._calculate_barista_fire(request, assumptions)
         scenarios["barista_fire"] = barista_fire
         
         return scenarios
     
-    def _calculate_coast_fire(self, request: FireCalculationRequest) -> Dict[str, Any]:
+    def _calculate_coast_fire(self, request: FireCalculationRequest,
+                              assumptions: Optional[FireAssumptions] = None) -> Dict[str, Any]:
         """Calcular Coast FIRE"""
         
         try:
@@ -323,29 +677,31 @@ class FireCalculatorAgent:
                 return {"error": "Idade já passou dos 65 anos"}
             
             # Valor necessário hoje para atingir FIRE aos 65
-            assumptions = self._calculate_assumptions(request)
+            assumptions = assumptions or self._calculate_assumptions(request)
             fire_number = self._calculate_fire_number(request, assumptions)
             
             # Valor presente necessário
-            annual_return = Decimal(str(assumptions["expected_return"]))
-            coast_fire_number = fire_number / ((1 + annual_return) ** years_to_65)
+            annual_return = assumptions.expected_return
+            coast_fire_number = float(fire_number) / (1 + annual_return) ** years_to_65
+            current_savings = float(request.current_savings)
             
             # Tempo para atingir Coast FIRE
-            if request.current_savings >= coast_fire_number:
+            if current_savings >= coast_fire_number:
                 years_to_coast = 0
             else:
-                needed_amount = coast_fire_number - request.current_savings
-                monthly_savings = request.monthly_income - request.monthly_expenses
+                needed_amount = coast_fire_number - current_savings
+                monthly_savings = cents_to_float(
+                    to_cents(request.monthly_income) - to_cents(request.monthly_expenses)
+                )
                 
                 if monthly_savings <= 0:
                     return {"error": "Sem capacidade de poupança"}
                 
-                monthly_return = (1 + annual_return) ** (Decimal('1') / Decimal('12')) - 1
-                months = self._solve_for_months(needed_amount, monthly_savings, monthly_return)
+                months = self._solve_for_months(needed_amount, monthly_savings, assumptions.rates.monthly_return)
                 years_to_coast = math.ceil(months / 12)
             
             return {
-                "coast_fire_number": float(coast_fire_number),
+                "coast_fire_number": cents_to_float(float_to_cents(coast_fire_number)),
                 "coast_fire_age": request.current_age + years_to_coast,
                 "years_to_coast": years_to_coast,
                 "final_amount_at_65": float(fire_number)
@@ -354,49 +710,61 @@ class FireCalculatorAgent:
         except Exception as e:
             return {"error": str(e)}
     
-    def _calculate_barista_fire(self, request: FireCalculationRequest) -> Dict[str, Any]:
+    def _calculate_barista_fire(self, request: FireCalculationRequest,
+                                assumptions: Optional[FireAssumptions] = None) -> Dict[str, Any]:
         """Calcular Barista FIRE"""
         
         try:
             # Barista FIRE = 50% do FIRE number + renda parcial
-            assumptions = self._calculate_assumptions(request)
-            full_fire_number = self._calculate_fire_number(request, assumptions)
-            barista_fire_number = full_fire_number * Decimal('0.5')
+            assumptions = assumptions or self._calculate_assumptions(request)
+            full_fire_cents = to_cents(self._calculate_fire_number(request, assumptions))
+            barista_fire_cents = divide_cents(full_fire_cents, 1, 2)
             
-            # Renda parcial necessária
-            annual_expenses = Decimal(str(assumptions["target_monthly_expenses"])) * 12
-            annual_passive_income = barista_fire_number * Decimal('0.04')
-            part_time_income_needed = (annual_expenses - annual_passive_income) / 12
+            # Renda parcial necessária (centavos)
+            annual_expenses_cents = to_cents(assumptions.target_monthly_expenses) * 12
+            annual_passive_cents = divide_cents(barista_fire_cents, 4, 100)
+            part_time_cents = divide_cents(annual_expenses_cents - annual_passive_cents, 1, 12)
             
             # Tempo para Barista FIRE
-            if request.current_savings >= barista_fire_number:
+            savings_cents = to_cents(request.current_savings)
+            if savings_cents >= barista_fire_cents:
                 years_to_barista = 0
             else:
-                needed_amount = barista_fire_number - request.current_savings
-                monthly_savings = request.monthly_income - request.monthly_expenses
+                monthly_savings_cents = to_cents(request.monthly_income) - to_cents(request.monthly_expenses)
                 
-                if monthly_savings <= 0:
+                if monthly_savings_cents <= 0:
                     return {"error": "Sem capacidade de poupança"}
                 
-                annual_return = Decimal(str(assumptions["expected_return"]))
-                monthly_return = (1 + annual_return) ** (Decimal('1') / Decimal('12')) - 1
-                months = self._solve_for_months(needed_amount, monthly_savings, monthly_return)
+                months = self._solve_for_months(
+                    cents_to_float(barista_fire_cents - savings_cents),
+                    cents_to_float(monthly_savings_cents),
+                    assumptions.rates.monthly_return
+                )
                 years_to_barista = math.ceil(months / 12)
             
             return {
-                "barista_fire_number": float(barista_fire_number),
+                "barista_fire_number": cents_to_float(barista_fire_cents),
                 "barista_fire_age": request.current_age + years_to_barista,
                 "years_to_barista": years_to_barista,
-                "part_time_income_needed": float(part_time_income_needed),
-                "passive_income": float(annual_passive_income / 12)
+                "part_time_income_needed": cents_to_float(part_time_cents),
+                "passive_income": cents_to_float(divide_cents(annual_passive_cents, 1, 12))
             }
             
         except Exception as e:
             return {"error": str(e)}
     
     async def _generate_insights(self, request: FireCalculationRequest, years_to_fire: int, 
-                               monthly_savings: Decimal, user_id: str) -> List[str]:
-        """Gerar insights usando OpenAI"""
+                               monthly_savings: Decimal, user_id: str) -> Tuple[List[str], bool]:
+        """Gerar insights usando OpenAI (em cache separado do cálculo)
+        
+        Returns:
+            (insights, True se vieram do fallback por regras)
+        """
+        
+        cache_key = canonical_key("fire:insights", request, years_to_fire, monthly_savings)
+        cached = await fire_insights_cache.get_json(cache_key)
+        if cached is not None:
+            return cached, False
         
         try:
             # Dados para análise
@@ -421,7 +789,8 @@ class FireCalculatorAgent:
             Foque em ações concretas e estratégias otimizadas.
             """
             
-            response = await self.openai_client.chat.completions.create(
+            response = await openai_gateway.chat(
+                "fire_calculator", self.openai_client,
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {
@@ -442,11 +811,15 @@ class FireCalculatorAgent:
             content = response.choices[0].message.content
             insights = [insight.strip() for insight in content.split('\n') if insight.strip() and not insight.strip().startswith('#')]
             
-            return insights[:5]  # Máximo 5 insights
+            insights = insights[:5]  # Máximo 5 insights
+            
+            # Apenas respostas da IA vão para o cache; o fallback é recalculado
+            await fire_insights_cache.set_json(cache_key, insights)
+            return insights, False
             
         except Exception as e:
             logger.error(f"Erro ao gerar insights: {str(e)}")
-            return self._generate_fallback_insights(request, years_to_fire, monthly_savings)
+            return self._generate_fallback_insights(request, years_to_fire, monthly_savings), True
     
     def _generate_fallback_insights(self, request: FireCalculationRequest, years_to_fire: int, 
                                   monthly_savings: Decimal) -> List[str]:
@@ -490,6 +863,9 @@ class FireCalculatorAgent:
         if request.current_age + years_to_fire > 65:
             warnings.append("FIRE após idade tradicional de aposentadoria. Considere previdência complementar.")
         
+        if monthly_savings > request.monthly_income - request.monthly_expenses:
+            warnings.append("Poupança necessária excede a capacidade atual. Revise a idade alvo ou os gastos.")
+        
         if monthly_savings > request.monthly_income * Decimal('0.8'):
             warnings.append("Poupança necessária muito alta. Considere aumentar renda ou reduzir metas.")
         
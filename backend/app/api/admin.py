@@ -0,0 +1,44 @@
+"""
+Rotas administrativas (perfis de desempenho e gateway OpenAI)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core import profiling
+from app.services.openai_gateway import openai_gateway
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def _require_admin(token: Optional[str]):
+    # 404 em vez de 401/403: não revelar a rota sem token configurado
+    if not profiling.is_admin(token):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)) -> List[Dict[str, Any]]:
+    """Perfis gravados pelo profiler por amostragem"""
+
+    _require_admin(x_admin_token)
+    return profiling.list_profiles()
+
+@router.get("/openai")
+async def openai_gateway_status(x_admin_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Circuitos, vagas de concorrência e chamadas em voo do gateway OpenAI"""
+
+    _require_admin(x_admin_token)
+    return openai_gateway.stats()
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, x_admin_token: Optional[str] = Header(None)):
+    """Baixar um perfil (abrir .speedscope.json em speedscope.app; .pstats com python -m pstats)"""
+
+    _require_admin(x_admin_token)
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    media_type = "application/json" if name.endswith(".json") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
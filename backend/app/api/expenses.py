@@ -0,0 +1,82 @@
+"""
+Rotas de despesas
+"""
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.expense import (
+    ExpenseCategory, ExpenseFilter, ExpenseList, ExpenseSearchHit, ExpenseType,
+    PaymentMethod
+)
+from app.services.expenses import expense_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/expenses", tags=["expenses"])
+
+def expense_filter_params(
+    start_date: Optional[date] = Query(None, description="Data inicial"),
+    end_date: Optional[date] = Query(None, description="Data final"),
+    category: Optional[ExpenseCategory] = Query(None, description="Categoria"),
+    subcategory: Optional[str] = Query(None, description="Subcategoria"),
+    payment_method: Optional[PaymentMethod] = Query(None, description="Método de pagamento"),
+    type: Optional[ExpenseType] = Query(None, description="Tipo"),
+    min_amount: Optional[Decimal] = Query(None, description="Valor mínimo"),
+    max_amount: Optional[Decimal] = Query(None, description="Valor máximo"),
+    tags: Optional[List[str]] = Query(None, description="Tags (todas devem estar presentes)"),
+    search: Optional[str] = Query(None, description="Busca na descrição"),
+) -> ExpenseFilter:
+    """Montar ExpenseFilter a partir da query string"""
+
+    try:
+        return ExpenseFilter(
+            start_date=start_date,
+            end_date=end_date,
+            category=category,
+            subcategory=subcategory,
+            payment_method=payment_method,
+            type=type,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            tags=tags,
+            search=search
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"loc": error["loc"], "msg": error["msg"]} for error in e.errors()]
+        )
+
+@router.get("/{user_id}/search", response_model=List[ExpenseSearchHit])
+async def search_expenses(
+    user_id: str,
+    q: str = Query(..., min_length=1, max_length=100, description="Termos da busca"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Busca textual sem acentos, ordenada por relevância"""
+
+    return await expense_service.search_expenses(user_id, q, limit=limit)
+
+@router.get("/{user_id}", response_model=ExpenseList)
+async def list_expenses(
+    user_id: str,
+    filters: ExpenseFilter = Depends(expense_filter_params),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    per_page: int = Query(settings.EXPENSE_PAGE_SIZE, ge=1, le=settings.EXPENSE_MAX_PAGE_SIZE),
+    page: int = Query(1, ge=1, description="Número da página (sem cursor; usa OFFSET)"),
+):
+    """Listar despesas com filtros e paginação por cursor"""
+
+    try:
+        return await expense_service.list_expenses(
+            user_id, filters, cursor=cursor, per_page=per_page, page=page
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
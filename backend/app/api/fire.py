@@ -0,0 +1,247 @@
+"""
+Rotas de cálculos FIRE
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Type, TypeVar
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel, ValidationError
+
+from app.agents.fire_calculator import FireCalculatorAgent
+from app.core.mcp_manager import mcp_manager
+from app.schemas.fire import (
+    FireCalculationRequest, FireCalculationResponse, FireGoalSeekRequest, FireGoalSeekResponse,
+    FireOptimization, FireProjectionRequest, FireProjectionResponse,
+    WithdrawalSimulationRequest, WithdrawalSimulationResponse,
+    FireBacktestRequest, FireBacktestResponse
+)
+from app.services.cache import canonical_key, fire_insights_cache, fire_result_cache
+from app.utils import response_format
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/fire", tags=["fire"])
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+def get_fire_calculator() -> FireCalculatorAgent:
+    """Agente compartilhado do MCPManager (pré-criado no warm-up da aplicação)"""
+
+    return mcp_manager.get_agent("fire_calculator")
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Verificar If-None-Match (lista separada por vírgulas ou *)"""
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def cached_response(request: Request, body: bytes, cache_status: str,
+                    media_type: str = response_format.JSON) -> Response:
+    """Resposta com ETag; 304 quando o navegador já tem o corpo"""
+
+    etag = _etag(body)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept",
+        "X-Cache": cache_status
+    }
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+# Documentação OpenAPI das rotas com formato negociado pelo Accept
+def negotiated_responses(model: Type[BaseModel]) -> Dict[int, Dict[str, Any]]:
+    return {
+        200: {
+            "model": model,
+            "description": "JSON padrão; colunas compactas ou MessagePack (se instalado) conforme o Accept",
+            "content": {
+                response_format.COMPACT_JSON: {},
+                response_format.MSGPACK: {},
+            },
+        },
+        406: {"description": "Nenhum formato do Accept está disponível"},
+    }
+
+def negotiate_media_type(request: Request) -> str:
+    """Formato pedido pelo Accept; 406 quando nenhum está disponível (ex.: msgpack não instalado)"""
+
+    media_type = response_format.negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Formatos disponíveis: {', '.join(response_format.available_formats())}"
+        )
+    return media_type
+
+def formatted_response(request: Request, model: BaseModel) -> Response:
+    """Serializar no formato pedido pelo Accept (JSON, compacto ou MessagePack)"""
+
+    media_type = negotiate_media_type(request)
+    return Response(
+        content=response_format.encode(model, media_type),
+        media_type=media_type,
+        headers={"Vary": "Accept"}
+    )
+
+async def _read_payload(request: Request) -> Dict[str, Any]:
+    """Aceitar JSON ou formulário (o frontend envia FormData)"""
+
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("application/json"):
+        payload = await request.json()
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=422, detail="Corpo JSON deve ser um objeto")
+        return payload
+
+    form = await request.form()
+    # Campos vazios do formulário contam como ausentes
+    return {key: value for key, value in form.items() if value != ""}
+
+def _validate(model: Type[ModelT], payload: Dict[str, Any]) -> ModelT:
+    """Validar payload no schema, respondendo 422 no formato do FastAPI"""
+
+    try:
+        return model(**payload)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"loc": error["loc"], "msg": error["msg"]} for error in e.errors()]
+        )
+
+@router.post("/calculate", response_class=Response, responses=negotiated_responses(FireCalculationResponse))
+async def calculate_fire(request: Request):
+    """Calcular projeções FIRE com cache por entradas normalizadas
+
+    O formato segue o Accept: JSON padrão, colunas compactas ou MessagePack.
+    """
+
+    payload = await _read_payload(request)
+    user_id = str(payload.pop("user_id", None) or request.query_params.get("user_id", "default"))
+
+    fire_request = _validate(FireCalculationRequest, payload)
+
+    # O resultado não depende do usuário: requisições iguais compartilham a
+    # entrada (uma por formato de resposta)
+    media_type = negotiate_media_type(request)
+    cache_key = canonical_key("fire:calculate", fire_request, media_type)
+    body = await fire_result_cache.get(cache_key)
+    if body is not None:
+        return cached_response(request, body, "HIT", media_type)
+
+    try:
+        result = await get_fire_calculator().calculate_fire_projections(fire_request, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body = response_format.encode(result, media_type)
+    # Insights de fallback (IA indisponível) não são cacheados: a próxima
+    # requisição tenta a IA de novo
+    if not result.insights_fallback:
+        await fire_result_cache.set(cache_key, body)
+    return cached_response(request, body, "MISS", media_type)
+
+@router.post("/goal-seek", response_model=FireGoalSeekResponse)
+async def goal_seek(request: Request):
+    """Aporte mínimo, gasto máximo ou retorno necessário para FIRE na idade alvo"""
+
+    payload = await _read_payload(request)
+    payload.pop("user_id", None)
+    goal_request = _validate(FireGoalSeekRequest, payload)
+
+    try:
+        return get_fire_calculator().goal_seek(goal_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/projections", response_class=Response, responses=negotiated_responses(FireProjectionResponse))
+async def projections(request: Request):
+    """Projeções anuais (recalculadas por superposição a cada mudança de aporte)
+
+    Accept: application/vnd.fire.compact+json ou application/msgpack devolve
+    as projeções em colunas.
+    """
+
+    payload = await _read_payload(request)
+    payload.pop("user_id", None)
+    projection_request = _validate(FireProjectionRequest, payload)
+
+    try:
+        result = get_fire_calculator().project(projection_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return formatted_response(request, result)
+
+@router.post("/withdrawal-simulation", response_model=WithdrawalSimulationResponse)
+async def withdrawal_simulation(payload: WithdrawalSimulationRequest):
+    """Taxa de retirada sustentável com IR por classe de ativo"""
+
+    try:
+        return get_fire_calculator().simulate_withdrawal_plan(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/backtest", response_model=FireBacktestResponse)
+async def backtest(payload: FireBacktestRequest):
+    """Taxa de falha e pior queda por perfil nas janelas históricas (CDI, IPCA, Ibovespa)"""
+
+    try:
+        return get_fire_calculator().backtest(payload)
+    except FileNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Séries históricas indisponíveis no servidor")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/optimize", response_model=FireOptimization)
+async def optimize(request: Request, grid_size: int = Query(100, ge=10, le=200)):
+    """Sensibilidade do prazo FIRE a gastos, renda e retorno (grade vetorizada)"""
+
+    payload = await _read_payload(request)
+    payload.pop("user_id", None)
+    fire_request = _validate(FireCalculationRequest, payload)
+
+    try:
+        return get_fire_calculator().optimize(fire_request, grid_size=grid_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/scenarios/{user_id}")
+async def get_fire_scenarios(user_id: str, request: Request):
+    """Cenários e perfis de investimento padrão"""
+
+    cache_key = canonical_key("fire:scenarios")
+    body = await fire_result_cache.get(cache_key)
+    cache_status = "HIT"
+
+    if body is None:
+        scenarios = await get_fire_calculator().get_default_scenarios(user_id)
+        body = json.dumps(scenarios, ensure_ascii=False).encode()
+        await fire_result_cache.set(cache_key, body)
+        cache_status = "MISS"
+
+    return cached_response(request, body, cache_status)
+
+@router.get("/cache/stats")
+async def fire_cache_stats():
+    """Estatísticas dos caches de cálculos e insights"""
+
+    return {
+        "results": fire_result_cache.stats(),
+        "insights": fire_insights_cache.stats()
+    }
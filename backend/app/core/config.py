@@ -3,7 +3,7 @@ Configurações da aplicação FIRE Brasil
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -25,11 +25,78 @@ class Settings(BaseSettings):
     
     # Configurações de banco de dados
     DATABASE_URL: str = "sqlite:///./fire_brasil.db"
+    DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 10  # Conexões mantidas abertas (PostgreSQL e SQLite em arquivo)
+    DATABASE_MAX_OVERFLOW: int = 20  # Conexões extras em picos
+    DATABASE_POOL_RECYCLE: int = 1800  # Reciclar conexões após 30 min
+    DATABASE_POOL_TIMEOUT: int = 30  # Espera máxima por conexão (segundos)
     
+    # Perfil de desempenho do SQLite
+    SQLITE_WAL_MODE: bool = True  # WAL + escritor dedicado
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256MB
+    SQLITE_CACHE_SIZE: int = -64000  # Negativo = KiB (~64MB)
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms
+    # Janela curta: cada escritor aguarda o próprio commit, então uma espera
+    # longa só atrasa o lote (5ms custava ~15% das escritas em carga mista)
+    SQLITE_WRITE_BATCH_SIZE: int = 64  # Operações por commit
+    SQLITE_WRITE_BATCH_WINDOW_MS: float = 0.5  # Espera máxima para formar lote
+    
+    # Listagem de despesas
+    EXPENSE_PAGE_SIZE: int = 50
+    EXPENSE_MAX_PAGE_SIZE: int = 200
+    EXPENSE_COUNT_CACHE_TTL: int = 60  # segundos (cache por processo: limite de atraso entre workers)
+    
+    # Consultor financeiro
+    ADVISOR_ANALYSIS_MONTHS: int = 12  # Janela dos insights (mês atual + 11 anteriores)
+    
+    # Cache de cálculos FIRE
+    FIRE_CACHE_TTL: int = 600  # segundos
+    FIRE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # 32MB em memória
+    FIRE_INSIGHTS_CACHE_TTL: int = 24 * 3600  # Insights da IA duram mais que a matemática
+    FIRE_CACHE_DISK_PATH: Optional[str] = None  # Ex.: "cache/fire_cache.db" (compartilhado entre workers)
+    BACKTEST_DATA_PATH: Optional[str] = None  # Padrão: app/data/market_monthly.csv.gz
+
     # Configurações OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: Optional[str] = None  # Ex.: "http://localhost:8089/v1" (servidor simulado de benchmarks)
     OPENAI_MODEL: str = "gpt-4o"
     OPENAI_TEMPERATURE: float = 0.3
+    OPENAI_TIMEOUT: float = 30.0  # segundos por tentativa
+    OPENAI_MAX_RETRIES: int = 3
+    OPENAI_BACKOFF_BASE: float = 0.5  # segundos; dobra a cada tentativa (com jitter)
+    OPENAI_BACKOFF_MAX: float = 8.0
+    OPENAI_MAX_CONCURRENCY: int = 16  # Chamadas simultâneas por modelo
+    OPENAI_MODEL_CONCURRENCY: Dict[str, int] = {}  # Ex.: {"gpt-4o": 8}
+    OPENAI_BREAKER_THRESHOLD: int = 5  # Falhas seguidas para abrir o circuito
+    OPENAI_BREAKER_COOLDOWN: float = 30.0  # segundos até a chamada de teste
+    OPENAI_SINGLE_FLIGHT: bool = True  # Coalescer prompts idênticos em voo
+    
+    # Micro-batching das categorizações individuais (todos os usuários)
+    CATEGORIZATION_BATCHING: bool = True
+    CATEGORIZATION_BATCH_SIZE: int = 20  # Despesas por chamada
+    CATEGORIZATION_BATCH_WINDOW_MS: float = 25.0  # Espera máxima para formar lote
+    
+    # Normalização de estabelecimentos e busca por vizinhos aproximados
+    MERCHANT_INDEX_ENABLED: bool = True
+    MERCHANT_MATCH_THRESHOLD: float = 0.8  # Similaridade de cosseno mínima
+    MERCHANT_EMBEDDING_DIM: int = 256  # Dimensão do vetor de n-gramas
+    MERCHANT_LSH_TABLES: int = 16  # Tabelas de hash (mais tabelas = mais recall)
+    MERCHANT_LSH_BITS: int = 10  # Hiperplanos por tabela (mais bits = buckets menores)
+    
+    # Métricas (/metrics no formato Prometheus)
+    METRICS_ENABLED: bool = True
+    
+    # Profiler por amostragem (perfis em UPLOAD_FOLDER/profiles)
+    PROFILING_ADMIN_TOKEN: Optional[str] = None  # Habilita X-Fire-Profile e /admin/profiles
+    PROFILING_SAMPLE_EVERY: int = 0  # Perfilar 1 em N requisições (0 = desligado)
+    PROFILING_PATH_PREFIXES: List[str] = ["/fire", "/expenses"]
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_MAX_FILES: int = 200
+    
+    # Pré-carregamento das bibliotecas pesadas (importadas sob demanda)
+    PREWARM_IMPORTS: bool = False  # Última etapa do warm-up (/ready espera por ela)
+    PREWARM_MODULES: List[str] = ["openai", "pandas", "pdfplumber", "cv2", "pytesseract", "magic"]
     
     # Configurações de upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -162,6 +229,67 @@ BRAZILIAN_EXPENSE_CATEGORIES = {
     }
 }
 
+# Estabelecimentos conhecidos (chave canônica -> categoria, subcategoria)
+BRAZILIAN_MERCHANTS = {
+    "ifood": ("alimentacao", "delivery"),
+    "rappi": ("alimentacao", "delivery"),
+    "uber eats": ("alimentacao", "delivery"),
+    "ze delivery": ("alimentacao", "bebidas"),
+    "pao de acucar": ("alimentacao", "supermercado"),
+    "carrefour": ("alimentacao", "supermercado"),
+    "assai atacadista": ("alimentacao", "supermercado"),
+    "atacadao": ("alimentacao", "supermercado"),
+    "hortifruti": ("alimentacao", "supermercado"),
+    "mcdonalds": ("alimentacao", "lanche"),
+    "burger king": ("alimentacao", "lanche"),
+    "starbucks": ("alimentacao", "lanche"),
+    "cacau show": ("alimentacao", "doces"),
+    "uber": ("transporte", "uber"),
+    "99 app": ("transporte", "uber"),
+    "cabify": ("transporte", "uber"),
+    "posto ipiranga": ("transporte", "combustivel"),
+    "posto shell": ("transporte", "combustivel"),
+    "posto petrobras": ("transporte", "combustivel"),
+    "sem parar": ("transporte", "pedagio"),
+    "conectcar": ("transporte", "pedagio"),
+    "estapar": ("transporte", "estacionamento"),
+    "metro": ("transporte", "metro"),
+    "drogasil": ("saude", "farmacia"),
+    "droga raia": ("saude", "farmacia"),
+    "drogaria sao paulo": ("saude", "farmacia"),
+    "pague menos": ("saude", "farmacia"),
+    "panvel": ("saude", "farmacia"),
+    "smart fit": ("saude", "academia"),
+    "unimed": ("saude", "plano_saude"),
+    "amil": ("saude", "plano_saude"),
+    "netflix": ("lazer", "streaming"),
+    "spotify": ("lazer", "streaming"),
+    "amazon prime": ("lazer", "streaming"),
+    "disney plus": ("lazer", "streaming"),
+    "globoplay": ("lazer", "streaming"),
+    "cinemark": ("lazer", "cinema"),
+    "ingresso com": ("lazer", "cinema"),
+    "steam": ("lazer", "jogos"),
+    "decolar": ("lazer", "viagem"),
+    "airbnb": ("lazer", "viagem"),
+    "renner": ("vestuario", "roupas"),
+    "riachuelo": ("vestuario", "roupas"),
+    "zara": ("vestuario", "roupas"),
+    "centauro": ("vestuario", "sapatos"),
+    "o boticario": ("vestuario", "cosmeticos"),
+    "natura": ("vestuario", "cosmeticos"),
+    "vivo": ("moradia", "telefone"),
+    "claro": ("moradia", "telefone"),
+    "tim": ("moradia", "telefone"),
+    "enel": ("moradia", "luz"),
+    "cemig": ("moradia", "luz"),
+    "sabesp": ("moradia", "agua"),
+    "comgas": ("moradia", "gas"),
+    "udemy": ("educacao", "curso"),
+    "alura": ("educacao", "curso"),
+    "amazon livros": ("educacao", "livros"),
+}
+
 # Tipos de investimento brasileiros
 BRAZILIAN_INVESTMENT_TYPES = {
     "renda_fixa": {
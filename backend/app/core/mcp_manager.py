@@ -4,15 +4,27 @@ Adaptação do sistema MCP para nossa aplicação
 """
 
 import asyncio
+import importlib
 import json
 import logging
+import time
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
 from app.core.config import settings
+from app.core.metrics import MCP_SECONDS
 
 logger = logging.getLogger(__name__)
 
+# Servidor -> (módulo, classe) do agente; importados no primeiro uso
+# para evitar imports circulares e manter o startup leve
+AGENT_CLASSES = {
+    "document_processor": ("app.agents.document_processor", "DocumentProcessorAgent"),
+    "expense_categorizer": ("app.agents.expense_categorizer", "ExpenseCategorizerAgent"),
+    "fire_calculator": ("app.agents.fire_calculator", "FireCalculatorAgent"),
+    "financial_advisor": ("app.agents.financial_advisor", "FinancialAdvisorAgent"),
+}
+
 @dataclass
 class MCPServer:
     """Configuração de um servidor MCP"""
@@ -28,8 +40,27 @@ class MCPManager:
     
     def __init__(self):
         self.servers: Dict[str, MCPServer] = {}
+        self.agents: Dict[str, Any] = {}
         self.initialized = False
     
+    def get_agent(self, server_name: str) -> Any:
+        """
+        Agente compartilhado do servidor (criado no primeiro uso)
+        
+        Uma instância por servidor: o cliente OpenAI, o pool HTTP e o cache
+        de aprendizado do categorizador são reaproveitados entre chamadas.
+        """
+        agent = self.agents.get(server_name)
+        if agent is None:
+            if server_name not in AGENT_CLASSES:
+                raise ValueError(f"Servidor {server_name} não encontrado")
+            module_name, class_name = AGENT_CLASSES[server_name]
+            agent_class = getattr(importlib.import_module(module_name), class_name)
+            # setdefault: se o warm-up e uma requisição criarem ao mesmo
+            # tempo, todos passam a usar a primeira instância registrada
+            agent = self.agents.setdefault(server_name, agent_class())
+        return agent
+    
     async def initialize(self):
         """Inicializar todos os servidores MCP"""
         try:
@@ -86,7 +117,10 @@ class MCPManager:
             logger.info(f"Iniciando servidor {server_name}...")
             
             # Para nosso caso simplificado, não vamos iniciar processos separados
-            # Vamos simular o comportamento MCP dentro da aplicação
+            # Vamos simular o comportamento MCP dentro da aplicação, com o
+            # agente criado já no startup (fora do event loop: o cliente
+            # OpenAI importa o SDK e monta o contexto SSL)
+            await asyncio.to_thread(self.get_agent, server_name)
             server.status = "running"
             server.process = None  # Placeholder
             
@@ -109,6 +143,13 @@ class MCPManager:
                 server.process.terminate()
                 await server.process.wait()
             
+            # O cliente OpenAI é compartilhado (openai_gateway.close no shutdown);
+            # lotes pendentes do micro-batcher ainda são respondidos
+            agent = self.agents.pop(server_name, None)
+            batcher = getattr(agent, "batcher", None)
+            if batcher is not None:
+                await batcher.stop()
+            
             server.status = "stopped"
             server.process = None
             
@@ -121,6 +162,8 @@ class MCPManager:
     
     async def call_server(self, server_name: str, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Chamar método em servidor MCP"""
+        started = time.perf_counter()
+        status = "ok"
         try:
             if server_name not in self.servers:
                 raise ValueError(f"Servidor {server_name} não encontrado")
@@ -135,17 +178,18 @@ class MCPManager:
             return await self._route_call(server_name, method, params)
             
         except Exception as e:
+            status = type(e).__name__
             logger.error(f"Erro ao chamar {server_name}.{method}: {str(e)}")
             raise
+        finally:
+            MCP_SECONDS.observe(time.perf_counter() - started, server_name, method, status)
     
     async def _route_call(self, server_name: str, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Rotear chamada para agente apropriado"""
+        """Rotear chamada para o agente do pool"""
+        
+        agent = self.get_agent(server_name)
         
-        # Importar agentes dinamicamente para evitar imports circulares
         if server_name == "document_processor":
-            from app.agents.document_processor import DocumentProcessorAgent
-            agent = DocumentProcessorAgent()
-            
             if method == "process_document":
                 return await agent.process_document(
                     params.get("file_path"),
@@ -155,9 +199,6 @@ class MCPManager:
                 return await agent.validate_document(params.get("file_path"))
         
         elif server_name == "expense_categorizer":
-            from app.agents.expense_categorizer import ExpenseCategorizerAgent
-            agent = ExpenseCategorizerAgent()
-            
             if method == "categorize_batch":
                 return await agent.categorize_batch(
                     params.get("expenses"),
@@ -170,9 +211,6 @@ class MCPManager:
                 )
         
         elif server_name == "fire_calculator":
-            from app.agents.fire_calculator import FireCalculatorAgent
-            agent = FireCalculatorAgent()
-            
             if method == "calculate_fire_projections":
                 return await agent.calculate_fire_projections(
                     params.get("request"),
@@ -180,9 +218,6 @@ class MCPManager:
                 )
         
         elif server_name == "financial_advisor":
-            from app.agents.financial_advisor import FinancialAdvisorAgent
-            agent = FinancialAdvisorAgent()
-            
             if method == "generate_dashboard":
                 return await agent.generate_dashboard(params.get("user_id"))
             elif method == "generate_insights":
@@ -241,4 +276,7 @@ class MCPManager:
         """Verificar se servidor está rodando"""
         if server_name not in self.servers:
             return False
-        return self.servers[server_name].status == "running"
\ No newline at end of file
+        return self.servers[server_name].status == "running"
+
+# Instância global
+mcp_manager = MCPManager()
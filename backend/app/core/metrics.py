@@ -0,0 +1,247 @@
+"""
+Métricas de desempenho do FIRE Brasil
+Histogramas e contadores em memória, expostos no formato texto do
+Prometheus em /metrics: tempo por etapa (parse, OCR, LLM, validação,
+categorização, matemática FIRE), latência/tokens/retentativas da OpenAI
+por agente e método, chamadas MCP e requisições HTTP.
+
+Sem dependências externas: cada observação custa um perf_counter, um
+bisect e um incremento sob lock (~1µs).
+"""
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de etapas de CPU (sub-ms) a chamadas de LLM (dezenas de s)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _format_labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Contador monotônico por combinação de rótulos"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{self._format_labels(labels)} {_number(value)}" for labels, value in items)
+        return lines
+
+class Histogram(_Metric):
+    """Histograma com buckets fixos por combinação de rótulos"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # rótulos -> [contagem por bucket (+Inf no fim), soma]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self, *labels: str) -> Optional[Dict[str, float]]:
+        """Contagem e soma de uma série (None se nunca observada)"""
+
+        series = self._series.get(labels)
+        if series is None:
+            return None
+        return {"count": sum(series[0]), "sum": series[1]}
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+
+        for labels, (counts, total) in items:
+            cumulative = 0
+            bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = self._format_labels(labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas em /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS: Histogram = registry.register(Histogram(
+    "fire_stage_duration_seconds", "Duração das etapas internas (parse, ocr, llm, validation, categorize, fire_math)",
+    ["stage"]
+))
+OPENAI_SECONDS: Histogram = registry.register(Histogram(
+    "fire_openai_request_duration_seconds", "Latência das chamadas OpenAI (incluindo retentativas)",
+    ["agent", "method", "status"]
+))
+OPENAI_TOKENS: Counter = registry.register(Counter(
+    "fire_openai_tokens_total", "Tokens consumidos na OpenAI", ["agent", "method", "kind"]
+))
+OPENAI_RETRIES: Counter = registry.register(Counter(
+    "fire_openai_retries_total", "Retentativas feitas pelo gateway OpenAI", ["agent", "method"]
+))
+OPENAI_REJECTED: Counter = registry.register(Counter(
+    "fire_openai_circuit_rejected_total", "Chamadas recusadas com o circuito aberto", ["model"]
+))
+OPENAI_COALESCED: Counter = registry.register(Counter(
+    "fire_openai_coalesced_total", "Chamadas atendidas por um prompt idêntico já em voo", ["agent", "method"]
+))
+MCP_SECONDS: Histogram = registry.register(Histogram(
+    "fire_mcp_call_duration_seconds", "Duração de MCPManager.call_server", ["server", "method", "status"]
+))
+BATCH_SIZE: Histogram = registry.register(Histogram(
+    "fire_microbatch_size", "Itens por lote despachado pelos micro-batchers", ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+))
+MERCHANT_LOOKUPS: Counter = registry.register(Counter(
+    "fire_merchant_lookups_total", "Consultas ao índice de estabelecimentos por resultado (exact, prefix, ann, miss)",
+    ["result"]
+))
+HTTP_SECONDS: Histogram = registry.register(Histogram(
+    "fire_http_request_duration_seconds", "Duração das requisições HTTP por rota", ["method", "route", "status"]
+))
+
+class stage:
+    """
+    Cronometra uma etapa em fire_stage_duration_seconds
+
+    Uso como bloco (`with stage("parse"): ...`) ou decorador de funções
+    síncronas e assíncronas (`@stage("categorize")`).
+    """
+
+    __slots__ = ("name", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._started = 0.0
+
+    def __enter__(self) -> "stage":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_SECONDS.observe(time.perf_counter() - self._started, self.name)
+
+    def __call__(self, function: Callable) -> Callable:
+        name = self.name
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    STAGE_SECONDS.observe(time.perf_counter() - started, name)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, name)
+        return wrapper
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI com a duração das requisições HTTP
+
+    Usa o template da rota (/fire/backtest, não a URL concreta) para manter
+    a cardinalidade baixa; requisições sem rota entram como "unmatched".
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_SECONDS.observe(
+                time.perf_counter() - started,
+                scope["method"], getattr(route, "path", "unmatched"), str(status[0])
+            )
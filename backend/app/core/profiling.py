@@ -0,0 +1,247 @@
+"""
+Profiler por amostragem para requisições em produção
+Ativado por requisição (cabeçalho X-Fire-Profile com o token de admin) ou
+por amostragem de 1 em N nas rotas configuradas. Grava o perfil na pasta
+de uploads em formato speedscope (amostragem de pilhas) ou pstats
+(cProfile determinístico) e informa o arquivo em X-Fire-Profile-Id.
+
+Um perfil por vez: as pilhas amostradas são as da thread do event loop,
+que inclui o handler e os agentes chamados por ele (e, se houver, outras
+requisições concorrentes).
+"""
+
+import asyncio
+import cProfile
+import hmac
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-fire-profile"
+ADMIN_HEADER = "X-Admin-Token"
+SPEEDSCOPE = "speedscope"
+PSTATS = "pstats"
+EXTENSIONS = {SPEEDSCOPE: ".speedscope.json", PSTATS: ".pstats"}
+
+FrameKey = Tuple[str, str, int]
+
+def profiles_dir() -> str:
+    return os.path.join(settings.UPLOAD_FOLDER, "profiles")
+
+def is_admin(token: Optional[str]) -> bool:
+    """Token de admin configurado e igual ao informado (comparação em tempo constante)"""
+
+    expected = settings.PROFILING_ADMIN_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+class StackSampler:
+    """Amostra a pilha de uma thread em intervalo fixo (sys._current_frames)"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames: List[FrameKey] = []
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self._index: Dict[FrameKey, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fire-profiler", daemon=True)
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.frames)
+            self.frames.append(key)
+        return index
+
+    def _run(self):
+        previous = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()  # speedscope: raiz primeiro
+
+            self.samples.append(stack)
+            self.weights.append(now - previous)
+            previous = now
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Documento no formato de arquivo do speedscope (perfil "sampled")"""
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "fire-brasil",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": filename, "line": line}
+                    for function, filename, line in self.frames
+                ]
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.elapsed,
+                "samples": self.samples,
+                "weights": self.weights
+            }]
+        }
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila requisições selecionadas
+
+    Cabeçalho `X-Fire-Profile: <token>` (ou `<token>;pstats`) perfila a
+    requisição; PROFILING_SAMPLE_EVERY=N perfila 1 em cada N requisições
+    das rotas em PROFILING_PATH_PREFIXES.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.prefixes = tuple(settings.PROFILING_PATH_PREFIXES)
+        self.sample_every = settings.PROFILING_SAMPLE_EVERY
+        self._counter = itertools.count(1)
+        self._active = False
+
+    def _requested_format(self, scope) -> Optional[str]:
+        if not scope["path"].startswith(self.prefixes):
+            return None
+
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                token, _, mode = value.decode("latin-1").partition(";")
+                if is_admin(token.strip()):
+                    return PSTATS if mode.strip() == PSTATS else SPEEDSCOPE
+                return None
+
+        if self.sample_every > 0 and next(self._counter) % self.sample_every == 0:
+            return SPEEDSCOPE
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+
+        profile_format = self._requested_format(scope)
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}_{scope['method']}_{slug}"
+        filename = name + EXTENSIONS[profile_format]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-fire-profile-id", filename.encode())]
+            await send(message)
+
+        self._active = True
+        profiler = None
+        sampler = None
+        if profile_format == PSTATS:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+            sampler.start()
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            else:
+                sampler.stop()
+            self._active = False
+
+            try:
+                await asyncio.to_thread(_write_profile, filename, name, profiler, sampler)
+            except Exception as e:
+                logger.error(f"Erro ao gravar perfil {filename}: {str(e)}")
+
+def _write_profile(filename: str, name: str, profiler: Optional[cProfile.Profile],
+                   sampler: Optional[StackSampler]):
+    directory = profiles_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+
+    if profiler is not None:
+        profiler.dump_stats(path)
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(sampler.speedscope(name), file)
+
+    _prune(directory)
+    logger.info(f"Perfil gravado em {path}")
+
+def _prune(directory: str):
+    """Mantém apenas os PROFILING_MAX_FILES perfis mais recentes"""
+
+    profiles = list_profiles()
+    for profile in profiles[settings.PROFILING_MAX_FILES:]:
+        os.remove(os.path.join(directory, profile["name"]))
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Perfis gravados, do mais recente ao mais antigo"""
+
+    directory = profiles_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for entry in os.scandir(directory):
+        profile_format = next((fmt for fmt, ext in EXTENSIONS.items() if entry.name.endswith(ext)), None)
+        if profile_format is None or not entry.is_file():
+            continue
+        stat = entry.stat()
+        profiles.append({
+            "name": entry.name,
+            "format": profile_format,
+            "size": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat()
+        })
+    profiles.sort(key=lambda profile: profile["name"], reverse=True)
+    return profiles
+
+def profile_path(name: str) -> Optional[str]:
+    """Caminho de um perfil listado (None para nomes desconhecidos)"""
+
+    if name not in {profile["name"] for profile in list_profiles()}:
+        return None
+    return os.path.join(profiles_dir(), name)
@@ -1,12 +1,27 @@
 """
-FIRE Brasil App - Backend Principal (Versão Minimal)
+FIRE Brasil App - Backend Principal
 Sistema de controle financeiro pessoal para independência financeira
 """
 
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
-import os
+import asyncio
+import logging
+import time
+
+from app.api import admin, expenses, fire
+from app.core.config import settings
+from app.core import metrics, profiling
+from app.core.mcp_manager import mcp_manager
+from app.services.cache import close_caches, open_caches
+from app.services.database import close_database, init_database
+from app.services.openai_gateway import openai_gateway
+from app.utils.lazy_import import prewarm
+
+logger = logging.getLogger(__name__)
 
 # Configuração básica
 ALLOWED_ORIGINS = [
@@ -15,25 +30,90 @@ ALLOWED_ORIGINS = [
     "https://*.vercel.app"
 ]
 
-# Inicializar aplicação
-app = FastAPI(
-    title="FIRE Brasil API",
-    description="API para controle financeiro pessoal e independência financeira",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Configurar CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
+class WarmupState:
+    """Progresso do warm-up reportado em /ready"""
+
+    # Etapas sem as quais a aplicação não deve receber tráfego
+    REQUIRED = ("database", "mcp")
+
+    def __init__(self, enabled: bool):
+        self.steps = {
+            "database": "pending",
+            "caches": "pending",
+            "mcp": "pending",
+            "imports": "pending" if settings.PREWARM_IMPORTS else "skipped",
+        }
+        if not enabled:
+            self.steps = {step: "skipped" for step in self.steps}
+        self.started_at = time.perf_counter()
+        self.duration = 0.0 if not enabled else None
+
+    @property
+    def done(self) -> bool:
+        return all(status != "pending" for status in self.steps.values())
+
+    @property
+    def ready(self) -> bool:
+        return self.done and all(self.steps[step] in ("ok", "skipped") for step in self.REQUIRED)
+
+async def _prewarm_imports():
+    await asyncio.to_thread(prewarm, settings.PREWARM_MODULES)
+
+async def _warm_caches():
+    purged = await open_caches()
+    if purged:
+        logger.info(f"{purged} entradas expiradas removidas do cache em disco")
+
+async def warm_up(state: WarmupState):
+    """Inicializar banco, caches, agentes (pools MCP) e bibliotecas pesadas"""
+
+    steps = (
+        ("database", init_database),
+        ("caches", _warm_caches),
+        ("mcp", mcp_manager.initialize),
+        ("imports", _prewarm_imports),
+    )
+    for step, run in steps:
+        if state.steps[step] == "skipped":
+            continue
+        try:
+            await run()
+            state.steps[step] = "ok"
+        except Exception as e:
+            state.steps[step] = "failed"
+            logger.error(f"❌ Warm-up falhou em {step}: {str(e)}")
+
+    state.duration = time.perf_counter() - state.started_at
+    logger.info(f"✅ Warm-up concluído em {state.duration:.2f}s ({state.steps})")
+
+def create_lifespan(run_warm_up: bool):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        state = app.state.warmup = WarmupState(run_warm_up)
+
+        # O warm-up roda em segundo plano: /health responde de imediato e
+        # /ready passa a 200 quando tudo estiver carregado
+        task = asyncio.create_task(warm_up(state)) if run_warm_up else None
+        try:
+            yield
+        finally:
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+            await mcp_manager.cleanup()
+            await openai_gateway.close()
+            await close_database()
+            await close_caches()
+            logger.info("Aplicação finalizada")
+
+    return lifespan
+
+# Endpoints de sistema
+system_router = APIRouter()
+
+@system_router.get("/")
 async def root():
     """Endpoint raiz"""
     return {
@@ -43,20 +123,95 @@ async def root():
         "timestamp": datetime.now().isoformat()
     }
 
-@app.get("/health")
+@system_router.get("/health")
 async def health_check():
-    """Verificação de saúde da API"""
+    """Verificação de saúde da API (processo no ar)"""
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat()
     }
 
+@system_router.get("/ready")
+async def readiness_check(request: Request):
+    """Prontidão: 200 após o warm-up; 503 enquanto carrega ou se uma etapa essencial falhou"""
+    state: WarmupState = request.app.state.warmup
+
+    if state.ready:
+        status = "ready"
+    elif state.done:
+        status = "failed"
+    else:
+        status = "warming_up"
+
+    return JSONResponse(
+        status_code=200 if state.ready else 503,
+        content={
+            "status": status,
+            "steps": state.steps,
+            "warmup_seconds": round(state.duration, 3) if state.duration is not None else None,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+@system_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Métricas no formato texto do Prometheus"""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 # Endpoints básicos de teste
-@app.get("/test")
+@system_router.get("/test")
 async def test_endpoint():
     """Endpoint de teste"""
     return {"message": "API funcionando!", "status": "ok"}
 
+def create_app(run_warm_up: bool = True) -> FastAPI:
+    """
+    Criar a aplicação
+
+    Args:
+        run_warm_up: Inicializar banco, caches e agentes no startup. Sem
+            warm-up (main_minimal) tudo é criado sob demanda na primeira
+            requisição e /ready responde 200 imediatamente.
+    """
+    application = FastAPI(
+        title="FIRE Brasil API",
+        description="API para controle financeiro pessoal e independência financeira",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=create_lifespan(run_warm_up)
+    )
+
+    # Configurar CORS
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Métricas de latência por rota (ASGI puro, sem BaseHTTPMiddleware)
+    if settings.METRICS_ENABLED:
+        application.add_middleware(metrics.MetricsMiddleware)
+
+    # Profiler opt-in (cabeçalho de admin ou 1 em N requisições)
+    if settings.PROFILING_ADMIN_TOKEN or settings.PROFILING_SAMPLE_EVERY > 0:
+        application.add_middleware(profiling.ProfilingMiddleware)
+
+    # Rotas
+    application.include_router(system_router)
+    application.include_router(expenses.router)
+    application.include_router(fire.router)
+    application.include_router(admin.router)
+
+    return application
+
+# Inicializar aplicação
+app = create_app()
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
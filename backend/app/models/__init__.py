@@ -0,0 +1 @@
+# Models package
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Modelos de banco de dados para expenses (gastos/despesas)
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON, BigInteger, Column, Date, DateTime, Float, ForeignKey, Index, Integer,
+    Numeric, String, Text
+)
+
+from app.services.database import Base
+
+class Expense(Base):
+    """Despesa ou receita de um usuário"""
+
+    __tablename__ = "expenses"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(64), nullable=False)
+    date = Column(Date, nullable=False)
+    description = Column(String(255), nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    type = Column(String(16), nullable=False, default="expense")
+    category = Column(String(32))
+    subcategory = Column(String(100))
+    payment_method = Column(String(32))
+    tags = Column(JSON, default=list)
+    notes = Column(String(500))
+
+    # Dados da IA
+    ai_confidence = Column(Float)
+    ai_suggested_category = Column(String(32))
+    ai_reasoning = Column(Text)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, onupdate=datetime.now)
+
+    __table_args__ = (
+        # Ordenação/paginação por (date, id) e filtros mais comuns
+        Index("ix_expenses_user_date", "user_id", "date", "id"),
+        Index("ix_expenses_user_category_date", "user_id", "category", "date", "id"),
+        Index("ix_expenses_user_payment_date", "user_id", "payment_method", "date", "id"),
+        Index("ix_expenses_user_amount", "user_id", "amount"),
+    )
+
+class ExpenseTag(Base):
+    """Tags de despesas em tabela própria para filtros indexados"""
+
+    __tablename__ = "expense_tags"
+
+    expense_id = Column(
+        Integer, ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True
+    )
+    tag = Column(String(50), primary_key=True)
+    user_id = Column(String(64), nullable=False)
+
+    __table_args__ = (
+        Index("ix_expense_tags_user_tag", "user_id", "tag", "expense_id"),
+    )
+
+class ExpenseMonthlyRollup(Base):
+    """Agregado mensal por (usuário, mês, tipo, categoria, método de pagamento)
+
+    Mantido incrementalmente a cada inserção, atualização e remoção de
+    despesas. Valores em centavos para que as somas sejam exatas também
+    no SQLite, que guarda NUMERIC como ponto flutuante.
+    """
+
+    __tablename__ = "expense_monthly_rollups"
+
+    user_id = Column(String(64), primary_key=True)
+    month = Column(String(7), primary_key=True)  # YYYY-MM
+    type = Column(String(16), primary_key=True)
+    category = Column(String(32), primary_key=True)  # "" = sem categoria (exibido como "outros")
+    payment_method = Column(String(32), primary_key=True)  # "" = não informado ("nao_informado")
+
+    total_cents = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    min_cents = Column(BigInteger, nullable=False)
+    max_cents = Column(BigInteger, nullable=False)
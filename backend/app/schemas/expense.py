@@ -4,7 +4,7 @@ Schemas para expenses (gastos/despesas)
 
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime, date
+from datetime import datetime, date as date_type
 from decimal import Decimal
 from enum import Enum
 
@@ -34,9 +34,14 @@ class PaymentMethod(str, Enum):
     BOLETO = "boleto"
     TRANSFERENCIA = "transferencia"
 
+# Rótulos usados nas agregações para despesas sem categoria ou sem método
+# de pagamento (no banco, o rollup guarda "" nesses casos)
+UNCATEGORIZED = ExpenseCategory.OUTROS.value
+UNSPECIFIED_PAYMENT_METHOD = "nao_informado"
+
 class ExpenseBase(BaseModel):
     """Base para expense"""
-    date: date = Field(..., description="Data da despesa")
+    date: date_type = Field(..., description="Data da despesa")
     description: str = Field(..., min_length=1, max_length=255, description="Descrição da despesa")
     amount: Decimal = Field(..., gt=0, description="Valor da despesa")
     type: ExpenseType = Field(default=ExpenseType.EXPENSE, description="Tipo da transação")
@@ -66,7 +71,7 @@ class ExpenseCreate(ExpenseBase):
 
 class ExpenseUpdate(BaseModel):
     """Schema para atualização de expense"""
-    date: Optional[date] = None
+    date: Optional[date_type] = None
     description: Optional[str] = Field(None, min_length=1, max_length=255)
     amount: Optional[Decimal] = Field(None, gt=0)
     type: Optional[ExpenseType] = None
@@ -124,8 +129,8 @@ class ExpenseStats(BaseModel):
 
 class ExpenseFilter(BaseModel):
     """Filtros para consulta de despesas"""
-    start_date: Optional[date] = Field(None, description="Data inicial")
-    end_date: Optional[date] = Field(None, description="Data final")
+    start_date: Optional[date_type] = Field(None, description="Data inicial")
+    end_date: Optional[date_type] = Field(None, description="Data final")
     category: Optional[ExpenseCategory] = Field(None, description="Categoria")
     subcategory: Optional[str] = Field(None, description="Subcategoria")
     payment_method: Optional[PaymentMethod] = Field(None, description="Método de pagamento")
@@ -158,6 +163,14 @@ class ExpenseList(BaseModel):
     page: int = Field(..., description="Página atual")
     per_page: int = Field(..., description="Itens por página")
     pages: int = Field(..., description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (paginação por chave)")
+    
+class ExpenseSearchHit(BaseModel):
+    """Resultado da busca textual de despesas"""
+    expense: ExpenseResponse = Field(..., description="Despesa encontrada")
+    rank: float = Field(..., description="Relevância (maior = mais relevante)")
+    highlight: Optional[str] = Field(None, description="Descrição com os termos destacados (HTML)")
+    notes_highlight: Optional[str] = Field(None, description="Notas com os termos destacados (HTML)")
     
 class ExpenseImportResult(BaseModel):
     """Resultado da importação de despesas"""
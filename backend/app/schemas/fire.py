@@ -58,6 +58,97 @@ class FireCalculationRequest(BaseModel):
             raise ValueError('Idade alvo deve ser maior que idade atual')
         return v
 
+class GoalSeekTarget(str, Enum):
+    """Variável resolvida no goal seek"""
+    MONTHLY_CONTRIBUTION = "monthly_contribution"  # Aporte mínimo
+    MONTHLY_EXPENSES = "monthly_expenses"          # Gasto máximo
+    EXPECTED_RETURN = "expected_return"            # Retorno necessário
+
+class FireGoalSeekRequest(FireCalculationRequest):
+    """Request para goal seek: o que é preciso para FIRE na idade alvo"""
+    
+    target_age: int = Field(..., ge=30, le=80, description="Idade alvo para aposentadoria")
+    solve_for: GoalSeekTarget = Field(default=GoalSeekTarget.MONTHLY_CONTRIBUTION, description="Variável a resolver")
+    monthly_contribution: Optional[Decimal] = Field(None, ge=0, description="Aporte mensal (padrão: renda - gastos)")
+
+class FireGoalSeekResponse(BaseModel):
+    """Resultado do goal seek"""
+    solve_for: GoalSeekTarget = Field(..., description="Variável resolvida")
+    target_age: int = Field(..., description="Idade alvo")
+    months_to_target: int = Field(..., description="Meses até a idade alvo")
+    feasible: bool = Field(..., description="Meta viável com a renda atual")
+    fire_number: Decimal = Field(..., description="Número FIRE")
+    monthly_contribution: Decimal = Field(..., description="Aporte mensal")
+    monthly_expenses: Decimal = Field(..., description="Gastos mensais")
+    expected_return: Decimal = Field(..., description="Retorno anual nominal (decimal)")
+    real_return: Decimal = Field(..., description="Retorno anual real (decimal)")
+    savings_rate: Decimal = Field(..., description="Taxa de poupança (%)")
+    evaluations: int = Field(..., description="Avaliações da função de acumulação")
+    message: Optional[str] = Field(None, description="Observações sobre a solução")
+
+class TaxRegime(str, Enum):
+    """Regime de tributação de uma classe de ativo"""
+    REGRESSIVO = "regressivo"  # Tesouro Direto, CDB: tabela regressiva de IR
+    ISENTO = "isento"          # LCI/LCA, poupança
+    COME_COTAS = "come_cotas"  # Fundos: antecipação semestral de IR
+    ACOES = "acoes"            # Ações: 15%, isenção até R$ 20 mil/mês em vendas
+
+class WithdrawalBucket(BaseModel):
+    """Classe de ativo da carteira na fase de retiradas"""
+    name: str = Field(..., description="Nome (ex.: Tesouro IPCA+, LCI)")
+    tax_regime: TaxRegime = Field(..., description="Regime de tributação")
+    amount: Decimal = Field(..., ge=0, description="Saldo atual")
+    cost_basis: Optional[Decimal] = Field(None, ge=0, description="Valor aplicado (padrão: saldo atual)")
+    annual_return: Decimal = Field(..., gt=-1, le=1, description="Retorno bruto anual nominal (decimal)")
+    holding_days: int = Field(default=721, ge=0, description="Dias desde a aplicação")
+
+class WithdrawalSimulationRequest(BaseModel):
+    """Request para simulação de retiradas com IR"""
+    buckets: List[WithdrawalBucket] = Field(..., min_items=1, max_items=20, description="Classes de ativo")
+    monthly_withdrawal: Optional[Decimal] = Field(None, gt=0, description="Saque líquido mensal (valores de hoje)")
+    years: int = Field(default=30, ge=1, le=60, description="Horizonte de retiradas")
+    inflation_rate: Optional[Decimal] = Field(None, description="Inflação anual (IPCA)")
+    start_month: Optional[int] = Field(None, ge=1, le=12, description="Mês do primeiro saque (padrão: mês atual)")
+
+class WithdrawalSimulationResponse(BaseModel):
+    """Taxa de retirada sustentável após impostos"""
+    total_amount: Decimal = Field(..., description="Patrimônio inicial")
+    sustainable_withdrawal_rate: Decimal = Field(..., description="Taxa anual líquida sustentável (decimal)")
+    sustainable_monthly_withdrawal: Decimal = Field(..., description="Saque líquido mensal sustentável")
+    implied_fire_multiplier: Decimal = Field(..., description="Patrimônio / gastos anuais implícito")
+    flat_tax_multiplier: Decimal = Field(..., description="Multiplicador da aproximação 25x * 1,15")
+    
+    # Preenchidos quando monthly_withdrawal é informado
+    depleted_after_months: Optional[int] = Field(None, description="Mês em que o patrimônio se esgota")
+    final_balance: Optional[Decimal] = Field(None, description="Saldo ao fim do horizonte")
+    total_taxes: Optional[Decimal] = Field(None, description="IR total pago")
+    effective_tax_rate: Optional[Decimal] = Field(None, description="IR / saques brutos (decimal)")
+
+class FireBacktestRequest(BaseModel):
+    """Request para backtest histórico da fase de retiradas"""
+    withdrawal_rate: Decimal = Field(default=Decimal("0.04"), gt=0, le=Decimal("0.2"), description="Taxa anual de retirada (decimal)")
+    years: int = Field(default=30, ge=5, le=50, description="Duração das retiradas")
+    start_month: str = Field(default="1994-07", pattern=r"^\d{4}-\d{2}$", description="Primeiro mês do histórico (AAAA-MM)")
+
+class FireBacktestProfileResult(BaseModel):
+    """Resultado do backtest para um perfil de investimento"""
+    equity_weight: Decimal = Field(..., description="Fração em renda variável")
+    windows: int = Field(..., description="Janelas históricas avaliadas")
+    failure_rate: Decimal = Field(..., description="Fração de janelas que esgotaram o patrimônio")
+    worst_drawdown: Decimal = Field(..., description="Maior queda real do patrimônio (decimal)")
+    worst_start_month: str = Field(..., description="Mês inicial da pior janela")
+    safe_withdrawal_rate: Decimal = Field(..., description="Maior taxa que sobreviveu a todas as janelas")
+    median_ending_real_balance: Decimal = Field(..., description="Saldo real final mediano (múltiplo do inicial)")
+
+class FireBacktestResponse(BaseModel):
+    """Backtest histórico por perfil"""
+    withdrawal_rate: Decimal = Field(..., description="Taxa anual de retirada")
+    years: int = Field(..., description="Duração das retiradas")
+    data_start: str = Field(..., description="Primeiro mês do histórico")
+    data_end: str = Field(..., description="Último mês do histórico")
+    profiles: Dict[str, FireBacktestProfileResult] = Field(..., description="Resultados por perfil")
+    sample_data: bool = Field(False, description="Calculado sobre a série sintética de exemplo (dados reais não instalados)")
+
 class FireProjection(BaseModel):
     """Projeção FIRE"""
     year: int = Field(..., description="Ano")
@@ -67,6 +158,19 @@ class FireProjection(BaseModel):
     annual_return: Decimal = Field(..., description="Retorno anual")
     inflation_adjusted: Decimal = Field(..., description="Valor corrigido pela inflação")
     
+class FireProjectionRequest(FireCalculationRequest):
+    """Request para projeções com aporte/horizonte opcionais"""
+    
+    monthly_contribution: Optional[Decimal] = Field(None, ge=0, description="Aporte mensal (padrão: calculado)")
+    years: Optional[int] = Field(None, ge=1, le=60, description="Anos projetados (padrão: até o FIRE)")
+
+class FireProjectionResponse(BaseModel):
+    """Projeções anuais"""
+    fire_number: Decimal = Field(..., description="Número FIRE")
+    years: int = Field(..., description="Anos projetados")
+    monthly_contribution: Decimal = Field(..., description="Aporte mensal")
+    projections: List[FireProjection] = Field(..., description="Projeções anuais")
+    
 class FireCalculationResponse(BaseModel):
     """Resposta do cálculo FIRE"""
     
@@ -89,6 +193,9 @@ class FireCalculationResponse(BaseModel):
     # Insights
     insights: List[str] = Field(..., description="Insights e recomendações")
     warnings: List[str] = Field(..., description="Alertas e considerações")
+    
+    # Uso interno (fora da resposta): insights por regras, sem a IA
+    insights_fallback: bool = Field(False, exclude=True, description="Insights gerados pelo fallback")
 
 class FireScenarioComparison(BaseModel):
     """Comparação entre cenários FIRE"""
@@ -0,0 +1,245 @@
+"""
+Cache de respostas
+LRU em memória com TTL e limite de bytes, com armazenamento opcional em
+SQLite para compartilhar resultados entre workers. O SQLite é aberto no
+lifespan da aplicação e acessado fora do event loop (asyncio.to_thread).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _canonical(value: Any) -> Any:
+    """Normalizar valores para que entradas equivalentes gerem o mesmo hash"""
+
+    if isinstance(value, Decimal):
+        # "10000", "10000.0" e "1E+4" viram o mesmo texto
+        return format(value.normalize(), "f")
+    if isinstance(value, float):
+        return format(Decimal(repr(value)).normalize(), "f")
+    if isinstance(value, BaseModel):
+        return _canonical(value.model_dump())
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return getattr(value, "value", value)
+
+def canonical_key(namespace: str, *parts: Any) -> str:
+    """Hash SHA-256 da forma canônica das partes (modelos já validados)"""
+
+    payload = json.dumps([_canonical(part) for part in parts], sort_keys=True, separators=(",", ":"))
+    return f"{namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+class DiskCacheStore:
+    """Armazenamento em SQLite compartilhado entre processos
+
+    Métodos bloqueantes: chamar via asyncio.to_thread. A conexão é usada
+    por várias threads, então cada operação segura um lock.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def set(self, key: str, value: bytes, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def clear(self, prefix: str = ""):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ResponseCache:
+    """LRU em memória limitado por bytes, com TTL por entrada
+
+    Valores são bytes já serializados, então o tamanho contabilizado é
+    exatamente o que fica em memória (mais a chave).
+    """
+
+    def __init__(self, name: str, ttl: int, max_bytes: int,
+                 disk_store: Optional[DiskCacheStore] = None):
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_store = disk_store
+
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        now = time.time()
+
+        if entry is not None:
+            if entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._discard(key)
+
+        disk_store = self.disk_store
+        if disk_store is not None:
+            try:
+                stored = await asyncio.to_thread(disk_store.get, self._disk_key(key))
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao ler cache em disco ({self.name}): {str(e)}")
+                stored = None
+
+            if stored is not None:
+                self._store(key, *stored)
+                self.hits += 1
+                return stored[0]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        self._store(key, value, expires_at)
+
+        disk_store = self.disk_store
+        if disk_store is not None:
+            try:
+                await asyncio.to_thread(disk_store.set, self._disk_key(key), value, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao gravar cache em disco ({self.name}): {str(e)}")
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        value = await self.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set_json(self, key: str, value: Any, ttl: Optional[int] = None):
+        await self.set(key, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(), ttl)
+
+    async def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        disk_store = self.disk_store
+        if disk_store is not None:
+            await asyncio.to_thread(disk_store.clear, self._disk_key(""))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk": self.disk_store.path if self.disk_store else None
+        }
+
+    def _disk_key(self, key: str) -> str:
+        """Chaves em disco prefixadas pelo nome (o arquivo é compartilhado)"""
+        return f"{self.name}|{key}"
+
+    def _store(self, key: str, value: bytes, expires_at: float):
+        size = len(value) + len(key)
+        if size > self.max_bytes:
+            return
+
+        self._discard(key)
+        self._entries[key] = (value, expires_at)
+        self._bytes += size
+
+        # Remover as entradas menos usadas até caber no limite
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0]) + len(key)
+
+# Instâncias globais (o armazenamento em disco é ligado por open_caches)
+fire_result_cache = ResponseCache("fire_results", settings.FIRE_CACHE_TTL, settings.FIRE_CACHE_MAX_BYTES)
+fire_insights_cache = ResponseCache(
+    "fire_insights", settings.FIRE_INSIGHTS_CACHE_TTL, settings.FIRE_CACHE_MAX_BYTES // 4
+)
+
+SHARED_CACHES = (fire_result_cache, fire_insights_cache)
+
+async def open_caches() -> int:
+    """Abrir o cache em disco de FIRE_CACHE_DISK_PATH e remover entradas expiradas (startup)
+
+    Returns:
+        Número de entradas expiradas removidas
+    """
+
+    if not settings.FIRE_CACHE_DISK_PATH or fire_result_cache.disk_store is not None:
+        return 0
+
+    try:
+        store = await asyncio.to_thread(DiskCacheStore, settings.FIRE_CACHE_DISK_PATH)
+        purged = await asyncio.to_thread(store.purge_expired)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Cache em disco indisponível: {str(e)}")
+        return 0
+
+    for cache in SHARED_CACHES:
+        cache.disk_store = store
+    return purged
+
+async def close_caches():
+    """Desligar e fechar o cache em disco (shutdown)"""
+
+    store = fire_result_cache.disk_store
+    for cache in SHARED_CACHES:
+        cache.disk_store = None
+
+    if store is not None:
+        await asyncio.to_thread(store.close)
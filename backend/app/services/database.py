@@ -2,74 +2,256 @@
 Serviços de banco de dados
 """
 
-import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+)
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.services.db_writer import BatchedWriter, WriteOperation
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Drivers assíncronos usados para cada backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def build_async_url(database_url: str) -> str:
+    """Converter URL síncrona (sqlite://, postgresql://) para o driver assíncrono"""
+
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+
+    # URL já aponta para um driver explícito (ex: postgresql+asyncpg)
+    if "+" in url.drivername or backend not in ASYNC_DRIVERS:
+        return url.render_as_string(hide_password=False)
+
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """PRAGMAs do perfil de desempenho do SQLite"""
+
+    pragmas: Dict[str, Any] = {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "foreign_keys": "ON",
+    }
+
+    if settings.SQLITE_WAL_MODE:
+        pragmas.update({
+            "journal_mode": "WAL",
+            "synchronous": settings.SQLITE_SYNCHRONOUS,
+            "mmap_size": settings.SQLITE_MMAP_SIZE,
+            "cache_size": settings.SQLITE_CACHE_SIZE,
+            "temp_store": "MEMORY",
+        })
+
+    return pragmas
+
+def configure_sqlite_engine(engine: AsyncEngine, pragmas: Dict[str, Any]):
+    """Aplicar PRAGMAs em cada nova conexão SQLite do engine"""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 class DatabaseService:
     """Serviço de banco de dados"""
-    
+
     def __init__(self):
-        self.engine = None
-        self.SessionLocal = None
-    
-    def initialize(self):
+        self.engine: AsyncEngine = None
+        self.SessionLocal: async_sessionmaker = None
+        self.writer: Optional[BatchedWriter] = None
+
+    @property
+    def is_sqlite(self) -> bool:
+        """Verificar se o banco configurado é SQLite"""
+        return self.engine is not None and self.engine.dialect.name == "sqlite"
+
+    def _engine_options(self, url: str) -> Dict[str, Any]:
+        """Opções do engine de acordo com o backend"""
+
+        options: Dict[str, Any] = {
+            "echo": settings.DATABASE_ECHO,
+            "pool_pre_ping": True,
+        }
+
+        parsed = make_url(url)
+        if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+            # SQLite em memória usa StaticPool (uma conexão compartilhada),
+            # que não aceita opções de tamanho
+            return options
+
+        options.update({
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        })
+        return options
+
+    async def initialize(self):
         """Inicializar banco de dados"""
-        
-        self.engine = create_engine(
-            settings.DATABASE_URL,
-            connect_args={"check_same_thread": False}  # SQLite only
-        )
-        
-        self.SessionLocal = sessionmaker(
-            autocommit=False,
+
+        if self.engine is not None:
+            return
+
+        url = build_async_url(settings.DATABASE_URL)
+        self.engine = create_async_engine(url, **self._engine_options(url))
+
+        if self.is_sqlite:
+            configure_sqlite_engine(self.engine, sqlite_pragmas())
+
+        self.SessionLocal = async_sessionmaker(
+            bind=self.engine,
             autoflush=False,
-            bind=self.engine
+            expire_on_commit=False
         )
-        
-        # Criar tabelas
-        Base.metadata.create_all(bind=self.engine)
-        
-        logger.info("Banco de dados inicializado")
-    
-    def get_session(self):
+
+        # Criar tabelas (modelos registrados no metadata ao fim deste módulo)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+            if self.is_sqlite:
+                from app.services.expense_search import expense_search_service
+                await expense_search_service.install(conn)
+
+        # Com WAL, leituras seguem em paralelo e as escritas passam por
+        # um único escritor com commits em lote
+        if self.is_sqlite and settings.SQLITE_WAL_MODE:
+            self.writer = BatchedWriter(
+                self.SessionLocal,
+                batch_size=settings.SQLITE_WRITE_BATCH_SIZE,
+                batch_window_ms=settings.SQLITE_WRITE_BATCH_WINDOW_MS
+            )
+            await self.writer.start()
+
+        logger.info(f"Banco de dados inicializado ({self.engine.dialect.name})")
+
+    async def get_session(self) -> AsyncSession:
         """Obter sessão do banco"""
-        
+
         if not self.SessionLocal:
-            self.initialize()
-        
+            await self.initialize()
+
         return self.SessionLocal()
 
+    async def write(self, operation: WriteOperation) -> Any:
+        """Executar operação de escrita e fazer commit
+
+        Com o escritor dedicado ativo, a operação entra no próximo lote;
+        caso contrário roda em sessão própria.
+        """
+
+        if not self.SessionLocal:
+            await self.initialize()
+
+        if self.writer is not None and self.writer.running:
+            return await self.writer.submit(operation)
+
+        async with self.SessionLocal() as session:
+            result = await operation(session)
+            await session.commit()
+            return result
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """Métricas de utilização do pool de conexões"""
+
+        if self.engine is None:
+            return {"initialized": False}
+
+        pool = self.engine.pool
+        status: Dict[str, Any] = {
+            "initialized": True,
+            "dialect": self.engine.dialect.name,
+            "pool_class": type(pool).__name__,
+        }
+
+        if isinstance(pool, QueuePool):
+            size = pool.size()
+            checked_out = pool.checkedout()
+            overflow = max(pool.overflow(), 0)
+            capacity = size + max(settings.DATABASE_MAX_OVERFLOW, 0)
+
+            status.update({
+                "size": size,
+                "checked_in": pool.checkedin(),
+                "checked_out": checked_out,
+                "overflow": overflow,
+                "capacity": capacity,
+                "utilization": round(checked_out / capacity, 4) if capacity > 0 else 0.0,
+            })
+
+        if self.writer is not None:
+            status["writer"] = {
+                "running": self.writer.running,
+                "batches_committed": self.writer.batches_committed,
+                "operations_committed": self.writer.operations_committed,
+            }
+
+        return status
+
+    async def close(self):
+        """Encerrar conexões do pool"""
+
+        if self.writer is not None:
+            await self.writer.stop()
+            self.writer = None
+
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+            self.SessionLocal = None
+            logger.info("Conexões do banco de dados encerradas")
+
 # Instância global
 db_service = DatabaseService()
 
 async def init_database():
     """Inicializar banco de dados assíncrono"""
-    
+
     try:
-        db_service.initialize()
+        await db_service.initialize()
         logger.info("✅ Banco de dados inicializado com sucesso")
         return True
-        
+
     except Exception as e:
         logger.error(f"❌ Erro ao inicializar banco: {str(e)}")
         raise
 
-def get_db():
-    """Dependency para obter sessão do banco"""
-    
-    db = db_service.get_session()
+async def close_database():
+    """Encerrar banco de dados"""
+
+    await db_service.close()
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Dependency para obter sessão do banco
+
+    Commit ao final da requisição; rollback se o handler levantar exceção.
+    """
+
+    db = await db_service.get_session()
     try:
         yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
     finally:
-        db.close()
\ No newline at end of file
+        await db.close()
+
+# Registrar modelos no metadata; fica no fim porque os modelos importam Base
+import app.models.expense  # noqa: E402,F401
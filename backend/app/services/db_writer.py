@@ -0,0 +1,134 @@
+"""
+Escritor dedicado do banco de dados
+Serializa escritas em uma única tarefa e agrupa commits em lotes
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Operação de escrita: recebe a sessão do escritor e retorna um resultado
+WriteOperation = Callable[[AsyncSession], Awaitable[Any]]
+
+_STOP = object()
+
+class BatchedWriter:
+    """Tarefa única de escrita com commits em lote
+
+    No SQLite apenas uma conexão pode escrever por vez. Em vez de várias
+    requisições disputando o lock do banco, as operações entram em uma fila
+    e são aplicadas por uma única tarefa, que faz um commit por lote.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker,
+                 batch_size: int = 64, batch_window_ms: float = 0.5):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.batch_window = max(0.0, batch_window_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Estatísticas
+        self.batches_committed = 0
+        self.operations_committed = 0
+
+    @property
+    def running(self) -> bool:
+        """Verificar se a tarefa de escrita está ativa"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Iniciar tarefa de escrita"""
+
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="db-writer")
+        logger.info("Escritor do banco iniciado")
+
+    async def stop(self):
+        """Aplicar operações pendentes e parar a tarefa"""
+
+        if not self.running:
+            return
+
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info("Escritor do banco finalizado")
+
+    async def submit(self, operation: WriteOperation) -> Any:
+        """Enfileirar operação e aguardar o commit do lote"""
+
+        if not self.running:
+            raise RuntimeError("Escritor do banco não está rodando")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    async def _run(self):
+        """Loop principal: agrupa operações por tamanho ou janela de tempo"""
+
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: List[Tuple[WriteOperation, asyncio.Future]]):
+        """Aplicar lote em uma transação; em caso de erro, isolar a operação falha"""
+
+        try:
+            async with self.session_factory() as session:
+                results = [await operation(session) for operation, _ in batch]
+                await session.commit()
+
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+
+            # Reaplicar uma a uma para que só a operação inválida falhe
+            logger.warning(f"Lote de escrita falhou, reaplicando individualmente: {str(e)}")
+            for item in batch:
+                await self._commit_batch([item])
+            return
+
+        self.batches_committed += 1
+        self.operations_committed += len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,298 @@
+"""
+Agregados mensais de despesas
+Mantém o rollup (usuário, mês, tipo, categoria, método) → soma/contagem/mín/máx
+para que dashboards e estatísticas não precisem percorrer o histórico
+"""
+
+import logging
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense import Expense, ExpenseMonthlyRollup
+from app.schemas.expense import ExpenseStats, UNCATEGORIZED, UNSPECIFIED_PAYMENT_METHOD
+from app.utils.money import cents_to_float, divide_cents, from_cents, to_cents
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_KEY_COLUMNS = ["user_id", "month", "type", "category", "payment_method"]
+
+def _enum_value(value: Any) -> str:
+    """Valor textual de enums/strings opcionais ("" quando ausente)"""
+    if value is None:
+        return ""
+    return getattr(value, "value", value)
+
+def _field(expense: Any, name: str) -> Any:
+    """Ler campo de um modelo Expense ou de um dict com os mesmos campos"""
+    return expense[name] if isinstance(expense, dict) else getattr(expense, name)
+
+def rollup_key(expense: Any) -> Dict[str, str]:
+    """Chave do rollup para uma despesa (modelo ou dict com os mesmos campos)"""
+
+    return {
+        "user_id": _field(expense, "user_id"),
+        "month": _field(expense, "date").strftime("%Y-%m"),
+        "type": _enum_value(_field(expense, "type")) or "expense",
+        "category": _enum_value(_field(expense, "category")),
+        "payment_method": _enum_value(_field(expense, "payment_method")),
+    }
+
+@dataclass
+class RollupSummary:
+    """Resumo de um conjunto de células do rollup"""
+
+    cells: List[ExpenseMonthlyRollup] = field(default_factory=list)
+
+    def _cells_of_type(self, expense_type: str) -> List[ExpenseMonthlyRollup]:
+        return [cell for cell in self.cells if cell.type == expense_type]
+
+    def _group_by(self, attribute: str, expense_type: str = "expense",
+                  empty_label: str = UNCATEGORIZED) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for cell in self._cells_of_type(expense_type):
+            key = getattr(cell, attribute) or empty_label
+            totals[key] = totals.get(key, 0) + cell.total_cents
+        return totals
+
+    def for_month(self, month: str) -> "RollupSummary":
+        """Subconjunto das células de um mês (YYYY-MM)"""
+        return RollupSummary(cells=[cell for cell in self.cells if cell.month == month])
+
+    @property
+    def expense_count(self) -> int:
+        return sum(cell.count for cell in self._cells_of_type("expense"))
+
+    @property
+    def expense_total_cents(self) -> int:
+        return sum(cell.total_cents for cell in self._cells_of_type("expense"))
+
+    def current_month_expenses(self) -> Dict[str, Any]:
+        """Mesmo formato de FinancialAdvisorAgent._calculate_current_month_expenses"""
+
+        total = self.expense_total_cents
+        count = self.expense_count
+
+        return {
+            "total": cents_to_float(total),
+            "count": count,
+            "average": cents_to_float(total) / count if count > 0 else 0,
+            "currency": "BRL"
+        }
+
+    def category_breakdown(self) -> Dict[str, Any]:
+        """Mesmo formato de FinancialAdvisorAgent._calculate_category_breakdown"""
+
+        category_totals = self._group_by("category")
+        total_amount = sum(category_totals.values())
+
+        breakdown = {}
+        for category, cents in category_totals.items():
+            percentage = (cents / total_amount) * 100 if total_amount > 0 else 0
+            breakdown[category] = {
+                "amount": cents_to_float(cents),
+                "percentage": round(percentage, 1),
+                "currency": "BRL"
+            }
+
+        return breakdown
+
+    def comprehensive_stats(self) -> Dict[str, Any]:
+        """Estatísticas gerais
+
+        Sem mediana, que exige os valores individuais: quem precisa dela
+        completa com ExpenseFrame.stats_cents() das despesas do período.
+        """
+
+        cells = self._cells_of_type("expense")
+        count = self.expense_count
+
+        if count == 0:
+            return {"total": 0, "count": 0, "average": 0}
+
+        total = self.expense_total_cents
+
+        return {
+            "total": cents_to_float(total),
+            "count": count,
+            "average": cents_to_float(total) / count,
+            "min": cents_to_float(min(cell.min_cents for cell in cells)),
+            "max": cents_to_float(max(cell.max_cents for cell in cells)),
+            "currency": "BRL"
+        }
+
+    def to_expense_stats(self) -> ExpenseStats:
+        """Converter para o schema ExpenseStats"""
+
+        def to_decimal(cents: int, count: int = 1) -> Decimal:
+            return from_cents(divide_cents(cents, 1, count))
+
+        expense_cells = self._cells_of_type("expense")
+        income_cells = self._cells_of_type("income")
+
+        total_expenses = sum(cell.total_cents for cell in expense_cells)
+        total_income = sum(cell.total_cents for cell in income_cells)
+        expense_count = sum(cell.count for cell in expense_cells)
+        income_count = sum(cell.count for cell in income_cells)
+
+        return ExpenseStats(
+            total_expenses=to_decimal(total_expenses),
+            total_income=to_decimal(total_income),
+            net_amount=to_decimal(total_income - total_expenses),
+            expense_count=expense_count,
+            income_count=income_count,
+            by_category={k: to_decimal(v) for k, v in self._group_by("category").items()},
+            by_payment_method={
+                k: to_decimal(v)
+                for k, v in self._group_by("payment_method", empty_label=UNSPECIFIED_PAYMENT_METHOD).items()
+            },
+            by_month={k: to_decimal(v) for k, v in sorted(self._group_by("month").items())},
+            average_expense=to_decimal(total_expenses, expense_count) if expense_count else Decimal("0"),
+            average_income=to_decimal(total_income, income_count) if income_count else Decimal("0")
+        )
+
+class ExpenseRollupService:
+    """Manutenção incremental e leitura do rollup mensal"""
+
+    async def apply_insert(self, session: AsyncSession, expense: Expense):
+        """Somar despesa recém-inserida ao rollup"""
+        await self._add(session, rollup_key(expense), to_cents(expense.amount))
+
+    async def apply_delete(self, session: AsyncSession, expense: Any):
+        """Remover despesa do rollup (chamar após o flush da remoção)"""
+        await self._remove(session, rollup_key(expense), to_cents(_field(expense, "amount")))
+
+    async def apply_update(self, session: AsyncSession, before: Dict[str, Any], expense: Expense):
+        """Mover valores da célula antiga para a nova (chamar após o flush)"""
+
+        old_key, new_key = rollup_key(before), rollup_key(expense)
+        old_cents, new_cents = to_cents(before["amount"]), to_cents(expense.amount)
+
+        if old_key == new_key and old_cents == new_cents:
+            return
+
+        await self._remove(session, old_key, old_cents)
+        await self._add(session, new_key, new_cents)
+
+    async def _add(self, session: AsyncSession, key: Dict[str, str], cents: int):
+        """Upsert de uma despesa na célula do rollup"""
+
+        dialect = session.bind.dialect.name
+        table = ExpenseMonthlyRollup.__table__
+
+        if dialect in ("sqlite", "postgresql"):
+            insert_fn = sqlite_insert if dialect == "sqlite" else pg_insert
+            least = func.min if dialect == "sqlite" else func.least
+            greatest = func.max if dialect == "sqlite" else func.greatest
+
+            stmt = insert_fn(table).values(
+                **key, total_cents=cents, count=1, min_cents=cents, max_cents=cents
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=ROLLUP_KEY_COLUMNS,
+                set_={
+                    "total_cents": table.c.total_cents + stmt.excluded.total_cents,
+                    "count": table.c.count + 1,
+                    "min_cents": least(table.c.min_cents, stmt.excluded.min_cents),
+                    "max_cents": greatest(table.c.max_cents, stmt.excluded.max_cents),
+                }
+            )
+            await session.execute(stmt)
+            return
+
+        # Outros bancos: leitura seguida de escrita
+        cell = await session.get(ExpenseMonthlyRollup, tuple(key[c] for c in ROLLUP_KEY_COLUMNS))
+        if cell is None:
+            session.add(ExpenseMonthlyRollup(
+                **key, total_cents=cents, count=1, min_cents=cents, max_cents=cents
+            ))
+        else:
+            cell.total_cents += cents
+            cell.count += 1
+            cell.min_cents = min(cell.min_cents, cents)
+            cell.max_cents = max(cell.max_cents, cents)
+        await session.flush()
+
+    async def _remove(self, session: AsyncSession, key: Dict[str, str], cents: int):
+        """Subtrair despesa da célula; mín/máx são recalculados só quando necessário"""
+
+        cell = await session.get(
+            ExpenseMonthlyRollup,
+            tuple(key[c] for c in ROLLUP_KEY_COLUMNS),
+            populate_existing=True
+        )
+        if cell is None:
+            logger.warning(f"Célula de rollup ausente para {key}")
+            return
+
+        if cell.count <= 1:
+            await session.execute(
+                delete(ExpenseMonthlyRollup).where(
+                    *(getattr(ExpenseMonthlyRollup, c) == key[c] for c in ROLLUP_KEY_COLUMNS)
+                )
+            )
+            session.expunge(cell)
+            return
+
+        cell.total_cents -= cents
+        cell.count -= 1
+
+        # Mín/máx não são reversíveis: recalcular a partir das despesas da célula
+        if cents <= cell.min_cents or cents >= cell.max_cents:
+            min_amount, max_amount = await self._cell_extremes(session, key)
+            if min_amount is not None:
+                cell.min_cents = to_cents(min_amount)
+                cell.max_cents = to_cents(max_amount)
+
+        await session.flush()
+
+    async def _cell_extremes(self, session: AsyncSession, key: Dict[str, str]):
+        """Mínimo e máximo das despesas de uma célula (usa o índice user/date)"""
+
+        year, month = (int(part) for part in key["month"].split("-"))
+        first_day = date(year, month, 1)
+        last_day = date(year, month, monthrange(year, month)[1])
+
+        result = await session.execute(
+            select(func.min(Expense.amount), func.max(Expense.amount)).where(
+                Expense.user_id == key["user_id"],
+                Expense.date >= first_day,
+                Expense.date <= last_day,
+                Expense.type == key["type"],
+                func.coalesce(Expense.category, "") == key["category"],
+                func.coalesce(Expense.payment_method, "") == key["payment_method"],
+            )
+        )
+        return result.one()
+
+    async def get_summary(self, session: AsyncSession, user_id: str,
+                          start_month: Optional[str] = None,
+                          end_month: Optional[str] = None) -> RollupSummary:
+        """Ler células do rollup de um usuário (meses no formato YYYY-MM)"""
+
+        query = select(ExpenseMonthlyRollup).where(ExpenseMonthlyRollup.user_id == user_id)
+        if start_month:
+            query = query.where(ExpenseMonthlyRollup.month >= start_month)
+        if end_month:
+            query = query.where(ExpenseMonthlyRollup.month <= end_month)
+
+        result = await session.execute(query)
+        return RollupSummary(cells=list(result.scalars().all()))
+
+    async def get_expense_stats(self, session: AsyncSession, user_id: str,
+                                start_month: Optional[str] = None,
+                                end_month: Optional[str] = None) -> ExpenseStats:
+        """Estatísticas de despesas a partir do rollup"""
+
+        summary = await self.get_summary(session, user_id, start_month, end_month)
+        return summary.to_expense_stats()
+
+# Instância global
+expense_rollup_service = ExpenseRollupService()
@@ -0,0 +1,296 @@
+"""
+Busca textual de despesas
+Índice FTS5 (tokenizador trigram) sobre descrição e notas, sincronizado por
+triggers, com normalização sem acentos para o português. A normalização é
+SQL puro (replace/lower), então qualquer conexão que escreva em expenses
+(scripts, backfills, SQL manual) mantém o índice em dia.
+"""
+
+import html
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, column, literal_column, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.expense import Expense
+
+logger = logging.getLogger(__name__)
+
+# Tamanho mínimo de termo indexável pelo tokenizador trigram
+MIN_TRIGRAM_TERM = 3
+
+# Escape dos curingas % e _ nos padrões LIKE
+LIKE_ESCAPE = "\\"
+
+def _accent_map() -> Dict[str, str]:
+    """Letras acentuadas do Latin-1 (português, espanhol, francês) -> letra sem acento
+
+    Também remove as marcas combinantes usadas em texto decomposto (NFD).
+    """
+
+    mapping = {}
+    for code in range(0xC0, 0x100):
+        char = chr(code)
+        base = "".join(c for c in unicodedata.normalize("NFKD", char) if not unicodedata.combining(c))
+        if len(base) == 1 and base != char and base.isascii():
+            mapping[char] = base
+    for mark in ("\u0300", "\u0301", "\u0302", "\u0303", "\u0308", "\u0327"):
+        mapping[mark] = ""
+    return mapping
+
+# A mesma regra em Python (consultas e destaques) e em SQL (triggers):
+# acentos da tabela acima e minúsculas apenas em ASCII, como lower() do SQLite
+ACCENTS = _accent_map()
+_NORMALIZE_TABLE = str.maketrans({
+    **{chr(code): chr(code + 32) for code in range(ord("A"), ord("Z") + 1)},
+    **{char: base.lower() for char, base in ACCENTS.items()},
+})
+
+# replace() aninhados por subconsulta: a pilha do parser do SQLite não
+# comporta a tabela inteira em uma única expressão
+NORMALIZE_STEP = 16
+
+def normalize_select(values: Dict[str, str], source: Optional[str] = None, carry: Sequence[str] = ()) -> str:
+    """SELECT com cada expressão de `values` normalizada como normalize_search_text
+
+    As colunas de saída têm os nomes das chaves de `values`, depois das
+    colunas `carry` de `source`, repassadas sem alteração.
+    """
+
+    accents = list(ACCENTS.items())
+    steps = [accents[start:start + NORMALIZE_STEP] for start in range(0, len(accents), NORMALIZE_STEP)]
+
+    query, current = None, dict(values)
+    for index, step in enumerate(steps):
+        columns = list(carry)
+        for name, expression in current.items():
+            for char, base in step:
+                expression = f"replace({expression}, '{char}', '{base}')"
+            if index == len(steps) - 1:
+                expression = f"lower({expression})"
+            columns.append(f"{expression} AS {name}")
+
+        if query is not None:
+            from_clause = f" FROM ({query}) AS step_{index}"
+        else:
+            from_clause = f" FROM {source}" if source else ""
+        query = f"SELECT {', '.join(columns)}{from_clause}"
+        current = {name: name for name in values}
+
+    return query
+
+def normalize_sql(expression: str) -> str:
+    """Subconsulta escalar que normaliza `expression` como normalize_search_text"""
+    return f"({normalize_select({'normalized': expression})})"
+
+expenses_fts = table("expenses_fts", column("rowid"), column("description"), column("notes"))
+
+# Texto da despesa nova (ou alterada) normalizado para o índice
+_NEW_ROW = normalize_select({"description": "new.description", "notes": "new.notes"})
+
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts
+    USING fts5(description, notes, tokenize = 'trigram')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO expenses_fts(rowid, description, notes)
+        SELECT new.id, description, notes FROM ({_NEW_ROW});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN
+        DELETE FROM expenses_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_au AFTER UPDATE OF description, notes ON expenses BEGIN
+        DELETE FROM expenses_fts WHERE rowid = old.id;
+        INSERT INTO expenses_fts(rowid, description, notes)
+        SELECT new.id, description, notes FROM ({_NEW_ROW});
+    END
+    """,
+]
+
+def normalize_search_text(value: Optional[str]) -> Optional[str]:
+    """Remover acentos e converter para minúsculas
+
+    A conversão é feita caractere a caractere ("ç" → "c", "ã" → "a"), então
+    o texto normalizado costuma ter o mesmo tamanho do original, o que
+    permite destacar trechos no texto original. Igual à normalize_sql dos
+    triggers: o texto indexado por qualquer conexão bate com as consultas.
+    """
+
+    if value is None:
+        return None
+    return value.translate(_NORMALIZE_TABLE)
+
+def _like_pattern(term: str) -> str:
+    """Padrão LIKE de substring com % e _ do usuário tratados como literais"""
+
+    escaped = term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+    return f"%{escaped}%"
+
+def search_terms(query: str) -> List[str]:
+    """Termos normalizados da busca"""
+    return [term for term in re.split(r"\s+", normalize_search_text(query) or "") if term]
+
+def _fts_literal(term: str) -> str:
+    """Termo entre aspas para a sintaxe MATCH do FTS5"""
+    return '"' + term.replace('"', '""') + '"'
+
+def highlight(value: Optional[str], terms: List[str], start: str = "<mark>", end: str = "</mark>") -> Optional[str]:
+    """Destacar termos no texto original (ou no normalizado, se os tamanhos divergirem)
+
+    O resultado é HTML: o texto é escapado e só as marcas de destaque
+    ficam sem escape.
+    """
+
+    if not value:
+        return value
+
+    normalized = normalize_search_text(value)
+    source = value if len(normalized) == len(value) else normalized
+
+    spans: List[Tuple[int, int]] = []
+    for term in terms:
+        for match in re.finditer(re.escape(term), normalized):
+            spans.append(match.span())
+
+    if not spans:
+        return html.escape(value)
+
+    # Unir trechos sobrepostos
+    spans.sort()
+    merged = [spans[0]]
+    for span_start, span_end in spans[1:]:
+        if span_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], span_end))
+        else:
+            merged.append((span_start, span_end))
+
+    # Escapar cada trecho separadamente: as posições valem para o texto sem escape
+    parts, cursor = [], 0
+    for span_start, span_end in merged:
+        parts.append(html.escape(source[cursor:span_start]))
+        parts.append(f"{start}{html.escape(source[span_start:span_end])}{end}")
+        cursor = span_end
+    parts.append(html.escape(source[cursor:]))
+
+    return "".join(parts)
+
+class ExpenseSearchService:
+    """Busca de despesas com FTS5 (SQLite) e fallback para LIKE"""
+
+    def __init__(self):
+        self.enabled = False
+
+    async def install(self, conn: AsyncConnection):
+        """Criar tabela FTS e trigger de remoção; popular a partir das despesas existentes"""
+
+        try:
+            for statement in FTS_DDL:
+                await conn.execute(text(statement))
+
+            indexed = await conn.scalar(text("SELECT count(*) FROM expenses_fts"))
+            if not indexed:
+                await self._rebuild(conn)
+
+            self.enabled = True
+            logger.info("Índice FTS5 de despesas pronto")
+
+        except Exception as e:
+            self.enabled = False
+            logger.warning(f"FTS5 indisponível, busca usará LIKE: {str(e)}")
+
+    async def _rebuild(self, conn: AsyncConnection):
+        """Indexar todas as despesas com a mesma normalização dos triggers"""
+
+        rows = normalize_select({"description": "description", "notes": "notes"}, source="expenses", carry=["id"])
+        await conn.execute(text(f"INSERT INTO expenses_fts(rowid, description, notes) {rows}"))
+
+    def match_condition(self, query: str) -> Optional[Any]:
+        """Condição sobre Expense.id para usar na listagem"""
+
+        terms = search_terms(query)
+        if not terms:
+            return None
+
+        if not self.enabled:
+            # Sem FTS: mesma normalização aplicada às colunas, todos os termos exigidos
+            table_name = Expense.__tablename__
+            description = literal_column(normalize_sql(f"{table_name}.description"))
+            notes = literal_column(normalize_sql(f"{table_name}.notes"))
+            return and_(*(
+                or_(description.like(_like_pattern(term), escape=LIKE_ESCAPE),
+                    notes.like(_like_pattern(term), escape=LIKE_ESCAPE))
+                for term in terms
+            ))
+
+        return Expense.id.in_(select(expenses_fts.c.rowid).where(*self._fts_conditions(terms)))
+
+    def _fts_conditions(self, terms: List[str]) -> List[Any]:
+        """Condições sobre a tabela FTS que exigem todos os termos"""
+
+        long_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_TERM]
+        short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_TERM]
+        conditions: List[Any] = []
+
+        if long_terms:
+            match = " AND ".join(_fts_literal(term) for term in long_terms)
+            conditions.append(literal_column("expenses_fts").op("MATCH")(match))
+
+        # Termos curtos não geram trigramas: filtrar os candidatos com LIKE
+        for term in short_terms:
+            pattern = _like_pattern(term)
+            conditions.append(or_(
+                expenses_fts.c.description.like(pattern, escape=LIKE_ESCAPE),
+                expenses_fts.c.notes.like(pattern, escape=LIKE_ESCAPE)
+            ))
+
+        return conditions
+
+    async def search(self, session: AsyncSession, user_id: str, query: str,
+                     limit: int = 20) -> List[Tuple[Expense, float, Optional[str], Optional[str]]]:
+        """Buscar despesas ordenadas por relevância (BM25)
+
+        Returns:
+            Lista de (despesa, relevância, descrição com destaques, notas com destaques)
+        """
+
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        if self.enabled and any(len(term) >= MIN_TRIGRAM_TERM for term in terms):
+            # bm25 é negativo: quanto menor, mais relevante
+            rank = literal_column("bm25(expenses_fts)")
+            statement = (
+                select(Expense, rank)
+                .join(expenses_fts, expenses_fts.c.rowid == Expense.id)
+                .where(Expense.user_id == user_id, *self._fts_conditions(terms))
+                .order_by(rank, Expense.date.desc())
+                .limit(limit)
+            )
+            rows = (await session.execute(statement)).all()
+            hits = [(expense, -float(score)) for expense, score in rows]
+        else:
+            statement = (
+                select(Expense)
+                .where(Expense.user_id == user_id, self.match_condition(query))
+                .order_by(Expense.date.desc(), Expense.id.desc())
+                .limit(limit)
+            )
+            hits = [(expense, 0.0) for expense in (await session.execute(statement)).scalars()]
+
+        return [
+            (expense, score, highlight(expense.description, terms), highlight(expense.notes, terms))
+            for expense, score in hits
+        ]
+
+# Instância global
+expense_search_service = ExpenseSearchService()
@@ -0,0 +1,294 @@
+"""
+Serviço de despesas
+Persistência de despesas com manutenção do rollup mensal na mesma transação
+"""
+
+import base64
+import json
+import logging
+import math
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.expense import Expense, ExpenseTag
+from app.schemas.expense import (
+    ExpenseCreate, ExpenseFilter, ExpenseList, ExpenseResponse, ExpenseSearchHit,
+    ExpenseUpdate
+)
+from app.services.database import db_service
+from app.services.expense_rollup import expense_rollup_service
+from app.services.expense_search import expense_search_service
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = ["user_id", "date", "type", "category", "payment_method", "amount"]
+
+def _column_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Converter enums do schema para os valores gravados no banco"""
+    return {key: getattr(value, "value", value) for key, value in data.items()}
+
+def _normalize_tags(tags: Optional[List[str]]) -> List[str]:
+    """Tags sem espaços extras, em minúsculas e sem duplicatas"""
+    return sorted({tag.strip().lower() for tag in tags or [] if tag and tag.strip()})
+
+def encode_cursor(expense_date: date, expense_id: int) -> str:
+    """Cursor opaco com a chave (date, id) do último item da página"""
+    raw = f"{expense_date.isoformat()}|{expense_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Decodificar cursor gerado por encode_cursor"""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, raw_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return date.fromisoformat(raw_date), int(raw_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+def build_expense_conditions(user_id: str, filters: ExpenseFilter) -> List[Any]:
+    """Compilar ExpenseFilter em condições SQL cobertas pelos índices"""
+
+    conditions: List[Any] = [Expense.user_id == user_id]
+
+    if filters.start_date:
+        conditions.append(Expense.date >= filters.start_date)
+    if filters.end_date:
+        conditions.append(Expense.date <= filters.end_date)
+    if filters.category:
+        conditions.append(Expense.category == filters.category.value)
+    if filters.subcategory:
+        conditions.append(Expense.subcategory == filters.subcategory)
+    if filters.payment_method:
+        conditions.append(Expense.payment_method == filters.payment_method.value)
+    if filters.type:
+        conditions.append(Expense.type == filters.type.value)
+    if filters.min_amount is not None:
+        conditions.append(Expense.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        conditions.append(Expense.amount <= filters.max_amount)
+
+    tags = _normalize_tags(filters.tags)
+    if tags:
+        # Despesas que possuem todas as tags pedidas
+        tagged = (
+            select(ExpenseTag.expense_id)
+            .where(ExpenseTag.user_id == user_id, ExpenseTag.tag.in_(tags))
+            .group_by(ExpenseTag.expense_id)
+            .having(func.count() == len(tags))
+        )
+        conditions.append(Expense.id.in_(tagged))
+
+    if filters.search:
+        # Índice FTS5 sem acentos no SQLite; ILIKE nos demais bancos
+        search = expense_search_service.match_condition(filters.search)
+        if search is not None:
+            conditions.append(search)
+
+    return conditions
+
+class CountCache:
+    """Cache em memória dos totais da listagem, invalidado a cada escrita do usuário
+
+    O cache é por processo: a invalidação só alcança o worker que fez a
+    escrita. Com vários workers, os demais podem devolver um total
+    desatualizado por até EXPENSE_COUNT_CACHE_TTL segundos (os itens da
+    página são sempre lidos do banco).
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int, str], Tuple[float, int]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def key(self, user_id: str, filters: ExpenseFilter) -> Tuple[str, int, str]:
+        """Chave capturada antes da consulta: contagens que terminarem depois
+        de uma escrita ficam gravadas na versão antiga e nunca são lidas"""
+        filters_key = json.dumps(filters.model_dump(mode="json"), sort_keys=True)
+        return user_id, self._versions.get(user_id, 0), filters_key
+
+    def get(self, key: Tuple[str, int, str]) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Tuple[str, int, str], total: int):
+        if key[1] == self._versions.get(key[0], 0):
+            self._entries[key] = (time.monotonic() + self.ttl, total)
+
+    def invalidate(self, user_id: str):
+        """Nova versão do usuário descarta as contagens anteriores"""
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if key[0] != user_id
+        }
+
+class ExpenseService:
+    """Operações de escrita e leitura de despesas"""
+
+    def __init__(self):
+        self.count_cache = CountCache(ttl=settings.EXPENSE_COUNT_CACHE_TTL)
+
+    async def create_expense(self, user_id: str, expense: ExpenseCreate,
+                             ai_data: Optional[Dict[str, Any]] = None) -> ExpenseResponse:
+        """Criar despesa e atualizar o rollup"""
+
+        values = _column_values(expense.model_dump())
+        values.update(_column_values(ai_data or {}))
+
+        async def operation(session: AsyncSession) -> ExpenseResponse:
+            db_expense = Expense(user_id=user_id, **values)
+            session.add(db_expense)
+            await session.flush()
+
+            await self._replace_tags(session, db_expense)
+            await expense_rollup_service.apply_insert(session, db_expense)
+            return ExpenseResponse.model_validate(db_expense)
+
+        result = await db_service.write(operation)
+        self.count_cache.invalidate(user_id)
+        return result
+
+    async def update_expense(self, user_id: str, expense_id: int,
+                             changes: ExpenseUpdate) -> Optional[ExpenseResponse]:
+        """Atualizar despesa e mover valores entre células do rollup"""
+
+        values = _column_values(changes.model_dump(exclude_unset=True))
+
+        async def operation(session: AsyncSession) -> Optional[ExpenseResponse]:
+            db_expense = await self._get_owned(session, user_id, expense_id)
+            if db_expense is None:
+                return None
+
+            before = {name: getattr(db_expense, name) for name in ROLLUP_FIELDS}
+            for name, value in values.items():
+                setattr(db_expense, name, value)
+            await session.flush()
+
+            if "tags" in values:
+                await self._replace_tags(session, db_expense)
+            await expense_rollup_service.apply_update(session, before, db_expense)
+            return ExpenseResponse.model_validate(db_expense)
+
+        result = await db_service.write(operation)
+        self.count_cache.invalidate(user_id)
+        return result
+
+    async def delete_expense(self, user_id: str, expense_id: int) -> bool:
+        """Remover despesa e subtraí-la do rollup"""
+
+        async def operation(session: AsyncSession) -> bool:
+            db_expense = await self._get_owned(session, user_id, expense_id)
+            if db_expense is None:
+                return False
+
+            snapshot = {name: getattr(db_expense, name) for name in ROLLUP_FIELDS}
+            await session.delete(db_expense)
+            await session.flush()
+
+            await expense_rollup_service.apply_delete(session, snapshot)
+            return True
+
+        result = await db_service.write(operation)
+        self.count_cache.invalidate(user_id)
+        return result
+
+    async def list_expenses(self, user_id: str, filters: ExpenseFilter,
+                            cursor: Optional[str] = None, per_page: Optional[int] = None,
+                            page: int = 1) -> ExpenseList:
+        """Listar despesas com paginação por chave (date, id) decrescente
+
+        Em vez de OFFSET, cada página continua a partir da chave do último
+        item da anterior, então páginas profundas custam o mesmo que a primeira.
+        `page` sem cursor salta direto para uma página via OFFSET (custo
+        proporcional à profundidade); cursor e page > 1 juntos são ambíguos.
+        """
+
+        if cursor and page > 1:
+            raise ValueError("Use cursor ou page, não ambos")
+
+        per_page = min(per_page or settings.EXPENSE_PAGE_SIZE, settings.EXPENSE_MAX_PAGE_SIZE)
+        conditions = build_expense_conditions(user_id, filters)
+        count_key = self.count_cache.key(user_id, filters)
+
+        query = select(Expense).where(*conditions)
+        if cursor:
+            query = query.where(tuple_(Expense.date, Expense.id) < decode_cursor(cursor))
+        elif page > 1:
+            query = query.offset((page - 1) * per_page)
+        query = query.order_by(Expense.date.desc(), Expense.id.desc()).limit(per_page + 1)
+
+        async with await db_service.get_session() as session:
+            rows = list((await session.execute(query)).scalars().all())
+
+            total = self.count_cache.get(count_key)
+            if total is None:
+                total = await session.scalar(select(func.count()).select_from(Expense).where(*conditions))
+                self.count_cache.set(count_key, total)
+
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+
+        return ExpenseList(
+            items=[ExpenseResponse.model_validate(row) for row in rows],
+            total=total,
+            page=page,
+            per_page=per_page,
+            pages=math.ceil(total / per_page) if total else 0,
+            next_cursor=encode_cursor(rows[-1].date, rows[-1].id) if has_more else None
+        )
+
+    async def search_expenses(self, user_id: str, query: str,
+                              limit: int = 20) -> List[ExpenseSearchHit]:
+        """Buscar despesas por relevância na descrição e nas notas"""
+
+        async with await db_service.get_session() as session:
+            hits = await expense_search_service.search(session, user_id, query, limit=limit)
+
+        return [
+            ExpenseSearchHit(
+                expense=ExpenseResponse.model_validate(expense),
+                rank=rank,
+                highlight=highlighted,
+                notes_highlight=notes_highlighted
+            )
+            for expense, rank, highlighted, notes_highlighted in hits
+        ]
+
+    async def get_expense(self, user_id: str, expense_id: int) -> Optional[ExpenseResponse]:
+        """Obter despesa do usuário"""
+
+        async with await db_service.get_session() as session:
+            db_expense = await self._get_owned(session, user_id, expense_id)
+            return ExpenseResponse.model_validate(db_expense) if db_expense else None
+
+    async def _replace_tags(self, session: AsyncSession, db_expense: Expense):
+        """Sincronizar tabela de tags com o campo tags da despesa"""
+
+        tags = _normalize_tags(db_expense.tags)
+        db_expense.tags = tags
+
+        await session.execute(delete(ExpenseTag).where(ExpenseTag.expense_id == db_expense.id))
+        session.add_all(
+            ExpenseTag(expense_id=db_expense.id, tag=tag, user_id=db_expense.user_id)
+            for tag in tags
+        )
+        await session.flush()
+
+    async def _get_owned(self, session: AsyncSession, user_id: str,
+                         expense_id: int) -> Optional[Expense]:
+        """Buscar despesa garantindo que pertence ao usuário"""
+
+        result = await session.execute(
+            select(Expense).where(Expense.id == expense_id, Expense.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+# Instância global
+expense_service = ExpenseService()
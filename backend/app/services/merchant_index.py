@@ -0,0 +1,315 @@
+"""
+Normalização de estabelecimentos e busca por vizinhos aproximados
+Descrições de extrato ("PAG*IFOOD 1234", "IFOOD *RESTAURANTE", "Ifood SP")
+viram uma chave canônica ("ifood"); cada chave é representada por um vetor
+de bigramas e trigramas de caracteres (feature hashing, calculado
+localmente) e indexada com LSH de hiperplanos aleatórios, para que
+variações de escrita encontrem a categoria de um estabelecimento já
+conhecido sem chamar a LLM.
+"""
+
+import logging
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings, BRAZILIAN_EXPENSE_CATEGORIES, BRAZILIAN_MERCHANTS
+from app.core.metrics import MERCHANT_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Prefixos de adquirentes/carteiras antes do nome do estabelecimento
+PAYMENT_PREFIXES = {
+    "pag", "pg", "pagseguro", "ps", "mp", "mercpago", "mercadopago", "picpay", "pp", "ifd",
+    "ec", "sumup", "stone", "cielo", "getnet", "rede", "paypal", "ebanx", "iz", "zp", "dl"
+}
+
+# Ruído de extrato: tipo de transação, razão social, domínio
+NOISE_WORDS = {
+    "ltda", "me", "sa", "eireli", "epp", "com", "br", "www", "compra", "cartao", "debito",
+    "credito", "pix", "transf", "pagamento", "pgto", "parc", "parcela", "filial", "online"
+}
+
+STATES = {
+    "ac", "al", "ap", "am", "ba", "ce", "df", "es", "go", "ma", "mt", "ms", "mg", "pa", "pb", "pr",
+    "pe", "pi", "rj", "rn", "rs", "ro", "rr", "sc", "sp", "se", "to"
+}
+
+CITIES = re.compile(
+    r"\b(sao paulo|rio de janeiro|belo horizonte|curitiba|porto alegre|brasilia|salvador|"
+    r"recife|fortaleza|campinas|florianopolis|goiania|osasco|barueri|santo andre)\b"
+)
+
+NON_ALNUM = re.compile(r"[^a-z0-9*]+")
+DATES = re.compile(r"\b\d{1,2}/\d{1,2}(/\d{2,4})?\b")
+
+# Tipo do estabelecimento: removido da chave quando sobra um nome
+GENERIC_WORDS = {
+    "supermercado", "supermercados", "mercado", "posto", "farmacia", "drogaria", "restaurante",
+    "lanchonete", "padaria", "loja", "lojas", "cinema", "auto", "comercio", "servicos"
+}
+
+# Etapas de limpeza da chave, em ordem. Números de loja/terminal saem;
+# "99" (app), "99app" e outros com até dois dígitos ficam
+KEY_STAGES = (
+    lambda ts: [t for t in ts if sum(c.isdigit() for c in t) <= 2],
+    lambda ts: [t for t in ts if t not in NOISE_WORDS and t not in STATES],
+    lambda ts: CITIES.sub(" ", " ".join(ts)).split(),
+    lambda ts: [t for t in ts if t not in GENERIC_WORDS],
+)
+
+# Confiança mínima de uma categorização para ensinar o índice
+MIN_LEARN_CONFIDENCE = 0.5
+
+# Prefixos curtos ("tim", "dia") casariam com palavras comuns
+MIN_PREFIX_LENGTH = 4
+
+# Até este tamanho a busca exaustiva (um produto matriz-vetor) é tão rápida
+# quanto o LSH e não perde vizinhos
+EXACT_SEARCH_MAX = 2048
+
+@lru_cache(maxsize=16384)
+def normalize_merchant(description: str) -> str:
+    """
+    Chave canônica do estabelecimento
+
+    Remove acentos, prefixo de adquirente ("PAG*", "MP *"), datas, números
+    de loja/terminal, UF, cidade, ruído de extrato e, se ainda sobrar um nome,
+    o tipo do estabelecimento ("posto", "drogaria"). Cada etapa só é
+    aplicada se não esvaziar a chave. Complementos ("ifood sabor") são
+    resolvidos na consulta, pelo prefixo conhecido mais longo.
+    """
+
+    text = "".join(
+        char for char in unicodedata.normalize("NFKD", description.lower()) if not unicodedata.combining(char)
+    )
+
+    # "PAG*IFOOD" -> "ifood"; o complemento ("UBER *EATS") continua na chave
+    parts = [part.split() for part in NON_ALNUM.sub(" ", DATES.sub(" ", text)).split("*")]
+    parts = [tokens for tokens in parts if tokens]
+    if len(parts) > 1 and all(token in PAYMENT_PREFIXES for token in parts[0]):
+        parts = parts[1:]
+
+    tokens = [token for part in parts for token in part]
+    while len(tokens) > 1 and tokens[0] in PAYMENT_PREFIXES:
+        tokens = tokens[1:]
+
+    for apply in KEY_STAGES:
+        reduced = apply(tokens)
+        if reduced:
+            tokens = reduced
+
+    return " ".join(tokens)
+
+@lru_cache(maxsize=16384)
+def embed_merchant(key: str, dim: int = 256) -> np.ndarray:
+    """
+    Vetor unitário de bigramas e trigramas de caracteres da chave (sem espaços)
+
+    Feature hashing com sinal (crc32, estável entre processos): variações
+    como "smartfit"/"smart fit" ou "mc donalds"/"mcdonalds" ficam próximas
+    em cosseno. O array devolvido é compartilhado pelo cache: não alterar.
+    """
+
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f" {key.replace(' ', '')} "
+    for n in (2, 3):
+        for i in range(len(padded) - n + 1):
+            digest = zlib.crc32(padded[i:i + n].encode())
+            vector[digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+
+    norm = float(np.linalg.norm(vector))
+    if norm:
+        vector /= norm
+    vector.flags.writeable = False
+    return vector
+
+@lru_cache(maxsize=8)
+def _hyperplanes(dim: int, tables: int, bits: int) -> np.ndarray:
+    # Mesmos hiperplanos para todos os índices (semente fixa)
+    return np.random.default_rng(0).standard_normal((tables * bits, dim)).astype(np.float32)
+
+class VectorIndex:
+    """
+    Vizinho mais próximo aproximado (cosseno) com LSH de hiperplanos
+
+    Cada vetor cai em um bucket por tabela (sinal de `bits` projeções);
+    a busca só compara com os vetores dos buckets da consulta.
+    """
+
+    def __init__(self, dim: int, tables: int, bits: int):
+        self.dim = dim
+        self.tables = tables
+        self.bits = bits
+        self._planes = _hyperplanes(dim, tables, bits)
+        self._powers = 1 << np.arange(bits)
+        self._vectors = np.zeros((16, dim), dtype=np.float32)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(tables)]
+        self.keys: List[str] = []
+        self.values: List[Any] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _hashes(self, vector: np.ndarray) -> np.ndarray:
+        signs = (self._planes @ vector > 0).reshape(self.tables, self.bits)
+        return signs @ self._powers
+
+    def add(self, key: str, vector: np.ndarray, value: Any):
+        """Inserir (ou atualizar o valor de) uma chave"""
+
+        position = self._positions.get(key)
+        if position is not None:
+            self.values[position] = value
+            return
+
+        position = len(self.keys)
+        if position == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+        self._vectors[position] = vector
+
+        for table, bucket in enumerate(self._hashes(vector)):
+            self._buckets[table].setdefault(int(bucket), []).append(position)
+
+        self.keys.append(key)
+        self.values.append(value)
+        self._positions[key] = position
+
+    def get(self, key: str) -> Optional[Any]:
+        position = self._positions.get(key)
+        return self.values[position] if position is not None else None
+
+    def search(self, vector: np.ndarray, threshold: float) -> Optional[Tuple[str, Any, float]]:
+        """(chave, valor, similaridade) do vizinho mais próximo acima do limiar"""
+
+        if len(self.keys) <= EXACT_SEARCH_MAX:
+            return self.search_exact(vector, threshold)
+        return self.search_lsh(vector, threshold)
+
+    def search_lsh(self, vector: np.ndarray, threshold: float) -> Optional[Tuple[str, Any, float]]:
+        """Vizinho aproximado: compara só com os vetores dos buckets da consulta"""
+
+        candidates = set()
+        for table, bucket in enumerate(self._hashes(vector)):
+            candidates.update(self._buckets[table].get(int(bucket), ()))
+        if not candidates:
+            return None
+
+        positions = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+        return self._best(positions, self._vectors[positions] @ vector, threshold)
+
+    def search_exact(self, vector: np.ndarray, threshold: float) -> Optional[Tuple[str, Any, float]]:
+        """Busca exaustiva (também a referência de recall do LSH)"""
+
+        if not self.keys:
+            return None
+        positions = np.arange(len(self.keys))
+        return self._best(positions, self._vectors[:len(self.keys)] @ vector, threshold)
+
+    def _best(self, positions: np.ndarray, scores: np.ndarray, threshold: float) -> Optional[Tuple[str, Any, float]]:
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        position = int(positions[best])
+        return self.keys[position], self.values[position], float(scores[best])
+
+class MerchantIndex:
+    """
+    Categorias por estabelecimento: aprendidas por usuário + catálogo conhecido
+
+    Ordem da consulta: chave exata e prefixos da chave ("ifood sabor" ->
+    "ifood") no histórico do usuário e depois no catálogo; por fim o vizinho
+    aproximado, também primeiro no usuário. Correções do usuário sempre
+    prevalecem sobre o catálogo.
+    """
+
+    def __init__(self, merchants: Optional[Dict[str, Tuple[str, str]]] = None):
+        self.threshold = settings.MERCHANT_MATCH_THRESHOLD
+        self.known = self._new_index()
+        self.users: Dict[str, VectorIndex] = {}
+
+        for name, (category, subcategory) in (merchants if merchants is not None else BRAZILIAN_MERCHANTS).items():
+            key = normalize_merchant(name)
+            self.known.add(key, self._embed(key), {
+                "category": category,
+                "subcategory": subcategory,
+                "confidence": 0.9,
+                "suggested_category": category,
+                "reasoning": f"Estabelecimento conhecido: {name} ({BRAZILIAN_EXPENSE_CATEGORIES[category]['name']})"
+            })
+
+    def _new_index(self) -> VectorIndex:
+        return VectorIndex(settings.MERCHANT_EMBEDDING_DIM, settings.MERCHANT_LSH_TABLES, settings.MERCHANT_LSH_BITS)
+
+    def _embed(self, key: str) -> np.ndarray:
+        return embed_merchant(key, settings.MERCHANT_EMBEDDING_DIM)
+
+    def learn(self, user_id: str, description: str, categorization: Dict[str, Any]):
+        """Registrar a categorização de um estabelecimento do usuário"""
+
+        if categorization.get("confidence", 0) < MIN_LEARN_CONFIDENCE:
+            return
+
+        key = normalize_merchant(description)
+        if not key:
+            return
+
+        index = self.users.get(user_id)
+        if index is None:
+            index = self.users[user_id] = self._new_index()
+        index.add(key, self._embed(key), categorization)
+
+    def rebuild(self, user_id: str, entries: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Recriar o índice do usuário (após podar o cache de aprendizado)"""
+
+        self.users.pop(user_id, None)
+        for description, categorization in entries:
+            self.learn(user_id, description, categorization)
+
+    def lookup(self, user_id: str, description: str) -> Optional[Dict[str, Any]]:
+        """Categorização de um estabelecimento conhecido, ou None"""
+
+        key = normalize_merchant(description)
+        if not key:
+            MERCHANT_LOOKUPS.inc(1, "miss")
+            return None
+
+        indexes = [index for index in (self.users.get(user_id), self.known) if index is not None]
+
+        # Chave exata e prefixos (mais longo primeiro; no empate, o usuário)
+        tokens = key.split()
+        for size in range(len(tokens), 0, -1):
+            prefix = " ".join(tokens[:size])
+            if size < len(tokens) and len(prefix) < MIN_PREFIX_LENGTH:
+                break
+            for index in indexes:
+                categorization = index.get(prefix)
+                if categorization is not None:
+                    MERCHANT_LOOKUPS.inc(1, "exact" if size == len(tokens) else "prefix")
+                    return categorization
+
+        # Vizinho aproximado (variações de escrita)
+        vector = self._embed(key)
+        for index in indexes:
+            match = index.search(vector, self.threshold)
+            if match is not None:
+                _, categorization, score = match
+                MERCHANT_LOOKUPS.inc(1, "ann")
+                return {**categorization, "confidence": round(categorization["confidence"] * score, 2)}
+
+        MERCHANT_LOOKUPS.inc(1, "miss")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho do catálogo e dos índices por usuário"""
+
+        return {
+            "known_merchants": len(self.known),
+            "users": len(self.users),
+            "user_merchants": sum(len(index) for index in self.users.values())
+        }
@@ -0,0 +1,159 @@
+"""
+Micro-batching de requisições
+Junta itens enviados por várias requisições (de usuários diferentes) por
+até N ms ou M itens e os processa em uma única chamada, devolvendo a cada
+coroutine o resultado do seu item
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from app.core.metrics import BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+# Processa um lote e devolve um resultado por item, na mesma ordem
+BatchHandler = Callable[[List[ItemT]], Awaitable[List[ResultT]]]
+
+# Sentinela de parada: fecha o lote em formação em vez de descartá-lo
+_STOP = object()
+
+class MicroBatcher(Generic[ItemT, ResultT]):
+    """Fila com despacho por tamanho (batch_size) ou janela de tempo (batch_window_ms)
+
+    Mesmo desenho do BatchedWriter, com duas diferenças: a tarefa é criada
+    no primeiro submit (e recriada se o event loop mudar) e cada lote é
+    despachado em tarefa própria, para que lotes lentos (LLM) não segurem
+    a formação dos seguintes.
+    """
+
+    def __init__(self, name: str, handler: BatchHandler,
+                 batch_size: int = 20, batch_window_ms: float = 25.0):
+        self.name = name
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.batch_window = max(0.0, batch_window_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+        # Estatísticas
+        self.batches_dispatched = 0
+        self.items_dispatched = 0
+
+    @property
+    def running(self) -> bool:
+        """Verificar se a tarefa de agrupamento está ativa"""
+        return self._task is not None and not self._task.done()
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self.running and loop is self._loop:
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._dispatches = set()
+        self._task = loop.create_task(self._run(), name=f"micro-batcher-{self.name}")
+
+    async def submit(self, item: ItemT) -> ResultT:
+        """Enfileirar item e aguardar o resultado do seu lote"""
+
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def stop(self):
+        """Parar o agrupamento, despachar o lote em formação e aguardar os lotes em andamento"""
+
+        if self.running:
+            self._queue.put_nowait(_STOP)
+            await self._task
+        self._task = None
+
+        # Itens enfileirados depois da sentinela ainda recebem resposta
+        pending = []
+        while self._queue is not None and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                pending.append(item)
+        for start in range(0, len(pending), self.batch_size):
+            await self._dispatch(pending[start:start + self.batch_size])
+
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def _run(self):
+        """Loop principal: agrupa itens por tamanho ou janela de tempo"""
+
+        loop = asyncio.get_running_loop()
+
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[ItemT, asyncio.Future]]):
+        """Processar lote e distribuir resultados (ou o erro) entre os itens"""
+
+        BATCH_SIZE.observe(len(batch), self.name)
+        self.batches_dispatched += 1
+        self.items_dispatched += len(batch)
+
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Lote de {len(batch)} itens devolveu {len(results)} resultados")
+        except Exception as e:
+            logger.warning(f"Lote {self.name} com {len(batch)} itens falhou: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lotes despachados, tamanho médio e itens na fila"""
+
+        return {
+            "batches": self.batches_dispatched,
+            "items": self.items_dispatched,
+            "average_batch_size": round(self.items_dispatched / self.batches_dispatched, 2)
+            if self.batches_dispatched else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
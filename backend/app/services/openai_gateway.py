@@ -0,0 +1,278 @@
+"""
+Gateway único para chamadas à OpenAI
+Todos os agentes passam por aqui: limite de concorrência por modelo,
+timeout, retentativas com backoff exponencial e jitter, circuit breaker
+por modelo e coalescência (single-flight) de prompts idênticos em voo.
+
+Com o circuito aberto a chamada falha na hora com CircuitOpenError e cada
+agente cai direto na sua resposta de fallback (_fallback_categorization,
+_generate_fallback_insights...), sem esperar timeout.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import (
+    OPENAI_COALESCED, OPENAI_REJECTED, OPENAI_RETRIES, OPENAI_SECONDS, OPENAI_TOKENS, STAGE_SECONDS
+)
+from app.utils.lazy_import import lazy_import
+
+openai = lazy_import("openai")
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Circuito aberto: a OpenAI está falhando e a chamada nem foi feita"""
+
+class CircuitBreaker:
+    """
+    Circuit breaker por modelo
+
+    closed -> open após `threshold` falhas seguidas; open -> half_open após
+    `cooldown` segundos, deixando passar uma única chamada de teste.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                logger.warning(f"Circuito OpenAI aberto após {self.failures} falhas")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self):
+        """Liberar a chamada de teste que terminou sem resultado (cancelada ou erro local)"""
+
+        if self.state == "half_open":
+            self._probing = False
+
+def _is_retryable(error: Exception) -> bool:
+    """Timeout, falha de conexão, 408/409/429 e 5xx"""
+
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Segundos pedidos pelo servidor no cabeçalho Retry-After"""
+
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _request_key(client: Any, kwargs: Dict[str, Any]) -> Tuple[int, str]:
+    body = json.dumps(kwargs, sort_keys=True, ensure_ascii=False, default=str)
+    return id(client), hashlib.sha256(body.encode()).hexdigest()
+
+class OpenAIGateway:
+    """Política comum de chamadas chat.completions"""
+
+    def __init__(self):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @property
+    def client(self):
+        """Cliente AsyncOpenAI compartilhado (um pool HTTP; retentativas ficam no gateway)"""
+
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = openai.AsyncOpenAI(
+                        api_key=settings.OPENAI_API_KEY,
+                        base_url=settings.OPENAI_BASE_URL,
+                        timeout=settings.OPENAI_TIMEOUT,
+                        max_retries=0
+                    )
+        return self._client
+
+    def _bind_loop(self):
+        # Semáforos e futures pertencem a um event loop; benchmarks e
+        # scripts podem rodar vários asyncio.run no mesmo processo
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores.clear()
+            self._in_flight.clear()
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            limit = settings.OPENAI_MODEL_CONCURRENCY.get(model, settings.OPENAI_MAX_CONCURRENCY)
+            semaphore = self._semaphores[model] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(
+                settings.OPENAI_BREAKER_THRESHOLD, settings.OPENAI_BREAKER_COOLDOWN
+            )
+        return breaker
+
+    async def chat(self, agent: str, client: Any = None, **kwargs) -> Any:
+        """
+        chat.completions.create com a política do gateway
+
+        Args:
+            agent: Nome do agente (rótulo das métricas)
+            client: Cliente a usar (padrão: o compartilhado)
+            **kwargs: Parâmetros de chat.completions.create
+
+        Raises:
+            CircuitOpenError: circuito do modelo aberto
+        """
+        # Função do agente que chamou (ex.: _categorize_with_ai)
+        method = sys._getframe(1).f_code.co_name
+        client = client if client is not None else self.client
+        self._bind_loop()
+
+        if not settings.OPENAI_SINGLE_FLIGHT:
+            return await self._call(agent, method, client, kwargs)
+
+        key = _request_key(client, kwargs)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            OPENAI_COALESCED.inc(1, agent, method)
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita "exception was never retrieved" quando ninguém mais esperava
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[key] = future
+        try:
+            response = await self._call(agent, method, client, kwargs)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _call(self, agent: str, method: str, client: Any, kwargs: Dict[str, Any]) -> Any:
+        model = kwargs.get("model", settings.OPENAI_MODEL)
+        breaker = self.breaker(model)
+        if not breaker.allow():
+            OPENAI_REJECTED.inc(1, model)
+            raise CircuitOpenError(f"Circuito OpenAI aberto para {model}")
+        # Com o circuito meio aberto, esta é a única chamada de teste
+        probe = breaker.state == "half_open"
+
+        started = time.perf_counter()
+        status = "ok"
+        attempt = 0
+        try:
+            while True:
+                try:
+                    async with self._semaphore(model):
+                        response = await asyncio.wait_for(
+                            client.chat.completions.create(**kwargs), settings.OPENAI_TIMEOUT
+                        )
+                    breaker.record_success()
+                    break
+                except Exception as e:
+                    if not _is_retryable(e):
+                        if getattr(e, "status_code", None) is not None:
+                            # A API respondeu (400, 401...): o erro é da requisição, não do serviço
+                            breaker.record_success()
+                        raise
+                    breaker.record_failure()
+                    if attempt >= settings.OPENAI_MAX_RETRIES or not breaker.allow():
+                        raise
+
+                    # Backoff exponencial com jitter total (fora do semáforo)
+                    delay = random.uniform(0, min(settings.OPENAI_BACKOFF_MAX, settings.OPENAI_BACKOFF_BASE * 2 ** attempt))
+                    retry_after = _retry_after(e)
+                    if retry_after is not None:
+                        delay = min(max(delay, retry_after), settings.OPENAI_BACKOFF_MAX)
+                    attempt += 1
+                    logger.warning(f"OpenAI {type(e).__name__} em {agent}.{method}; tentativa {attempt + 1} em {delay:.2f}s")
+                    await asyncio.sleep(delay)
+        except BaseException as e:
+            status = type(e).__name__
+            if probe:
+                # Cancelada ou erro sem resposta da API: o próximo pedido testa de novo
+                breaker.release_probe()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            OPENAI_SECONDS.observe(elapsed, agent, method, status)
+            STAGE_SECONDS.observe(elapsed, "llm")
+            if attempt:
+                OPENAI_RETRIES.inc(attempt, agent, method)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            OPENAI_TOKENS.inc(usage.prompt_tokens or 0, agent, method, "prompt")
+            OPENAI_TOKENS.inc(usage.completion_tokens or 0, agent, method, "completion")
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado dos circuitos, vagas de concorrência e chamadas em voo"""
+
+        return {
+            "breakers": {
+                model: {"state": breaker.state, "failures": breaker.failures}
+                for model, breaker in self._breakers.items()
+            },
+            "available_slots": {model: semaphore._value for model, semaphore in self._semaphores.items()},
+            "in_flight": len(self._in_flight)
+        }
+
+    async def close(self):
+        """Fechar o pool HTTP do cliente compartilhado"""
+
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+# Instância global
+openai_gateway = OpenAIGateway()
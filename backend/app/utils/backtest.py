@@ -0,0 +1,170 @@
+"""
+Backtest histórico de planos FIRE
+Reproduz a fase de retiradas em todas as janelas móveis das séries mensais
+de CDI, IPCA e Ibovespa, em uma única passada vetorizada com produtos
+acumulados (sem laço por janela)
+"""
+
+import csv
+import gzip
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_DATA_PATH = os.path.join(DATA_DIR, "market_monthly.csv.gz")
+
+# Série sintética versionada (scripts/fetch_market_history.py --sample): usada
+# quando as séries reais ainda não foram geradas, com a resposta sinalizada
+SAMPLE_DATA_PATH = os.path.join(DATA_DIR, "market_monthly_sample.csv.gz")
+
+# Colunas do arquivo: mês (AAAA-MM) e variações mensais em %
+COLUMNS = ("month", "cdi", "ipca", "ibov")
+
+# Início do Plano Real: antes disso as séries nominais não são comparáveis
+PLANO_REAL = "1994-07"
+
+@dataclass(frozen=True)
+class MarketHistory:
+    """Séries mensais alinhadas (retornos em decimal)"""
+
+    months: List[str]
+    cdi: np.ndarray
+    ipca: np.ndarray
+    ibov: np.ndarray
+    sample: bool = False  # Série sintética de exemplo, não histórica
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    def since(self, month: str) -> "MarketHistory":
+        """Recorte a partir de um mês (AAAA-MM)"""
+
+        start = next((index for index, value in enumerate(self.months) if value >= month), len(self.months))
+        return MarketHistory(self.months[start:], self.cdi[start:], self.ipca[start:], self.ibov[start:],
+                             self.sample)
+
+    def portfolio_returns(self, equity_weight: float) -> np.ndarray:
+        """Carteira rebalanceada mensalmente: CDI na renda fixa, Ibovespa na variável"""
+        return (1 - equity_weight) * self.cdi + equity_weight * self.ibov
+
+    @classmethod
+    def from_csv(cls, path: str, sample: bool = False) -> "MarketHistory":
+        """Ler o CSV (opcionalmente .gz) gerado por scripts/fetch_market_history.py"""
+
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file)
+            missing = set(COLUMNS) - set(reader.fieldnames or ())
+            if missing:
+                raise ValueError(f"Colunas ausentes em {path}: {', '.join(sorted(missing))}")
+            rows = sorted(reader, key=lambda row: row["month"])
+
+        if not rows:
+            raise ValueError(f"Arquivo sem dados: {path}")
+
+        def column(name: str) -> np.ndarray:
+            return np.array([float(row[name]) for row in rows]) / 100
+
+        return cls([row["month"] for row in rows], column("cdi"), column("ipca"), column("ibov"), sample)
+
+@lru_cache(maxsize=4)
+def load_market_history(path: Optional[str] = None) -> MarketHistory:
+    """Séries históricas em memória (lidas uma vez por processo)
+
+    Sem caminho configurado e sem o arquivo padrão, usa a série sintética
+    de exemplo (MarketHistory.sample).
+
+    Raises:
+        FileNotFoundError: arquivo configurado (ou a amostra) não encontrado
+    """
+
+    if path is None and not os.path.exists(DEFAULT_DATA_PATH) and os.path.exists(SAMPLE_DATA_PATH):
+        logger.warning(
+            f"Séries históricas não encontradas em {DEFAULT_DATA_PATH}; usando a amostra sintética. "
+            "Gere os dados reais com: python -m scripts.fetch_market_history"
+        )
+        return MarketHistory.from_csv(SAMPLE_DATA_PATH, sample=True)
+
+    path = path or DEFAULT_DATA_PATH
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Séries históricas não encontradas em {path}. "
+            "Gere o arquivo com: python -m scripts.fetch_market_history"
+        )
+    return MarketHistory.from_csv(path)
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """Resultado por janela (arrays de tamanho W, uma por mês inicial)"""
+
+    start_months: List[str]
+    survived: np.ndarray
+    ending_real_balance: np.ndarray  # Múltiplo do patrimônio inicial, em valores do início
+    max_drawdown: np.ndarray  # Maior queda do patrimônio real a partir de um pico
+    safe_withdrawal_rate: np.ndarray  # Maior taxa anual que teria sobrevivido à janela
+
+    @property
+    def windows(self) -> int:
+        return len(self.start_months)
+
+    @property
+    def failure_rate(self) -> float:
+        return float(1 - self.survived.mean()) if self.windows else 0.0
+
+    @property
+    def worst_index(self) -> int:
+        return int(np.argmin(self.safe_withdrawal_rate))
+
+def rolling_withdrawal_backtest(history: MarketHistory, equity_weight: float,
+                                withdrawal_rate: float, months: int) -> BacktestResult:
+    """Retiradas corrigidas pelo IPCA em todas as janelas de `months` meses
+
+    Com C = produto acumulado dos retornos e I = do IPCA, o saldo após t
+    meses de uma janela iniciada em s (saldo inicial 1, saque W0 = taxa/12,
+    sacado no fim de cada mês) é
+
+        B(s, t) = C[s+t] / C[s] * (1 - W0 * C[s] / I[s] * (S[s+t] - S[s]))
+
+    com S = soma acumulada de I[k] / C[k+1]. Todas as janelas saem de uma
+    indexação (janelas x meses), sem simular mês a mês.
+    """
+
+    returns = history.portfolio_returns(equity_weight)
+    count = len(returns) - months + 1
+    if count <= 0:
+        raise ValueError(f"Histórico de {len(returns)} meses é menor que a janela de {months} meses")
+
+    growth = np.concatenate(([1.0], np.cumprod(1 + returns)))
+    prices = np.concatenate(([1.0], np.cumprod(1 + history.ipca)))
+    discounted = np.concatenate(([0.0], np.cumsum(prices[:-1] / growth[1:])))
+
+    starts = np.arange(count)
+    index = starts[:, None] + np.arange(1, months + 1)[None, :]
+
+    # Saque acumulado por unidade de W0, trazido ao início da janela
+    withdrawn = (growth[starts] / prices[starts])[:, None] * (discounted[index] - discounted[starts][:, None])
+    remaining = 1 - withdrawal_rate / 12 * withdrawn
+
+    nominal = growth[index] / growth[starts][:, None] * remaining
+    real = np.maximum(nominal * prices[starts][:, None] / prices[index], 0)
+
+    # O termo restante só diminui com t: sobreviver = terminar com saldo
+    survived = remaining[:, -1] >= 0
+
+    peaks = np.maximum.accumulate(np.concatenate((np.ones((count, 1)), real), axis=1), axis=1)[:, 1:]
+    max_drawdown = np.max(1 - real / peaks, axis=1)
+
+    return BacktestResult(
+        start_months=history.months[:count],
+        survived=survived,
+        ending_real_balance=real[:, -1],
+        max_drawdown=max_drawdown,
+        safe_withdrawal_rate=12 / withdrawn[:, -1]
+    )
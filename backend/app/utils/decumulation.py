@@ -0,0 +1,240 @@
+"""
+Simulação de retiradas com tributação brasileira
+Saques mensais por classe de ativo (bucket), vetorizados sobre milhares de
+carteiras: tabela regressiva de IR, isenção de LCI/LCA, come-cotas
+semestral dos fundos e isenção de R$ 20 mil/mês em vendas de ações
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import numpy as np
+
+# Regimes de tributação (valores de TaxRegime nos schemas)
+REGRESSIVO = "regressivo"  # Tesouro Direto, CDB
+ISENTO = "isento"          # LCI/LCA, poupança
+COME_COTAS = "come_cotas"  # Fundos de longo prazo
+ACOES = "acoes"            # Ações (swing trade)
+
+REGIMES = (REGRESSIVO, ISENTO, COME_COTAS, ACOES)
+
+# Tabela regressiva: (até N dias, alíquota); acima de 720 dias, 15%
+REGRESSIVE_BRACKETS = ((180, 0.225), (360, 0.20), (720, 0.175))
+LONG_TERM_RATE = 0.15
+
+COME_COTAS_RATE = 0.15
+COME_COTAS_MONTHS = (5, 11)  # Último dia útil de maio e novembro
+
+STOCK_RATE = 0.15
+STOCK_EXEMPTION = 20_000.0  # Vendas mensais isentas
+
+DAYS_PER_MONTH = 365 / 12
+MATURED_HOLDING_DAYS = 721  # Aplicações antigas já estão na alíquota mínima
+
+# Teto da busca da taxa sustentável: saque mensal igual ao saldo inicial
+MAX_WITHDRAWAL_RATE = 12.0
+
+def regime_codes(regimes: Iterable[Any]) -> np.ndarray:
+    """Nomes de regime (str ou enum) -> códigos inteiros do motor"""
+
+    codes = []
+    for regime in regimes:
+        name = getattr(regime, "value", regime)
+        if name not in REGIMES:
+            raise ValueError(f"Regime de tributação desconhecido: {name}")
+        codes.append(REGIMES.index(name))
+    return np.asarray(codes, dtype=np.int8)
+
+def regressive_rate(holding_days: Any) -> np.ndarray:
+    """Alíquota da tabela regressiva pelo prazo da aplicação"""
+
+    holding_days = np.asarray(holding_days, dtype=np.float64)
+    rate = np.full(holding_days.shape, LONG_TERM_RATE)
+    for limit, bracket_rate in reversed(REGRESSIVE_BRACKETS):
+        rate = np.where(holding_days <= limit, bracket_rate, rate)
+    return rate
+
+@dataclass(frozen=True)
+class DecumulationResult:
+    """Resultado por carteira (arrays de tamanho P)"""
+
+    survived: np.ndarray
+    depleted_month: np.ndarray  # -1 quando a carteira sobrevive
+    final_balance: np.ndarray
+    gross_withdrawn: np.ndarray
+    taxes_paid: np.ndarray
+
+    @property
+    def effective_tax_rate(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.gross_withdrawn > 0, self.taxes_paid / self.gross_withdrawn, 0.0)
+
+def _bucket_major(array: np.ndarray) -> np.ndarray:
+    """(B,) -> (B, 1); (P, B) -> (B, P); (T, P, B) -> (T, B, P)"""
+
+    if array.ndim == 1:
+        return array[:, None]
+    return np.swapaxes(array, -1, -2)
+
+def simulate_withdrawals(values: Any, cost_basis: Any, regimes: Any, monthly_returns: Any,
+                         monthly_withdrawal: Any, months: int, monthly_inflation: float = 0.0,
+                         holding_days: Any = MATURED_HOLDING_DAYS, start_month: int = 1) -> DecumulationResult:
+    """Simular saques líquidos mensais corrigidos pela inflação
+
+    Args:
+        values: saldo por carteira e bucket, (P, B)
+        cost_basis: valor aplicado por carteira e bucket, (P, B)
+        regimes: códigos de regime por bucket, (B,) (ver regime_codes)
+        monthly_returns: retorno bruto mensal, (B,), (P, B) ou (T, P, B)
+        monthly_withdrawal: saque líquido do primeiro mês, escalar ou (P,)
+        months: horizonte em meses
+        monthly_inflation: correção mensal do saque
+        holding_days: prazo já decorrido de cada aplicação, escalar, (B,) ou (P, B)
+        start_month: mês do calendário do primeiro saque (para o come-cotas)
+
+    Cada saque vende a mesma fração f de todos os buckets (mantém a
+    alocação). O imposto é linear em f, então a fração que entrega o valor
+    líquido pedido sai em forma fechada: f = saque / (saldo - imposto_total).
+    """
+
+    # Internamente os arrays ficam (B, P): somas por carteira percorrem
+    # poucos buckets contíguos em vez de reduzir o eixo interno curto
+    values = np.array(values, dtype=np.float64, ndmin=2)
+    cost_basis = np.broadcast_to(np.asarray(cost_basis, dtype=np.float64), values.shape).T.copy()
+    values = values.T.copy()
+    returns = _bucket_major(np.asarray(monthly_returns, dtype=np.float64))
+    holding = _bucket_major(np.atleast_1d(np.asarray(holding_days, dtype=np.float64)))
+    regimes = np.asarray(regimes)[:, None]
+
+    portfolios = values.shape[1]
+    withdrawal = np.broadcast_to(np.asarray(monthly_withdrawal, dtype=np.float64), (portfolios,)).copy()
+
+    regressive = regimes == REGIMES.index(REGRESSIVO)
+    come_cotas = regimes == REGIMES.index(COME_COTAS)
+    stocks = regimes == REGIMES.index(ACOES)
+    has_come_cotas = bool(come_cotas.any())
+    has_stocks = bool(stocks.any())
+
+    stock_rates = np.where(stocks, STOCK_RATE, 0.0)
+
+    # Depois que todas as aplicações passam de 720 dias a alíquota não muda mais
+    last_bracket = REGRESSIVE_BRACKETS[-1][0]
+    mature_month = max(0, math.ceil((last_bracket - holding.min()) / DAYS_PER_MONTH))
+
+    # Base do come-cotas: saldo após a última antecipação (posição inicial já tributada)
+    come_cotas_base = values.copy()
+
+    depleted_month = np.full(portfolios, -1, dtype=np.int64)
+    gross_withdrawn = np.zeros(portfolios)
+    taxes_paid = np.zeros(portfolios)
+
+    for month in range(months):
+        monthly_return = returns[month] if returns.ndim == 3 else returns
+        values *= 1 + monthly_return
+
+        calendar_month = (start_month + month - 1) % 12 + 1
+        if has_come_cotas and calendar_month in COME_COTAS_MONTHS:
+            advance = np.where(come_cotas, COME_COTAS_RATE * np.maximum(values - come_cotas_base, 0), 0.0)
+            values -= advance
+            come_cotas_base = np.where(come_cotas, values, come_cotas_base)
+            taxes_paid += advance.sum(axis=0)
+
+        # Imposto se o bucket inteiro fosse vendido agora
+        if month <= mature_month:
+            # Alíquota sobre o ganho total: tabela regressiva nos títulos e,
+            # nos fundos, o complemento acima do come-cotas
+            rates = regressive_rate(holding + DAYS_PER_MONTH * (month + 1))
+            gain_rates = (np.where(regressive, rates, 0.0)
+                          + np.where(come_cotas, np.maximum(rates - COME_COTAS_RATE, 0), 0.0))
+
+        gain = np.maximum(values - cost_basis, 0)
+        base_tax = (gain * gain_rates).sum(axis=0)
+        if has_come_cotas:
+            # Rendimento desde o último come-cotas ainda não foi antecipado
+            base_tax += COME_COTAS_RATE * (np.maximum(values - come_cotas_base, 0) * come_cotas).sum(axis=0)
+
+        balance = values.sum(axis=0)
+        # Carteiras esgotadas dividem por zero; a máscara alive descarta o valor
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = withdrawal / (balance - base_tax)
+        month_tax = base_tax
+
+        if has_stocks:
+            # Isenção vale enquanto as vendas de ações do mês ficam até R$ 20 mil
+            full_tax = base_tax + (gain * stock_rates).sum(axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                exempt = fraction * (values * stocks).sum(axis=0) <= STOCK_EXEMPTION
+                fraction = np.where(exempt, fraction, withdrawal / (balance - full_tax))
+            month_tax = np.where(exempt, base_tax, full_tax)
+
+        alive = depleted_month < 0
+        short = alive & ~(fraction < 1)
+        depleted_month = np.where(short, month + 1, depleted_month)
+
+        fraction = np.where(alive, np.fmin(fraction, 1.0), 0.0)
+        gross_withdrawn += fraction * balance
+        taxes_paid += fraction * month_tax
+
+        keep = 1 - fraction
+        values *= keep
+        cost_basis *= keep
+        come_cotas_base *= keep
+
+        withdrawal *= 1 + monthly_inflation
+
+    survived = depleted_month < 0
+    return DecumulationResult(
+        survived=survived,
+        depleted_month=depleted_month,
+        final_balance=values.sum(axis=0),
+        gross_withdrawn=gross_withdrawn,
+        taxes_paid=taxes_paid
+    )
+
+def sustainable_withdrawal_rate(values: Any, cost_basis: Any, regimes: Any, monthly_returns: Any,
+                                months: int, monthly_inflation: float = 0.0, holding_days: Any = MATURED_HOLDING_DAYS,
+                                start_month: int = 1, initial_rate: float = 0.25,
+                                tolerance: float = 1e-4) -> np.ndarray:
+    """Maior taxa anual de saque líquido (sobre o saldo inicial) que dura o horizonte
+
+    O intervalo começa em [0, initial_rate] e dobra para as carteiras que
+    ainda sobrevivem no topo, até MAX_WITHDRAWAL_RATE (ValueError se alguma
+    sobrevive até lá). Depois, bisseção vetorizada: todas as carteiras
+    avançam juntas, uma simulação completa por iteração.
+    """
+
+    values = np.array(values, dtype=np.float64, ndmin=2)
+    initial_balance = values.sum(axis=1)
+
+    def survives(rate: np.ndarray) -> np.ndarray:
+        return simulate_withdrawals(
+            values, cost_basis, regimes, monthly_returns,
+            monthly_withdrawal=rate * initial_balance / 12,
+            months=months,
+            monthly_inflation=monthly_inflation,
+            holding_days=holding_days,
+            start_month=start_month
+        ).survived
+
+    low = np.zeros(values.shape[0])
+    high = np.full(values.shape[0], min(initial_rate, MAX_WITHDRAWAL_RATE))
+
+    # Ampliar o intervalo até a taxa do topo esgotar todas as carteiras
+    survived = survives(high)
+    while survived.any():
+        if np.any(high[survived] >= MAX_WITHDRAWAL_RATE):
+            raise ValueError(
+                f"Carteira sobrevive a saques de {MAX_WITHDRAWAL_RATE:.0%} ao ano; revise os retornos informados"
+            )
+        low = np.where(survived, high, low)
+        high = np.where(survived, np.minimum(high * 2, MAX_WITHDRAWAL_RATE), high)
+        survived = survives(high)
+
+    while np.max(high - low) > tolerance:
+        middle = (low + high) / 2
+        survived = survives(middle)
+        low = np.where(survived, middle, low)
+        high = np.where(survived, high, middle)
+
+    return low
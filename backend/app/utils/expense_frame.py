@@ -0,0 +1,166 @@
+"""
+Representação colunar de despesas para análises
+Datas em dias desde 1970-01-01, valores em centavos (int64) e categorias,
+subcategorias e métodos de pagamento codificados por dicionário
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.schemas.expense import UNCATEGORIZED, UNSPECIFIED_PAYMENT_METHOD
+from app.utils.money import divide_cents
+
+def _encode(values: Iterable[Optional[str]], empty_label: str = "") -> Tuple[np.ndarray, List[str]]:
+    """Codificar valores por dicionário: (códigos, rótulos)
+
+    Valores vazios recebem `empty_label`, o mesmo rótulo do rollup mensal.
+    """
+
+    lookup: Dict[str, int] = {}
+    codes = [lookup.setdefault(value or empty_label, len(lookup)) for value in values]
+    return np.asarray(codes, dtype=np.int32), list(lookup)
+
+def _field(record: Any, name: str) -> Any:
+    """Ler campo de dicionário ou objeto (modelo/schema)"""
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+class ExpenseFrame:
+    """Colunas de despesas com agregações vetorizadas (NumPy)
+
+    Construída uma vez por requisição; todas as agregações são group-bys
+    com np.bincount sobre os códigos, sem laços em Python por despesa.
+    """
+
+    def __init__(self, days: np.ndarray, cents: np.ndarray,
+                 category_codes: np.ndarray, categories: List[str],
+                 subcategory_codes: np.ndarray, subcategories: List[str],
+                 payment_codes: np.ndarray, payment_methods: List[str]):
+        self.days = days
+        self.cents = cents
+        self.category_codes = category_codes
+        self.categories = categories
+        self.subcategory_codes = subcategory_codes
+        self.subcategories = subcategories
+        self.payment_codes = payment_codes
+        self.payment_methods = payment_methods
+
+    @classmethod
+    def from_columns(cls, dates: Sequence[Any], amounts: Sequence[Any],
+                     categories: Sequence[Optional[str]],
+                     subcategories: Optional[Sequence[Optional[str]]] = None,
+                     payment_methods: Optional[Sequence[Optional[str]]] = None) -> "ExpenseFrame":
+        """Montar a partir de colunas (datas ISO/date/datetime e valores em reais)"""
+
+        size = len(amounts)
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        # Valores têm no máximo 2 casas: x * 100 fica a ~1e-12 de um inteiro
+        cents = np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+        category_codes, category_labels = _encode(categories, UNCATEGORIZED)
+        subcategory_codes, subcategory_labels = _encode(subcategories or [None] * size)
+        payment_codes, payment_labels = _encode(payment_methods or [None] * size, UNSPECIFIED_PAYMENT_METHOD)
+
+        return cls(
+            days, cents,
+            category_codes, category_labels,
+            subcategory_codes, subcategory_labels,
+            payment_codes, payment_labels
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "ExpenseFrame":
+        """Montar a partir de dicionários, modelos Expense ou ExpenseResponse"""
+
+        records = list(records)
+        return cls.from_columns(
+            [_field(record, "date") for record in records],
+            [_field(record, "amount") for record in records],
+            [getattr(_field(record, "category"), "value", _field(record, "category")) for record in records],
+            [_field(record, "subcategory") for record in records],
+            [getattr(_field(record, "payment_method"), "value", _field(record, "payment_method")) for record in records]
+        )
+
+    def __len__(self) -> int:
+        return int(self.cents.size)
+
+    @property
+    def total_cents(self) -> int:
+        return int(self.cents.sum())
+
+    def between(self, start: Optional[date] = None, end: Optional[date] = None) -> "ExpenseFrame":
+        """Recorte por período (datas inclusivas)"""
+
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.days >= _day_number(start)
+        if end is not None:
+            mask &= self.days <= _day_number(end)
+
+        return ExpenseFrame(
+            self.days[mask], self.cents[mask],
+            self.category_codes[mask], self.categories,
+            self.subcategory_codes[mask], self.subcategories,
+            self.payment_codes[mask], self.payment_methods
+        )
+
+    def stats_cents(self) -> Dict[str, int]:
+        """Total, contagem, média, mediana, mínimo e máximo em centavos
+
+        Média e mediana são arredondadas para o centavo (meio para cima).
+        """
+
+        count = len(self)
+        if not count:
+            return {"total": 0, "count": 0, "average": 0, "median": 0, "min": 0, "max": 0}
+
+        half = count // 2
+        if count % 2:
+            median = int(np.partition(self.cents, half)[half])
+        else:
+            middle = np.partition(self.cents, [half - 1, half])
+            median = divide_cents(int(middle[half - 1]) + int(middle[half]), 1, 2)
+
+        return {
+            "total": self.total_cents,
+            "count": count,
+            "average": divide_cents(self.total_cents, 1, count),
+            "median": median,
+            "min": int(self.cents.min()),
+            "max": int(self.cents.max())
+        }
+
+    def group_by(self, column: str = "category") -> Dict[str, Dict[str, int]]:
+        """Total (centavos) e contagem por categoria, subcategoria ou pagamento"""
+
+        codes, labels = {
+            "category": (self.category_codes, self.categories),
+            "subcategory": (self.subcategory_codes, self.subcategories),
+            "payment_method": (self.payment_codes, self.payment_methods),
+        }[column]
+
+        counts = np.bincount(codes, minlength=len(labels))
+        # Pesos em float64 são exatos para somas abaixo de 2^53 centavos
+        totals = np.rint(np.bincount(codes, weights=self.cents, minlength=len(labels))).astype(np.int64)
+
+        return {
+            labels[code]: {"total": int(totals[code]), "count": int(counts[code])}
+            for code in np.flatnonzero(counts)
+        }
+
+    def monthly_totals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Meses presentes (meses desde 1970-01) e total em centavos de cada um"""
+
+        months = self.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        unique_months, inverse = np.unique(months, return_inverse=True)
+        totals = np.bincount(inverse, weights=self.cents, minlength=unique_months.size)
+        return unique_months, np.rint(totals).astype(np.int64)
+
+def _day_number(value: Any) -> int:
+    """Dias desde 1970-01-01"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return int(np.datetime64(value, "D").astype(np.int64))
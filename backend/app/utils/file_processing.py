@@ -3,11 +3,14 @@ Utilitários para processamento de arquivos
 """
 
 import os
-import magic
 import hashlib
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from app.utils.lazy_import import lazy_import
+
+magic = lazy_import("magic")
+
 class FileProcessor:
     """Processador de arquivos com validações e metadados"""
     
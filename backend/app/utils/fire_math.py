@@ -0,0 +1,267 @@
+"""
+Matemática financeira dos cálculos FIRE
+Premissas imutáveis por requisição, conversões de taxa memoizadas e
+fórmulas fechadas de acumulação com busca de raiz para metas
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+@dataclass(frozen=True)
+class RateTable:
+    """Taxas derivadas de um par (retorno anual, inflação anual)"""
+
+    annual_return: float
+    inflation_rate: float
+    monthly_return: float
+    monthly_inflation: float
+    real_return: float
+    monthly_real_return: float
+
+@lru_cache(maxsize=1024)
+def rate_table(annual_return: float, inflation_rate: float) -> RateTable:
+    """Converter taxas anuais em mensais (compartilhado entre requisições)"""
+
+    real_return = (1 + annual_return) / (1 + inflation_rate) - 1
+
+    return RateTable(
+        annual_return=annual_return,
+        inflation_rate=inflation_rate,
+        monthly_return=monthly_rate(annual_return),
+        monthly_inflation=monthly_rate(inflation_rate),
+        real_return=real_return,
+        monthly_real_return=monthly_rate(real_return)
+    )
+
+def monthly_rate(annual_rate: float) -> float:
+    """Taxa mensal equivalente a uma taxa anual"""
+    return (1 + annual_rate) ** (1 / 12) - 1
+
+@dataclass(frozen=True)
+class FireAssumptions:
+    """Premissas de um cálculo FIRE, calculadas uma vez por requisição
+
+    Cenários derivam novas premissas com dataclasses.replace em vez de
+    validar outro FireCalculationRequest.
+    """
+
+    expected_return: float
+    inflation_rate: float
+    target_monthly_expenses: float
+    consider_tax: bool
+    fire_multiplier: int = 25  # Regra 25x
+    withdrawal_rate: float = 0.04  # Regra 4%
+
+    @property
+    def rates(self) -> RateTable:
+        return rate_table(self.expected_return, self.inflation_rate)
+
+    @property
+    def real_return(self) -> float:
+        return self.rates.real_return
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Formato de FireCalculationResponse.assumptions"""
+
+        return {
+            "expected_return": self.expected_return,
+            "inflation_rate": self.inflation_rate,
+            "real_return": self.real_return,
+            "target_monthly_expenses": self.target_monthly_expenses,
+            "fire_multiplier": self.fire_multiplier,
+            "withdrawal_rate": self.withdrawal_rate,
+            "consider_tax": self.consider_tax
+        }
+
+def growth_factor(monthly_return: float, months: float) -> float:
+    """(1 + r)^n"""
+    return (1 + monthly_return) ** months
+
+def annuity_factor(monthly_return: float, months: float) -> float:
+    """Valor futuro de aportes unitários: ((1 + r)^n - 1) / r"""
+
+    if abs(monthly_return) < 1e-12:
+        return float(months)
+    return (growth_factor(monthly_return, months) - 1) / monthly_return
+
+def future_value(present_value: float, contribution: float, monthly_return: float, months: float) -> float:
+    """FV = PV * (1 + r)^n + PMT * [((1 + r)^n - 1) / r]"""
+
+    return (present_value * growth_factor(monthly_return, months)
+            + contribution * annuity_factor(monthly_return, months))
+
+def months_to_target(target: float, present_value: float, contribution: float,
+                     monthly_return: float, max_months: int = 600) -> int:
+    """Primeiro mês em que o patrimônio atinge o alvo (forma fechada)
+
+    Equivale a iterar valor = valor * (1 + r) + PMT até atingir o alvo,
+    limitado a max_months.
+    """
+
+    if present_value >= target:
+        return 0
+
+    if abs(monthly_return) < 1e-12:
+        if contribution <= 0:
+            return max_months
+        months = (target - present_value) / contribution
+    else:
+        # n = log((FV * r + PMT) / (PV * r + PMT)) / log(1 + r)
+        numerator = target * monthly_return + contribution
+        denominator = present_value * monthly_return + contribution
+        if numerator <= 0 or denominator <= 0:
+            return max_months
+        months = math.log(numerator / denominator) / math.log(1 + monthly_return)
+
+    # Tolerância para não pular um mês por erro de arredondamento
+    result = math.ceil(months - 1e-9)
+    if result > 0 and future_value(present_value, contribution, monthly_return, result - 1) >= target:
+        result -= 1
+
+    return max(0, min(max_months, result))
+
+def required_contribution(target: float, present_value: float, monthly_return: float, months: int) -> float:
+    """Aporte mensal mínimo para atingir o alvo em n meses (forma fechada)"""
+
+    if months <= 0:
+        return 0.0 if present_value >= target else math.inf
+
+    needed = target - present_value * growth_factor(monthly_return, months)
+    return max(0.0, needed / annuity_factor(monthly_return, months))
+
+def solve_increasing(func: Callable[[float], float], low: float, high: float,
+                     derivative: Optional[Callable[[float], float]] = None,
+                     tolerance: float = 1e-10, value_tolerance: float = 0.005,
+                     max_iterations: int = 100, f_low: Optional[float] = None,
+                     f_high: Optional[float] = None) -> Tuple[float, int]:
+    """Raiz de função crescente em [low, high]: Newton protegido por bisseção
+
+    Passos de Newton que saem do intervalo viram bisseção, então a
+    convergência é garantida quando func(low) <= 0 <= func(high).
+    f_low/f_high evitam reavaliar extremos que o chamador já calculou.
+
+    Returns:
+        (raiz, número de avaliações de func feitas aqui)
+    """
+
+    evaluations = 0
+    if f_low is None:
+        f_low = func(low)
+        evaluations += 1
+    if f_high is None:
+        f_high = func(high)
+        evaluations += 1
+
+    if f_low > 0 or f_high < 0:
+        raise ValueError("Intervalo não contém a raiz")
+
+    x = (low + high) / 2
+    for _ in range(max_iterations):
+        fx = func(x)
+        evaluations += 1
+
+        if abs(fx) <= value_tolerance or high - low <= tolerance:
+            return x, evaluations
+
+        if fx < 0:
+            low = x
+        else:
+            high = x
+
+        step = None
+        if derivative is not None:
+            slope = derivative(x)
+            if slope > 0:
+                step = x - fx / slope
+
+        x = step if step is not None and low < step < high else (low + high) / 2
+
+    return x, evaluations
+
+def future_value_return_derivative(present_value: float, contribution: float,
+                                   annual_return: float, months: int) -> float:
+    """d FV / d (retorno anual), com r mensal = (1 + R)^(1/12) - 1"""
+
+    r = monthly_rate(annual_return)
+    growth = growth_factor(r, months)
+    d_growth = months / 12 * (1 + annual_return) ** (months / 12 - 1)
+    d_rate = (1 + annual_return) ** (-11 / 12) / 12
+
+    if abs(r) < 1e-9:
+        # Limite r -> 0 da derivada do fator de anuidade
+        d_annuity = months * (months - 1) / 2 * d_rate
+    else:
+        d_annuity = (d_growth * r - (growth - 1) * d_rate) / r ** 2
+
+    return present_value * d_growth + contribution * d_annuity
+
+def months_to_target_grid(target: Any, present_value: Any, contribution: Any,
+                          monthly_return: Any, max_months: int = 600) -> np.ndarray:
+    """Versão vetorizada (broadcast NumPy) de months_to_target
+
+    Retorna meses fracionários (sem arredondar), limitados a [0, max_months],
+    para que diferenças pequenas entre pontos da grade não sumam no ceil.
+    """
+
+    target = np.asarray(target, dtype=np.float64)
+    present_value = np.asarray(present_value, dtype=np.float64)
+    contribution = np.asarray(contribution, dtype=np.float64)
+    monthly_return = np.asarray(monthly_return, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        numerator = target * monthly_return + contribution
+        denominator = present_value * monthly_return + contribution
+        logarithmic = np.log(numerator / denominator) / np.log1p(monthly_return)
+        linear = (target - present_value) / contribution
+
+        near_zero = np.abs(monthly_return) < 1e-12
+        months = np.where(near_zero, linear, logarithmic)
+        reachable = np.where(near_zero, contribution > 0, (numerator > 0) & (denominator > 0))
+        months = np.where(reachable & np.isfinite(months), months, max_months)
+
+    months = np.where(present_value >= target, 0.0, months)
+    return np.clip(months, 0, max_months)
+
+@dataclass(frozen=True)
+class ProjectionFactors:
+    """Fatores anuais de acumulação para (taxa mensal, inflação, anos)
+
+    O saldo ao fim do ano y é linear nas entradas:
+    saldo[y] = PV * pv_factors[y] + PMT * pmt_factors[y]
+    então mudar só o aporte ou o patrimônio inicial não exige nova simulação.
+    """
+
+    pv_factors: np.ndarray
+    pmt_factors: np.ndarray
+    inflation_discounts: np.ndarray
+
+    def balances(self, present_value: float, contribution: float) -> np.ndarray:
+        """Saldo nominal ao fim de cada ano"""
+        return present_value * self.pv_factors + contribution * self.pmt_factors
+
+    def real_balances(self, present_value: float, contribution: float) -> np.ndarray:
+        """Saldo ao fim de cada ano em valores de hoje"""
+        return self.balances(present_value, contribution) * self.inflation_discounts
+
+@lru_cache(maxsize=512)
+def projection_factors(monthly_return: float, inflation_rate: float, years: int) -> ProjectionFactors:
+    """Tabela de fatores compartilhada entre requisições (arrays somente leitura)"""
+
+    months = 12 * np.arange(1, years + 1, dtype=np.float64)
+    pv_factors = (1 + monthly_return) ** months
+
+    if abs(monthly_return) < 1e-12:
+        pmt_factors = months.copy()
+    else:
+        pmt_factors = (pv_factors - 1) / monthly_return
+
+    inflation_discounts = (1 + inflation_rate) ** -np.arange(1, years + 1, dtype=np.float64)
+
+    for array in (pv_factors, pmt_factors, inflation_discounts):
+        array.setflags(write=False)
+
+    return ProjectionFactors(pv_factors, pmt_factors, inflation_discounts)
@@ -0,0 +1,96 @@
+"""
+Importação preguiçosa de bibliotecas pesadas
+cv2, pandas, pdfplumber, pytesseract, magic e openai custam centenas de
+milissegundos para importar; com lazy_import o módulo só é carregado no
+primeiro acesso a um atributo (ex.: quando o primeiro CSV é processado).
+prewarm() carrega os módulos registrados em segundo plano depois que o
+servidor já está atendendo.
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LazyModule:
+    """Proxy que importa o módulo real no primeiro acesso a atributo"""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.loaded else "não carregado"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+# Módulos declarados com lazy_import (nome -> proxy), usados pelo prewarm
+_registry: Dict[str, LazyModule] = {}
+
+def lazy_import(name: str) -> LazyModule:
+    """Proxy preguiçoso para `name` (um por nome em todo o processo)"""
+
+    module = _registry.get(name)
+    if module is None:
+        module = _registry[name] = LazyModule(name)
+    return module
+
+def is_available(name: str) -> bool:
+    """Módulo instalado, sem importá-lo"""
+
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def prewarm(names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Importar os módulos registrados (ou `names`) e devolver os carregados
+
+    Módulos não instalados são ignorados: o erro aparece apenas se a
+    funcionalidade que depende deles for usada.
+    """
+
+    loaded = []
+    for name in list(names if names is not None else _registry):
+        started = time.perf_counter()
+        try:
+            lazy_import(name)._load()
+        except ImportError as e:
+            logger.debug(f"Pré-carregamento de {name} ignorado: {str(e)}")
+            continue
+        loaded.append(name)
+        logger.info(f"Módulo {name} pré-carregado em {(time.perf_counter() - started) * 1000:.0f}ms")
+    return loaded
+
+def prewarm_in_background(names: Optional[Iterable[str]] = None) -> threading.Thread:
+    """prewarm() em thread daemon (não bloqueia o event loop)"""
+
+    thread = threading.Thread(target=prewarm, args=(names,), name="fire-prewarm", daemon=True)
+    thread.start()
+    return thread
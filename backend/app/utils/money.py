@@ -0,0 +1,58 @@
+"""
+Valores monetários em centavos inteiros
+Cálculos internos usam int (centavos) ou float (taxas e projeções); Decimal
+aparece apenas na fronteira com os schemas, sempre com arredondamento
+ROUND_HALF_UP para duas casas
+"""
+
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any
+
+import numpy as np
+
+CENT = Decimal("0.01")
+
+def to_cents(value: Any) -> int:
+    """Converter reais (Decimal, int, float ou str) para centavos
+
+    Floats são lidos pela representação mais curta (repr), então 2.675
+    vira 268 centavos, como o usuário digitou, e não 267.
+    """
+
+    if isinstance(value, float):
+        value = repr(value)
+    return int((Decimal(value) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+def from_cents(cents: int) -> Decimal:
+    """Converter centavos para Decimal com duas casas (exato)"""
+    return Decimal(int(cents)).scaleb(-2)
+
+def cents_to_float(cents: int) -> float:
+    """Converter centavos para reais em float (respostas JSON e prompts)
+
+    Recebe centavos inteiros; médias e medianas devem ser arredondadas
+    antes (divide_cents).
+    """
+    return cents / 100
+
+def float_to_cents(value: float) -> int:
+    """Arredondar resultado de cálculo em float para centavos (meio para cima)"""
+    cents = math.floor(abs(value) * 100 + 0.5)
+    return int(cents) if value >= 0 else -int(cents)
+
+def float_to_cents_array(values: np.ndarray) -> np.ndarray:
+    """float_to_cents vetorizado (int64)"""
+    return (np.sign(values) * np.floor(np.abs(values) * 100 + 0.5)).astype(np.int64)
+
+def divide_cents(cents: int, numerator: int, denominator: int) -> int:
+    """cents * numerator / denominator em inteiros, arredondando meio para cima"""
+
+    if denominator <= 0:
+        raise ValueError("Denominador deve ser positivo")
+
+    product = cents * numerator
+    quotient, remainder = divmod(abs(product), denominator)
+    if 2 * remainder >= denominator:
+        quotient += 1
+    return quotient if product >= 0 else -quotient
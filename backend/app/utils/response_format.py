@@ -0,0 +1,115 @@
+"""
+Formatos de resposta das projeções
+JSON padrão (lista de FireProjection) ou formato compacto em colunas,
+codificado com orjson ou MessagePack quando instalados, negociado pelo
+cabeçalho Accept
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # Opcional: cai para o json da biblioteca padrão
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Opcional: MessagePack só é oferecido se instalado
+    msgpack = None
+
+JSON = "application/json"
+COMPACT_JSON = "application/vnd.fire.compact+json"
+MSGPACK = "application/msgpack"
+
+# Aliases aceitos no Accept
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+# Curingas atendidos com o formato padrão
+_WILDCARDS = {"*/*", "application/*"}
+
+def available_formats() -> List[str]:
+    """Formatos suportados neste ambiente"""
+
+    formats = [JSON, COMPACT_JSON]
+    if msgpack is not None:
+        formats.append(MSGPACK)
+    return formats
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Escolher o formato pelo Accept (respeitando q); padrão JSON
+
+    Sem Accept ou com curingas (*/*, application/*), a resposta é o JSON de
+    sempre. None quando nenhum tipo aceito está disponível neste ambiente
+    (ex.: só application/msgpack sem o pacote msgpack): a rota responde 406.
+    """
+
+    if not accept:
+        return JSON
+
+    supported = available_formats()
+    candidates = []
+
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        if not media_type:
+            continue
+        media_type = _ALIASES.get(media_type.lower(), media_type.lower())
+        if media_type in _WILDCARDS:
+            media_type = JSON
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if quality > 0 and media_type in supported:
+            candidates.append((-quality, position, media_type))
+
+    return min(candidates)[2] if candidates else None
+
+def projection_columns(projections: Sequence[Any]) -> Dict[str, Any]:
+    """Lista de FireProjection -> arrays paralelos (valores em reais, float)
+
+    Aporte e retorno são constantes ao longo da projeção e viram escalares.
+    """
+
+    first = projections[0] if projections else None
+
+    return {
+        "year": [projection.year for projection in projections],
+        "age": [projection.age for projection in projections],
+        "accumulated_amount": [float(projection.accumulated_amount) for projection in projections],
+        "inflation_adjusted": [float(projection.inflation_adjusted) for projection in projections],
+        "monthly_contribution": float(first.monthly_contribution) if first else 0.0,
+        "annual_return": float(first.annual_return) if first else 0.0
+    }
+
+def compact_payload(response: Any) -> Dict[str, Any]:
+    """Resposta com `projections` em colunas; demais campos como no JSON"""
+
+    payload = response.model_dump(mode="json", exclude={"projections"})
+    payload["projections"] = projection_columns(response.projections)
+    return payload
+
+def encode(response: Any, media_type: str) -> bytes:
+    """Serializar um modelo de resposta no formato negociado"""
+
+    if media_type == JSON:
+        return response.model_dump_json().encode()
+
+    payload = compact_payload(response)
+
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
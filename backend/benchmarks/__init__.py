@@ -0,0 +1,3 @@
+"""
+Benchmarks do backend FIRE Brasil
+"""
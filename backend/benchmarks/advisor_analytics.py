@@ -0,0 +1,97 @@
+"""
+Benchmark das análises do FinancialAdvisorAgent
+Compara laços sobre List[Dict] com o ExpenseFrame colunar
+
+Uso:
+    python -m benchmarks.advisor_analytics --rows 36500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.agents.financial_advisor import FinancialAdvisorAgent
+from app.core.config import BRAZILIAN_EXPENSE_CATEGORIES
+from app.utils.expense_frame import ExpenseFrame
+
+def synthetic_expenses(rows: int) -> List[Dict[str, Any]]:
+    """Despesas sintéticas distribuídas em 10 anos"""
+
+    rng = random.Random(42)
+    categories = list(BRAZILIAN_EXPENSE_CATEGORIES)
+    start = date.today() - timedelta(days=3650)
+
+    return [
+        {
+            "date": (start + timedelta(days=rng.randrange(3650))).isoformat(),
+            "amount": rng.randrange(100, 100_000) / 100,
+            "category": (category := rng.choice(categories)),
+            "subcategory": BRAZILIAN_EXPENSE_CATEGORIES[category]["subcategories"][0],
+            "payment_method": rng.choice(["pix", "credito", "debito"]),
+        }
+        for _ in range(rows)
+    ]
+
+def baseline(expenses: List[Dict[str, Any]]) -> None:
+    """Laços equivalentes às versões anteriores dos helpers"""
+
+    totals: Dict[str, float] = {}
+    amounts_by_category: Dict[str, List[float]] = {}
+    for expense in expenses:
+        totals[expense["category"]] = totals.get(expense["category"], 0) + expense["amount"]
+        amounts_by_category.setdefault(expense["category"], []).append(expense["amount"])
+
+    for amounts in amounts_by_category.values():
+        statistics.mean(amounts)
+
+    amounts = [expense["amount"] for expense in expenses]
+    statistics.median(amounts)
+    sum(amounts)
+
+def columnar(agent: FinancialAdvisorAgent, expenses: List[Dict[str, Any]]) -> None:
+    """Frame montado uma vez e compartilhado pelos helpers"""
+
+    frame = ExpenseFrame.from_records(expenses)
+    agent._calculate_category_breakdown(frame)
+    agent._analyze_spending_patterns(frame)
+    agent._identify_savings_opportunities(frame)
+    stats = agent._calculate_comprehensive_stats(frame)
+    agent._project_next_month(frame, stats)
+
+def timed(label: str, fn: Callable[[], None], repeat: int = 5):
+    """Medir mediana de execução"""
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    print(f"  {label:<45} {statistics.median(samples):>9.2f} ms")
+
+def main(rows: int):
+    agent = FinancialAdvisorAgent()
+    expenses = synthetic_expenses(rows)
+    frame = ExpenseFrame.from_records(expenses)
+
+    print(f"📊 {rows:,} despesas (mediana de 5 execuções)")
+    timed("List[Dict] com laços Python", lambda: baseline(expenses))
+    timed("ExpenseFrame (montagem + análises)", lambda: columnar(agent, expenses))
+    timed("ExpenseFrame (apenas análises)", lambda: (
+        agent._analyze_spending_patterns(frame),
+        agent._identify_savings_opportunities(frame),
+        agent._project_next_month(frame, agent._calculate_comprehensive_stats(frame))
+    ))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=36_500)
+    args = parser.parse_args()
+
+    main(args.rows)
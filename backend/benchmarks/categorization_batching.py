@@ -0,0 +1,112 @@
+"""
+Benchmark do micro-batching de categorizações
+Gera chegadas de Poisson de despesas individuais (usuários diferentes) em
+várias taxas e compara latência p50/p99 e vazão com e sem o micro-batcher.
+O cliente OpenAI é o falso de benchmarks.fake_openai, com latência fixa
+por chamada; o limite de concorrência do gateway faz o papel do rate
+limit da API.
+
+Uso:
+    python -m benchmarks.categorization_batching
+    python -m benchmarks.categorization_batching --rates 50 200 800 --latency-ms 400 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.core.config import settings
+from benchmarks.fake_openai import FakeAsyncOpenAI
+
+DESCRIPTIONS = ["Supermercado Extra", "Uber viagem", "iFood pedido", "Posto Shell",
+                "Drogasil", "Netflix", "Restaurante Fogo de Chão", "Aluguel apartamento"]
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def run_rate(batching: bool, rate: float, duration: float, latency: float, seed: int) -> Dict[str, float]:
+    from app.agents.expense_categorizer import ExpenseCategorizerAgent
+    from app.schemas.expense import ExpenseCreate
+
+    settings.CATEGORIZATION_BATCHING = batching
+    # Mede o caminho da LLM: sem o índice, estabelecimentos do catálogo não a chamariam
+    settings.MERCHANT_INDEX_ENABLED = False
+    agent = ExpenseCategorizerAgent()
+    agent.openai_client = FakeAsyncOpenAI(latency=latency)
+    rng = random.Random(seed)
+
+    latencies: List[float] = []
+
+    async def one(index: int):
+        # Descrição e usuário únicos: o cache de aprendizado não responde
+        expense = ExpenseCreate(
+            date=date.today(),
+            description=f"{rng.choice(DESCRIPTIONS)} #{index}",
+            amount=Decimal("42.90")
+        )
+        started = time.perf_counter()
+        await agent._categorize_with_ai(expense, f"user-{index}")
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    started = time.perf_counter()
+    index = 0
+    next_arrival = 0.0
+    while next_arrival < duration:
+        delay = started + next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(index)))
+        index += 1
+        next_arrival += rng.expovariate(rate)
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await agent.batcher.stop()
+
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "llm_calls": agent.openai_client.calls,
+    }
+
+async def main(rates: List[float], duration: float, latency: float, seed: int):
+    print(f"🧾 Categorização individual: chegadas de Poisson por {duration:.0f}s, "
+          f"LLM {latency * 1000:.0f} ms/chamada, {settings.OPENAI_MAX_CONCURRENCY} chamadas simultâneas, "
+          f"lote até {settings.CATEGORIZATION_BATCH_SIZE} itens / {settings.CATEGORIZATION_BATCH_WINDOW_MS:.0f} ms")
+    print(f"\n{'taxa':>8} {'modo':<10} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'chamadas':>9}")
+
+    for rate in rates:
+        for batching in (False, True):
+            result = await run_rate(batching, rate, duration, latency, seed)
+            mode = "lote" if batching else "individual"
+            print(f"{rate:>8.0f} {mode:<10} {result['throughput']:>8.1f} {result['p50_ms']:>9.1f} "
+                  f"{result['p99_ms']:>9.1f} {result['llm_calls']:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=float, nargs="+", default=[20, 100, 400], help="Chegadas por segundo")
+    parser.add_argument("--duration", type=float, default=3.0, help="Segundos de chegadas por taxa")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Latência de cada chamada ao LLM")
+    parser.add_argument("--concurrency", type=int, default=8, help="OPENAI_MAX_CONCURRENCY do gateway")
+    parser.add_argument("--batch-size", type=int, default=settings.CATEGORIZATION_BATCH_SIZE)
+    parser.add_argument("--window-ms", type=float, default=settings.CATEGORIZATION_BATCH_WINDOW_MS)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    settings.OPENAI_MAX_CONCURRENCY = args.concurrency
+    settings.CATEGORIZATION_BATCH_SIZE = args.batch_size
+    settings.CATEGORIZATION_BATCH_WINDOW_MS = args.window_ms
+
+    asyncio.run(main(args.rates, args.duration, args.latency_ms / 1000, args.seed))
@@ -0,0 +1,137 @@
+"""
+Tokens por despesa na categorização em lote
+Monta as chamadas reais do ExpenseCategorizerAgent (prompt de sistema,
+prompt do lote e response_format) com o cliente falso e conta tokens de
+entrada e saída por despesa, com custo e latência estimados por chamada.
+Conta com tiktoken (o200k_base) quando disponível; senão ~4 caracteres
+por token.
+
+Uso:
+    python -m benchmarks.categorization_tokens --output tokens_base.json
+    python -m benchmarks.categorization_tokens --compare tokens_base.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from benchmarks.fake_openai import FakeAsyncOpenAI
+from app.utils.lazy_import import is_available
+
+DESCRIPTIONS = ["Supermercado Pão de Açúcar", "Uber *Trip São Paulo", "iFood *Restaurante Sabor",
+                "Posto Ipiranga BR 116", "Drogasil 0423", "Netflix.com", "Cinema Cinemark Iguatemi",
+                "Aluguel apartamento março", "Restaurante Fogo de Chão", "Pag*Padaria Real"]
+
+def token_counter() -> Tuple[str, Callable[[str], int]]:
+    """tiktoken quando instalado e com o vocabulário em cache; senão ~4 caracteres por token"""
+
+    if is_available("tiktoken"):
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding("o200k_base")
+            return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+        except Exception:
+            pass
+    return "aproximação ~4 caracteres/token", lambda text: max(1, len(text) // 4)
+
+def request_tokens(request: Dict[str, Any], count: Callable[[str], int]) -> Tuple[int, int]:
+    """(tokens de entrada, tokens de saída) de uma chamada registrada pelo cliente falso"""
+
+    prompt = sum(count(message["content"]) for message in request["messages"])
+    response_format = request["response_format"] or {}
+    if response_format.get("type") == "json_schema":
+        # O schema também é enviado ao modelo e cobrado como entrada
+        prompt += count(json.dumps(response_format["json_schema"], ensure_ascii=False))
+    return prompt, count(request["content"])
+
+async def measure(sizes: List[int], count: Callable[[str], int], input_price: float, output_price: float,
+                  prefill_ms: float, decode_ms: float) -> Dict[str, Dict[str, float]]:
+    from app.agents.expense_categorizer import ExpenseCategorizerAgent
+    from app.schemas.expense import ExpenseCreate
+
+    agent = ExpenseCategorizerAgent()
+    agent.openai_client = FakeAsyncOpenAI()
+
+    # Histórico do usuário (entra no prompt dos lotes de um único usuário)
+    for description in DESCRIPTIONS[:5]:
+        agent._update_learning_cache("bench", f"{description} anterior", agent._fallback_categorization(
+            ExpenseCreate(date=date.today(), description=description, amount=Decimal("10"))
+        ))
+
+    results = {}
+    for size in sizes:
+        items = [
+            (ExpenseCreate(
+                date=date.today() - timedelta(days=i),
+                description=DESCRIPTIONS[i % len(DESCRIPTIONS)],
+                amount=Decimal("42.90") + i
+            ), "bench")
+            for i in range(size)
+        ]
+        await agent._categorize_items_with_ai(items)
+        prompt, completion = request_tokens(agent.openai_client.last_request, count)
+
+        cost = (prompt * input_price + completion * output_price) / 1_000_000
+        results[str(size)] = {
+            "prompt_per_expense": prompt / size,
+            "completion_per_expense": completion / size,
+            "tokens_per_expense": (prompt + completion) / size,
+            "usd_per_1000_expenses": cost / size * 1000,
+            "latency_ms_per_call": prompt * prefill_ms + completion * decode_ms,
+        }
+
+    await agent.batcher.stop()
+    return results
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Any]]):
+    print(f"\n{'lote':>5} {'entrada/desp':>13} {'saída/desp':>11} {'total/desp':>11} "
+          f"{'US$/1000':>9} {'latência ms':>12}")
+
+    for size, row in results.items():
+        print(f"{size:>5} {row['prompt_per_expense']:>13.1f} {row['completion_per_expense']:>11.1f} "
+              f"{row['tokens_per_expense']:>11.1f} {row['usd_per_1000_expenses']:>9.4f} "
+              f"{row['latency_ms_per_call']:>12.0f}")
+
+        before = (baseline or {}).get(size)
+        if before:
+            print(f"{'':>5} {'redução':>13} "
+                  f"{before['tokens_per_expense'] / row['tokens_per_expense']:>23.1f}x "
+                  f"{before['usd_per_1000_expenses'] / row['usd_per_1000_expenses']:>8.1f}x "
+                  f"{before['latency_ms_per_call'] / row['latency_ms_per_call']:>11.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 20], help="Despesas por chamada")
+    parser.add_argument("--input-price", type=float, default=0.15, help="US$ por 1M tokens de entrada")
+    parser.add_argument("--output-price", type=float, default=0.60, help="US$ por 1M tokens de saída")
+    parser.add_argument("--prefill-ms", type=float, default=0.05, help="ms por token de entrada")
+    parser.add_argument("--decode-ms", type=float, default=12.0, help="ms por token gerado")
+    parser.add_argument("--output", help="Gravar resultados em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    method, count = token_counter()
+    print(f"🧮 Tokens por despesa na categorização em lote ({method})")
+
+    results = asyncio.run(measure(args.sizes, count, args.input_price, args.output_price,
+                                  args.prefill_ms, args.decode_ms))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"method": method, "results": results}, f, indent=2)
+        print(f"\n💾 Resultados gravados em {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark da listagem de despesas
+Gera despesas sintéticas e compara paginação por chave (cursor) com OFFSET
+
+Uso:
+    python -m benchmarks.expense_listing --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert, select
+
+from app.core.config import settings, BRAZILIAN_EXPENSE_CATEGORIES
+from app.models.expense import Expense
+from app.schemas.expense import ExpenseFilter
+from app.services.database import db_service
+from app.services.expenses import encode_cursor, expense_service
+
+USER_ID = "bench-user"
+PAYMENT_METHODS = ["pix", "credito", "debito", "dinheiro", "boleto"]
+MERCHANTS = ["Pão de Açúcar", "Uber", "iFood", "Posto Ipiranga", "Droga Raia", "Netflix"]
+
+async def seed(rows: int, chunk_size: int = 50_000):
+    """Inserir despesas sintéticas em lotes"""
+
+    categories = list(BRAZILIAN_EXPENSE_CATEGORIES)
+    start = date.today() - timedelta(days=3650)
+    rng = random.Random(42)
+
+    async with db_service.engine.begin() as conn:
+        for offset in range(0, rows, chunk_size):
+            chunk = []
+            for i in range(offset, min(offset + chunk_size, rows)):
+                category = rng.choice(categories)
+                chunk.append({
+                    "user_id": USER_ID,
+                    "date": start + timedelta(days=rng.randrange(3650)),
+                    "description": f"{rng.choice(MERCHANTS)} #{i}",
+                    "amount": Decimal(rng.randrange(100, 100_000)) / 100,
+                    "type": "expense",
+                    "category": category,
+                    "subcategory": BRAZILIAN_EXPENSE_CATEGORIES[category]["subcategories"][0],
+                    "payment_method": rng.choice(PAYMENT_METHODS),
+                    "tags": [],
+                })
+            await conn.execute(insert(Expense.__table__), chunk)
+
+async def timed(label: str, fn: Callable[[], Awaitable], repeat: int = 5):
+    """Medir mediana de execução"""
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    print(f"  {label:<45} {statistics.median(samples):>9.2f} ms")
+
+async def main(rows: int, per_page: int):
+    """Popular banco temporário e medir consultas"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASE_URL = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        await db_service.initialize()
+
+        print(f"🔧 Gerando {rows:,} despesas sintéticas...")
+        started = time.perf_counter()
+        await seed(rows)
+        print(f"✅ Dados gerados em {time.perf_counter() - started:.1f}s")
+
+        no_filter = ExpenseFilter()
+        by_category = ExpenseFilter(
+            category="alimentacao",
+            start_date=date.today() - timedelta(days=365),
+            end_date=date.today()
+        )
+        by_amount = ExpenseFilter(min_amount=Decimal("100"), max_amount=Decimal("200"))
+
+        deep_offset = rows // 2
+        order = (Expense.date.desc(), Expense.id.desc())
+
+        async with await db_service.get_session() as session:
+            anchor = (await session.execute(
+                select(Expense.date, Expense.id)
+                .where(Expense.user_id == USER_ID)
+                .order_by(*order)
+                .offset(deep_offset - 1)
+                .limit(1)
+            )).one()
+        deep_cursor = encode_cursor(anchor.date, anchor.id)
+
+        async def offset_page():
+            async with await db_service.get_session() as session:
+                await session.execute(
+                    select(Expense)
+                    .where(Expense.user_id == USER_ID)
+                    .order_by(*order)
+                    .offset(deep_offset)
+                    .limit(per_page)
+                )
+
+        print(f"\n📊 Página de {per_page} itens (mediana de 5 execuções)")
+        await timed("primeira página (sem filtro)",
+                    lambda: expense_service.list_expenses(USER_ID, no_filter, per_page=per_page))
+        await timed(f"página profunda via cursor (item {deep_offset:,})",
+                    lambda: expense_service.list_expenses(USER_ID, no_filter, cursor=deep_cursor, per_page=per_page))
+        await timed(f"página profunda via OFFSET {deep_offset:,}", offset_page)
+        await timed("categoria + último ano",
+                    lambda: expense_service.list_expenses(USER_ID, by_category, per_page=per_page))
+        await timed("faixa de valor R$ 100-200",
+                    lambda: expense_service.list_expenses(USER_ID, by_amount, per_page=per_page))
+
+        expense_service.count_cache.invalidate(USER_ID)
+        await timed("contagem sem cache (1ª chamada)",
+                    lambda: expense_service.list_expenses(USER_ID, no_filter, per_page=per_page),
+                    repeat=1)
+        await timed("contagem com cache",
+                    lambda: expense_service.list_expenses(USER_ID, no_filter, per_page=per_page))
+
+        await db_service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.per_page))
@@ -0,0 +1,130 @@
+"""
+Cliente OpenAI falso para benchmarks
+Responde chat.completions.create com conteúdo fixo no formato que cada
+agente espera (categorização, extração de documentos e insights), sem rede
+"""
+
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from app.agents.expense_categorizer import build_category_codes
+from app.core.config import BRAZILIAN_EXPENSE_CATEGORIES
+
+# Palavras-chave -> (categoria, subcategoria) para respostas plausíveis
+KEYWORD_CATEGORIES = {
+    "supermercado": ("alimentacao", "supermercado"),
+    "pão de açúcar": ("alimentacao", "supermercado"),
+    "ifood": ("alimentacao", "delivery"),
+    "restaurante": ("alimentacao", "restaurante"),
+    "uber": ("transporte", "uber"),
+    "posto": ("transporte", "combustivel"),
+    "farmácia": ("saude", "farmacia"),
+    "droga": ("saude", "farmacia"),
+    "netflix": ("lazer", "streaming"),
+    "cinema": ("lazer", "cinema"),
+    "aluguel": ("moradia", "aluguel"),
+}
+
+# Linhas "n|descrição|valor" do prompt de categorização
+CODED_ITEM = re.compile(r'^(?P<n>\d+)\|(?P<description>.*)\|[^|]*$', re.MULTILINE)
+CATEGORY_CODES = {pair: code for code, pair in build_category_codes(BRAZILIAN_EXPENSE_CATEGORIES).items()}
+
+def categorize(description: str) -> Dict[str, Any]:
+    """Categorização determinística por palavra-chave"""
+
+    lowered = description.lower()
+    category, subcategory = next(
+        (value for keyword, value in KEYWORD_CATEGORIES.items() if keyword in lowered),
+        ("outros", "diversos")
+    )
+    return {
+        "category": category,
+        "subcategory": subcategory,
+        "confidence": 0.9 if category != "outros" else 0.4,
+        "suggested_category": category,
+        "reasoning": "Resposta simulada"
+    }
+
+def canned_content(messages: List[Dict[str, str]], response_format: Optional[Dict[str, Any]] = None) -> str:
+    """Conteúdo da resposta conforme o prompt de cada agente"""
+
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+
+    if response_format and response_format.get("type") == "json_schema":
+        # Categorização: um item codificado por linha do prompt
+        items = []
+        for match in CODED_ITEM.finditer(user):
+            result = categorize(match.group("description"))
+            items.append({
+                "n": int(match.group("n")),
+                "c": CATEGORY_CODES[(result["category"], result["subcategory"])],
+                "p": result["confidence"]
+            })
+        return json.dumps({"items": items}, separators=(",", ":"))
+
+    if "extrair dados de documentos" in system:
+        # Sem true/false/null: o DocumentProcessorAgent lê a resposta com eval
+        return json.dumps({
+            "transactions": [
+                {"date": "2024-01-15", "description": "Supermercado Pão de Açúcar", "amount": 250.0,
+                 "type": "expense", "category": "alimentacao", "confidence": 0.9},
+                {"date": "2024-01-16", "description": "Posto Shell", "amount": 80.0,
+                 "type": "expense", "category": "transporte", "confidence": 0.9}
+            ],
+            "summary": "Extrato simulado",
+            "document_type": "extrato_bancario"
+        }, ensure_ascii=False)
+
+    if response_format and response_format.get("type") == "json_object":
+        return json.dumps({"insights": ["Resposta simulada"]}, ensure_ascii=False)
+
+    return "\n".join([
+        "1. Mantenha uma reserva de emergência em Tesouro Selic",
+        "2. Aumente a taxa de poupança revisando gastos recorrentes",
+        "3. Diversifique entre renda fixa e renda variável",
+        "4. Use IPCA+ para proteger o poder de compra",
+        "5. Revise o plano FIRE a cada seis meses",
+    ])
+
+def completion(content: str, model: str) -> SimpleNamespace:
+    """Objeto com os atributos usados pelos agentes (choices[0].message.content)"""
+
+    return SimpleNamespace(
+        id="chatcmpl-fake",
+        model=model,
+        created=int(time.time()),
+        choices=[SimpleNamespace(
+            index=0,
+            finish_reason="stop",
+            message=SimpleNamespace(role="assistant", content=content)
+        )],
+        usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+    )
+
+class _FakeCompletions:
+    def __init__(self, client: "FakeAsyncOpenAI"):
+        self._client = client
+
+    async def create(self, model: str = "fake", messages: Optional[List[Dict[str, str]]] = None,
+                     response_format: Optional[Dict[str, Any]] = None, **kwargs) -> SimpleNamespace:
+        self._client.calls += 1
+        content = canned_content(messages or [], response_format)
+        self._client.last_request = {"messages": messages or [], "response_format": response_format,
+                                     "content": content}
+        if self._client.latency:
+            await asyncio.sleep(self._client.latency)
+        return completion(content, model)
+
+class FakeAsyncOpenAI:
+    """Substituto de AsyncOpenAI: client.chat.completions.create(...)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.last_request: Optional[Dict[str, Any]] = None
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
@@ -0,0 +1,77 @@
+"""
+Perfil do cálculo FIRE
+Executa calculate_fire_projections sob cProfile (insights por regras, sem
+chamadas à OpenAI) e mostra as funções mais custosas
+
+Uso:
+    python -m benchmarks.fire_profile --requests 500 --top 15
+"""
+
+import argparse
+import asyncio
+import cProfile
+import os
+import pstats
+import random
+import time
+from decimal import Decimal
+from typing import List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.agents.fire_calculator import FireCalculatorAgent
+from app.schemas.fire import FireCalculationRequest, InvestmentProfile
+from app.utils.fire_math import projection_factors, rate_table
+
+def synthetic_requests(count: int) -> List[FireCalculationRequest]:
+    """Requisições variadas com os perfis padrão (taxas repetidas)"""
+
+    rng = random.Random(42)
+    requests = []
+    for _ in range(count):
+        income = rng.randrange(4_000, 40_000)
+        requests.append(FireCalculationRequest(
+            current_age=rng.randrange(20, 50),
+            current_savings=Decimal(rng.choice([0, rng.randrange(1_000, 1_000_000)])),
+            monthly_income=Decimal(income),
+            monthly_expenses=Decimal(rng.randrange(1_500, income - 500)),
+            investment_profile=rng.choice(list(InvestmentProfile)),
+            consider_tax=rng.random() < 0.5
+        ))
+    return requests
+
+async def run(agent: FireCalculatorAgent, requests: List[FireCalculationRequest]):
+    for request in requests:
+        await agent.calculate_fire_projections(request, "benchmark")
+
+def main(count: int, top: int):
+    agent = FireCalculatorAgent()
+
+    async def rule_based_insights(request, years_to_fire, monthly_savings, user_id):
+        return agent._generate_fallback_insights(request, years_to_fire, monthly_savings), True
+
+    agent._generate_insights = rule_based_insights
+    requests = synthetic_requests(count)
+
+    started = time.perf_counter()
+    asyncio.run(run(agent, requests))
+    elapsed = time.perf_counter() - started
+    print(f"📊 {count} cálculos: {elapsed * 1000 / count:.3f} ms por requisição")
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    asyncio.run(run(agent, requests))
+    profiler.disable()
+
+    stats = pstats.Stats(profiler).strip_dirs().sort_stats("cumulative")
+    stats.print_stats(r"fire_calculator|fire_math|money", top)
+    print(f"rate_table: {rate_table.cache_info()}")
+    print(f"projection_factors: {projection_factors.cache_info()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    main(args.requests, args.top)
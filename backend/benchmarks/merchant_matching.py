@@ -0,0 +1,184 @@
+"""
+Recall e latência da identificação de estabelecimentos
+Gera variações de extrato ("PAG*IFOOD 1234", "IFOOD *RESTAURANTE SP") dos
+estabelecimentos do catálogo e descrições desconhecidas, e compara o
+cache antigo (descrição exata + Jaccard) com o índice de estabelecimentos
+(chave canônica + vizinho aproximado por LSH). Mede acertos sem LLM, falsos
+positivos, latência por consulta e o recall do LSH contra a busca exaustiva
+em um índice grande.
+
+Uso:
+    python -m benchmarks.merchant_matching
+    python -m benchmarks.merchant_matching --variants 20 --index-size 50000
+"""
+
+import argparse
+import os
+import random
+import string
+import time
+import unicodedata
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.core.config import settings, BRAZILIAN_MERCHANTS
+
+# Nome como aparece para o usuário (o catálogo guarda a chave sem acentos)
+DISPLAY_NAMES = {
+    "pao de acucar": "Pão de Açúcar", "atacadao": "Atacadão", "comgas": "Comgás",
+    "drogaria sao paulo": "Drogaria São Paulo", "ze delivery": "Zé Delivery",
+    "o boticario": "O Boticário", "assai atacadista": "Assaí Atacadista",
+}
+
+PREFIXES = ["", "", "PAG*", "MP *", "PICPAY *", "PAGSEGURO ", "EC *"]
+SUFFIXES = ["", "", " SP", " RJ", " SAO PAULO", " 0423", " LTDA", " *COMPRA 12/03", " BR 116"]
+
+UNKNOWN = ["Aluguel apartamento", "Restaurante Fogo de Chão", "Condomínio Edifício Aurora",
+           "Escola Pequeno Príncipe", "Barbearia do Zé", "Feira livre", "Pet shop Amigo Fiel",
+           "Transferência João Silva", "Mecânica Dois Irmãos", "Papelaria Central",
+           "Pagamento fatura", "Dentista Dra. Ana", "Hotel Fazenda", "Sorveteria Gelato"]
+
+def strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+def typo(rng: random.Random, text: str) -> str:
+    """Um caractere trocado, duplicado ou removido (fora da primeira letra)"""
+
+    if len(text) < 5:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    kind = rng.choice(("swap", "double", "drop"))
+    if kind == "swap":
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if kind == "double":
+        return text[:i] + text[i] + text[i:]
+    return text[:i] + text[i + 1:]
+
+def variant(rng: random.Random, name: str) -> str:
+    """Descrição de extrato plausível para o estabelecimento"""
+
+    text = rng.choice((name, name.upper(), strip_accents(name).upper(), name.lower()))
+    if rng.random() < 0.2:
+        text = text.replace(" ", "")
+    if rng.random() < 0.2:
+        text = typo(rng, text)
+    return f"{rng.choice(PREFIXES)}{text}{rng.choice(SUFFIXES)}"
+
+def build_dataset(variants: int, seed: int) -> Tuple[List[Tuple[str, Optional[Tuple[str, str]]]], Dict[str, str]]:
+    """(descrição, (categoria, subcategoria) esperada ou None) e o nome exibido de cada estabelecimento"""
+
+    rng = random.Random(seed)
+    names = {key: DISPLAY_NAMES.get(key, key.title()) for key in BRAZILIAN_MERCHANTS}
+
+    dataset = [
+        (variant(rng, names[key]), expected)
+        for key, expected in BRAZILIAN_MERCHANTS.items()
+        for _ in range(variants)
+    ]
+    dataset += [(variant(rng, name), None) for name in UNKNOWN for _ in range(variants)]
+    rng.shuffle(dataset)
+    return dataset, names
+
+def evaluate(name: str, lookup: Callable[[str], Optional[Dict]], dataset) -> None:
+    from app.services.merchant_index import embed_merchant, normalize_merchant
+
+    # Cada método começa com os caches de chave e vetor frios
+    normalize_merchant.cache_clear()
+    embed_merchant.cache_clear()
+
+    hits = correct = false_positives = known = 0
+    started = time.perf_counter()
+    results = [lookup(description) for description, _ in dataset]
+    elapsed = time.perf_counter() - started
+
+    for (_, expected), result in zip(dataset, results):
+        if expected is None:
+            false_positives += result is not None
+            continue
+        known += 1
+        if result is not None:
+            hits += 1
+            correct += (result["category"], result["subcategory"]) == expected
+
+    unknown = len(dataset) - known
+    print(f"{name:<28} {hits / known:>8.1%} {correct / max(hits, 1):>9.1%} "
+          f"{false_positives / max(unknown, 1):>10.1%} {elapsed / len(dataset) * 1e6:>10.1f}")
+
+def lsh_recall(size: int, queries: int, seed: int) -> None:
+    """Recall do LSH contra a busca exaustiva em um índice com `size` nomes sintéticos"""
+
+    from app.services.merchant_index import MerchantIndex, embed_merchant, normalize_merchant
+
+    rng = random.Random(seed)
+    index = MerchantIndex(merchants={})._new_index()
+    keys = []
+    for _ in range(size):
+        key = normalize_merchant(" ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(rng.randint(1, 3))
+        ))
+        keys.append(key)
+        index.add(key, embed_merchant(key, index.dim), key)
+
+    probes = [typo(rng, rng.choice(keys)) for _ in range(queries)]
+    vectors = [embed_merchant(normalize_merchant(probe), index.dim) for probe in probes]
+    threshold = settings.MERCHANT_MATCH_THRESHOLD
+
+    started = time.perf_counter()
+    exact = [index.search_exact(vector, threshold) for vector in vectors]
+    exact_us = (time.perf_counter() - started) / queries * 1e6
+
+    started = time.perf_counter()
+    approximate = [index.search_lsh(vector, threshold) for vector in vectors]
+    approximate_us = (time.perf_counter() - started) / queries * 1e6
+
+    expected = [(e, a) for e, a in zip(exact, approximate) if e is not None]
+    recall = sum(a is not None and a[0] == e[0] for e, a in expected) / max(len(expected), 1)
+    print(f"{size:>10} {recall:>9.1%} {exact_us:>13.1f} {approximate_us:>10.1f} {exact_us / approximate_us:>8.1f}x")
+
+def main(variants: int, index_sizes: List[int], queries: int, seed: int):
+    from app.agents.expense_categorizer import ExpenseCategorizerAgent
+    from app.services.merchant_index import MerchantIndex
+
+    dataset, names = build_dataset(variants, seed)
+    print(f"🏪 {len(BRAZILIAN_MERCHANTS)} estabelecimentos × {variants} variações + "
+          f"{len(UNKNOWN)} desconhecidos × {variants} (limiar {settings.MERCHANT_MATCH_THRESHOLD})")
+
+    # Histórico: o usuário já categorizou cada estabelecimento uma vez
+    agent = ExpenseCategorizerAgent()
+    agent.merchant_index = MerchantIndex(merchants={})
+    for key, (category, subcategory) in BRAZILIAN_MERCHANTS.items():
+        agent._update_learning_cache("bench", names[key], agent._validate_ai_response({
+            "category": category, "subcategory": subcategory, "confidence": 0.9
+        }))
+    catalog = MerchantIndex()
+
+    def jaccard(description: str) -> Optional[Dict]:
+        settings.MERCHANT_INDEX_ENABLED = False
+        return agent._check_cache("bench", description)
+
+    def learned(description: str) -> Optional[Dict]:
+        settings.MERCHANT_INDEX_ENABLED = True
+        return agent._check_cache("bench", description)
+
+    print(f"\n{'método':<28} {'acertos':>8} {'corretos':>9} {'falsos pos.':>10} {'µs/consulta':>10}")
+    evaluate("jaccard (histórico)", jaccard, dataset)
+    evaluate("índice (histórico)", learned, dataset)
+    evaluate("índice (só catálogo)", lambda description: catalog.lookup("novo", description), dataset)
+    settings.MERCHANT_INDEX_ENABLED = True
+
+    print(f"\nLSH ({settings.MERCHANT_LSH_TABLES} tabelas × {settings.MERCHANT_LSH_BITS} bits) contra a busca exaustiva")
+    print(f"{'índice':>10} {'recall':>9} {'exaustiva µs':>13} {'LSH µs':>10} {'ganho':>9}")
+    for size in index_sizes:
+        lsh_recall(size, queries, seed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--variants", type=int, default=10, help="Variações por estabelecimento")
+    parser.add_argument("--index-size", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Nomes sintéticos no teste de recall do LSH")
+    parser.add_argument("--queries", type=int, default=500, help="Consultas no teste de recall")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    main(args.variants, args.index_size, args.queries, args.seed)
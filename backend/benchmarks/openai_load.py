@@ -0,0 +1,98 @@
+"""
+Teste de carga dos agentes contra o servidor OpenAI simulado
+Dispara categorizações (categorize_single) e cálculos FIRE completos
+(calculate_fire_projections, com insights da IA) em vários níveis de
+concorrência e mede vazão, latência (p50/p95) e erros, usando o cliente
+AsyncOpenAI real
+
+Uso:
+    python -m benchmarks.openai_stub --latency-ms 800 --latency-dist lognormal &
+    python -m benchmarks.openai_load --base-url http://127.0.0.1:8089/v1 --requests 200 --concurrency 1 10 50
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.core.config import settings
+
+async def run_level(call: Callable[[int], Awaitable[None]], requests: int, concurrency: int) -> Dict[str, float]:
+    """`requests` chamadas com no máximo `concurrency` simultâneas"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "errors": errors,
+    }
+
+async def main(requests: int, levels: List[int]):
+    from app.agents.expense_categorizer import ExpenseCategorizerAgent
+    from app.agents.fire_calculator import FireCalculatorAgent
+    from app.schemas.expense import ExpenseCreate
+    from benchmarks.fire_profile import synthetic_requests
+
+    categorizer = ExpenseCategorizerAgent()
+    fire = FireCalculatorAgent()
+
+    # Entradas novas a cada chamada, em todos os níveis: nem o cache de
+    # aprendizado nem o de insights evitam a chamada à OpenAI
+    fire_requests = iter(synthetic_requests(requests * len(levels)))
+    sequence = itertools.count()
+
+    async def categorize(index: int):
+        call = next(sequence)
+        expense = ExpenseCreate(date=date.today(), description=f"Compra teste {call}", amount=Decimal("10"))
+        await categorizer.categorize_single(expense, f"load-{call}")
+
+    async def fire_insights(index: int):
+        await fire.calculate_fire_projections(next(fire_requests), f"load-{next(sequence)}")
+
+    print(f"🔥 OpenAI em {settings.OPENAI_BASE_URL or 'api.openai.com'} — {requests} chamadas por nível")
+    for label, call in (("categorização", categorize), ("cálculo FIRE com insights", fire_insights)):
+        print(f"\n{label}")
+        for concurrency in levels:
+            result = await run_level(call, requests, concurrency)
+            print(f"  concorrência {concurrency:>4}: {result['throughput']:8.1f} req/s  "
+                  f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  erros {result['errors']}")
+
+    await categorizer.batcher.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="Sobrescreve OPENAI_BASE_URL")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    if args.base_url:
+        settings.OPENAI_BASE_URL = args.base_url
+
+    asyncio.run(main(args.requests, args.concurrency))
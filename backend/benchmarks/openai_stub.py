@@ -0,0 +1,139 @@
+"""
+Servidor OpenAI simulado para testes de carga
+Implementa POST /v1/chat/completions com as respostas fixas de
+benchmarks.fake_openai, latência e taxa de erro configuráveis e sementes
+determinísticas. Aponte o backend para ele com OPENAI_BASE_URL.
+
+Uso:
+    python -m benchmarks.openai_stub --port 8089 --latency-ms 800 --latency-dist lognormal --error-rate 0.02
+    OPENAI_BASE_URL=http://localhost:8089/v1 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.fake_openai import canned_content
+
+# Erros no formato da API: (status, tipo, mensagem)
+ERRORS = [
+    (429, "rate_limit_exceeded", "Rate limit reached (simulado)"),
+    (500, "server_error", "The server had an error while processing your request (simulado)"),
+    (503, "service_unavailable", "The engine is currently overloaded (simulado)"),
+]
+
+class StubConfig:
+    """Distribuições de latência e erro (segundos e frações)"""
+
+    def __init__(self, latency_ms: float = 0.0, latency_dist: str = "fixed",
+                 jitter: float = 0.5, error_rate: float = 0.0, seed: int = 42):
+        self.latency = latency_ms / 1000
+        self.latency_dist = latency_dist
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.latency_dist == "uniform":
+            return self.rng.uniform(self.latency * (1 - self.jitter), self.latency * (1 + self.jitter))
+        if self.latency_dist == "lognormal":
+            # Mediana = latência configurada; jitter = desvio do log (cauda longa)
+            return self.latency * math.exp(self.rng.gauss(0, self.jitter))
+        return self.latency
+
+    def sample_error(self):
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            return self.rng.choice(ERRORS)
+        return None
+
+def approximate_tokens(text: str) -> int:
+    """~4 caracteres por token (apenas para preencher usage)"""
+    return max(1, len(text) // 4)
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="OpenAI simulado")
+    stats: Counter = Counter()
+    in_flight = {"current": 0, "peak": 0}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body: Dict[str, Any] = await request.json()
+        messages = body.get("messages", [])
+
+        stats["requests"] += 1
+        in_flight["current"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        try:
+            await asyncio.sleep(config.sample_latency())
+
+            error = config.sample_error()
+            if error is not None:
+                status, code, message = error
+                stats[f"error_{status}"] += 1
+                return JSONResponse(
+                    status_code=status,
+                    content={"error": {"message": message, "type": code, "param": None, "code": code}}
+                )
+
+            content = canned_content(messages, body.get("response_format"))
+            prompt_tokens = sum(approximate_tokens(str(m.get("content", ""))) for m in messages)
+            completion_tokens = approximate_tokens(content)
+            stats["completions"] += 1
+
+            return {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-4o"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "logprobs": None,
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            }
+        finally:
+            in_flight["current"] -= 1
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "in_flight": in_flight["current"], "peak_in_flight": in_flight["peak"]}
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência (mediana para lognormal)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Amplitude relativa (uniform) ou sigma (lognormal)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 429/500/503")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.latency_dist, args.jitter, args.error_rate, args.seed)
+    print(f"🤖 OpenAI simulado em http://{args.host}:{args.port}/v1 "
+          f"(latência {args.latency_ms:.0f} ms {args.latency_dist}, erros {args.error_rate:.0%})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,53 @@
+"""
+Benchmark dos formatos de resposta das projeções
+Compara tamanho e tempo de serialização do JSON padrão (um FireProjection
+por ano) com o formato compacto em colunas e MessagePack
+
+Uso:
+    python -m benchmarks.projection_format --years 50 --iterations 2000
+"""
+
+import argparse
+import os
+import time
+from decimal import Decimal
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.agents.fire_calculator import FireCalculatorAgent
+from app.schemas.fire import FireProjectionRequest, InvestmentProfile
+from app.utils import response_format
+
+def main(years: int, iterations: int):
+    agent = FireCalculatorAgent()
+    request = FireProjectionRequest(
+        current_age=25,
+        current_savings=Decimal("50000"),
+        monthly_income=Decimal("12000"),
+        monthly_expenses=Decimal("7000"),
+        investment_profile=InvestmentProfile.MODERADO,
+        monthly_contribution=Decimal("3000"),
+        years=years
+    )
+    response = agent.project(request)
+
+    encoder = "orjson" if response_format.orjson is not None else "json"
+    print(f"📊 {years} anos de projeção, {iterations} serializações (compacto via {encoder})")
+
+    for media_type in response_format.available_formats():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            body = response_format.encode(response, media_type)
+        elapsed = time.perf_counter() - started
+        print(f"  {media_type:<36} {len(body):>7} bytes  {elapsed * 1e6 / iterations:8.1f} µs")
+
+    if response_format.msgpack is None:
+        print("  (msgpack não instalado: application/msgpack indisponível)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    main(args.years, args.iterations)
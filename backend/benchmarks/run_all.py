@@ -0,0 +1,434 @@
+"""
+Suíte de benchmarks dos caminhos críticos dos agentes
+Executa cada caso com um cliente OpenAI falso (sem rede), grava os tempos
+em JSON e compara com uma execução anterior, falhando quando algum caso
+fica mais lento que o limite
+
+Uso:
+    python -m benchmarks.run_all --output bench_base.json
+    python -m benchmarks.run_all --compare bench_base.json --threshold 0.2
+    python -m benchmarks.run_all --only fire categorizer
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from sqlalchemy import insert, text
+
+from app.core.config import settings, BRAZILIAN_EXPENSE_CATEGORIES
+from benchmarks.fake_openai import FakeAsyncOpenAI
+
+MERCHANTS = ["Supermercado Pão de Açúcar", "Uber", "iFood", "Posto Ipiranga", "Droga Raia",
+             "Netflix", "Restaurante Outback", "Aluguel", "Cinema Cinemark", "Loja Renner"]
+
+class Skip(Exception):
+    """Caso indisponível neste ambiente (dependência ausente)"""
+
+@dataclass
+class Case:
+    """Caso de benchmark: `run` é medido `rounds` vezes após um aquecimento"""
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    rounds: int = 20
+    before_round: Optional[Callable[[], Awaitable[None]]] = None
+
+@dataclass
+class Group:
+    """Casos que compartilham preparação (banco, arquivos, agentes)
+
+    `skipped` lista casos do grupo indisponíveis neste ambiente (nome -> motivo).
+    """
+
+    name: str
+    cases: List[Case]
+    teardown: Optional[Callable[[], Awaitable[None]]] = None
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+# Grupos
+
+async def fire_group(tmp: str) -> Group:
+    from app.agents.fire_calculator import FireCalculatorAgent
+    from app.services.cache import fire_insights_cache
+    from benchmarks.fire_profile import synthetic_requests
+
+    agent = FireCalculatorAgent()
+    agent.openai_client = FakeAsyncOpenAI()
+    requests = synthetic_requests(50)
+
+    async def calculate():
+        for request in requests:
+            await agent.calculate_fire_projections(request, "benchmark")
+
+    async def scenarios():
+        for request in requests:
+            await agent._calculate_scenarios(request, "benchmark", agent._calculate_assumptions(request))
+
+    return Group("fire", [
+        # Cache de insights limpo a cada rodada: mede também o caminho da IA
+        Case("fire.calculate_fire_projections[50 requisições]", calculate, before_round=fire_insights_cache.clear),
+        Case("fire._calculate_scenarios[50 requisições]", scenarios),
+    ])
+
+async def categorizer_group(tmp: str) -> Group:
+    from app.agents import expense_categorizer
+    from app.schemas.expense import ExpenseCreate
+
+    rng = random.Random(42)
+    agent = expense_categorizer.ExpenseCategorizerAgent()
+    agent.openai_client = FakeAsyncOpenAI()
+
+    cached = {
+        f"{rng.choice(MERCHANTS)} loja {i} compra {rng.randrange(10_000)}": agent._validate_ai_response(
+            {"category": "outros", "confidence": 0.9}
+        )
+        for i in range(1000)
+    }
+    agent.merchant_index.rebuild("benchmark", cached.items())
+    lookups = [f"Estabelecimento desconhecido {i}" for i in range(100)]
+
+    async def check_cache():
+        agent.learning_cache["benchmark"] = cached
+        for description in lookups:
+            agent._check_cache("benchmark", description)
+
+    expenses = [
+        ExpenseCreate(
+            date=date.today() - timedelta(days=rng.randrange(365)),
+            description=f"{rng.choice(MERCHANTS)} #{i}",
+            amount=Decimal(rng.randrange(100, 50_000)) / 100,
+        )
+        for i in range(1000)
+    ]
+
+    async def no_sleep(seconds: float):
+        return None
+
+    async def categorize_batch():
+        agent.learning_cache.clear()
+        agent.merchant_index.users.clear()
+        # Sem a pausa fixa entre lotes: mede o processamento, não o sleep
+        with mock.patch("asyncio.sleep", no_sleep):
+            await agent.categorize_batch(expenses, "benchmark")
+
+    return Group("categorizer", [
+        Case("categorizer._check_cache[1000 entradas, 100 consultas]", check_cache),
+        Case("categorizer.categorize_batch[1000 linhas]", categorize_batch, rounds=5),
+    ])
+
+async def documents_group(tmp: str) -> Group:
+    from app.agents.document_processor import DocumentProcessorAgent
+    from app.utils.lazy_import import is_available
+
+    # As bibliotecas de parse são importadas sob demanda: verificar antes
+    missing = [name for name in ("pandas", "pdfplumber") if not is_available(name)]
+    if missing:
+        raise Skip(f"dependência ausente: {', '.join(missing)}")
+
+    agent = DocumentProcessorAgent()
+    agent.openai_client = FakeAsyncOpenAI()
+    rows = synthetic_statement(1000)
+    cases = []
+    skipped = {}
+
+    csv_path = os.path.join(tmp, "extrato.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["data", "descricao", "valor"])
+        writer.writerows(rows)
+    cases.append(Case("documents._process_csv[1000 linhas]", lambda: agent._process_csv(csv_path)))
+
+    pdf_path = os.path.join(tmp, "extrato.pdf")
+    with open(pdf_path, "wb") as file:
+        file.write(minimal_pdf([f"{d}  {desc}  R$ {value}" for d, desc, value in rows[:300]]))
+    cases.append(Case("documents._process_pdf[300 linhas]", lambda: agent._process_pdf(pdf_path), rounds=5))
+
+    excel_case = "documents._process_excel[1000 linhas]"
+    try:
+        import openpyxl
+    except ImportError:
+        skipped[excel_case] = "dependência ausente: openpyxl"
+    else:
+        xlsx_path = os.path.join(tmp, "extrato.xlsx")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["data", "descricao", "valor"])
+        for row in rows:
+            sheet.append(list(row))
+        workbook.save(xlsx_path)
+        cases.append(Case(excel_case, lambda: agent._process_excel(xlsx_path), rounds=5))
+
+    image_case = "documents._process_image[recibo 800x600]"
+    missing = [name for name in ("PIL", "cv2", "pytesseract") if not is_available(name)]
+    if missing:
+        skipped[image_case] = f"dependência ausente: {', '.join(missing)}"
+    else:
+        from PIL import Image, ImageDraw
+
+        png_path = os.path.join(tmp, "recibo.png")
+        image = Image.new("RGB", (800, 600), "white")
+        draw = ImageDraw.Draw(image)
+        for index, (d, desc, value) in enumerate(rows[:25]):
+            draw.text((20, 20 + index * 22), f"{d} {desc} R$ {value}", fill="black")
+        image.save(png_path)
+        cases.append(Case(image_case, lambda: agent._process_image(png_path), rounds=3))
+
+    return Group("documents", cases, skipped=skipped)
+
+async def advisor_group(tmp: str) -> Group:
+    from app.agents.financial_advisor import FinancialAdvisorAgent
+    from app.models.expense import Expense
+    from app.services.database import db_service
+
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    await db_service.initialize()
+    await seed_expenses(db_service, Expense, 100_000)
+
+    agent = FinancialAdvisorAgent()
+    agent.openai_client = FakeAsyncOpenAI()
+
+    return Group("advisor", [
+        Case("advisor.generate_dashboard[100k despesas]", lambda: agent.generate_dashboard("benchmark")),
+    ], teardown=db_service.close)
+
+GROUPS: Dict[str, Callable[[str], Awaitable[Group]]] = {
+    "fire": fire_group,
+    "categorizer": categorizer_group,
+    "documents": documents_group,
+    "advisor": advisor_group,
+}
+
+# Dados sintéticos
+
+def synthetic_statement(rows: int) -> List[tuple]:
+    """Linhas (data, descrição, valor) de um extrato"""
+
+    rng = random.Random(7)
+    start = date.today() - timedelta(days=365)
+    return [
+        ((start + timedelta(days=rng.randrange(365))).strftime("%d/%m/%Y"),
+         f"{rng.choice(MERCHANTS)} #{i}",
+         f"{rng.randrange(100, 50_000) / 100:.2f}")
+        for i in range(rows)
+    ]
+
+def minimal_pdf(lines: List[str], lines_per_page: int = 50) -> bytes:
+    """PDF de texto simples (Helvetica), sem dependências externas"""
+
+    def escape(value: str) -> str:
+        value = value.encode("latin-1", "replace").decode("latin-1")
+        return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+    ]
+    for index, page_lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 40 800 Td 14 TL " + " ".join(f"({escape(line)}) '" for line in page_lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * index} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(output)
+
+async def seed_expenses(db_service, expense_model, rows: int, chunk_size: int = 50_000):
+    """Despesas sintéticas dos últimos 3 anos e o rollup mensal correspondente"""
+
+    rng = random.Random(42)
+    categories = list(BRAZILIAN_EXPENSE_CATEGORIES)
+    start = date.today() - timedelta(days=3 * 365)
+
+    async with db_service.engine.begin() as conn:
+        for offset in range(0, rows, chunk_size):
+            chunk = []
+            for i in range(offset, min(offset + chunk_size, rows)):
+                category = rng.choice(categories)
+                chunk.append({
+                    "user_id": "benchmark",
+                    "date": start + timedelta(days=rng.randrange(3 * 365 + 1)),
+                    "description": f"{rng.choice(MERCHANTS)} #{i}",
+                    "amount": Decimal(rng.randrange(100, 100_000)) / 100,
+                    "type": "expense",
+                    "category": category,
+                    "subcategory": BRAZILIAN_EXPENSE_CATEGORIES[category]["subcategories"][0],
+                    "payment_method": rng.choice(["pix", "credito", "debito"]),
+                    "tags": [],
+                })
+            await conn.execute(insert(expense_model.__table__), chunk)
+
+        # Inserção em massa não passa pelo serviço: montar o rollup de uma vez
+        await conn.execute(text("""
+            INSERT INTO expense_monthly_rollups
+                (user_id, month, type, category, payment_method, total_cents, count, min_cents, max_cents)
+            SELECT user_id, strftime('%Y-%m', date), type, COALESCE(category, ''), COALESCE(payment_method, ''),
+                   SUM(CAST(ROUND(amount * 100) AS INTEGER)), COUNT(*),
+                   MIN(CAST(ROUND(amount * 100) AS INTEGER)), MAX(CAST(ROUND(amount * 100) AS INTEGER))
+            FROM expenses
+            GROUP BY 1, 2, 3, 4, 5
+        """))
+
+# Execução e comparação
+
+async def measure(case: Case) -> Dict[str, Any]:
+    """Aquecimento + `rounds` medições (ms)"""
+
+    if case.before_round:
+        await case.before_round()
+    await case.run()
+
+    samples = []
+    for _ in range(case.rounds):
+        if case.before_round:
+            await case.before_round()
+        started = time.perf_counter()
+        await case.run()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "mean_ms": round(statistics.mean(samples), 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "rounds": case.rounds,
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(groups: List[str]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    skipped: Dict[str, str] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in groups:
+            try:
+                group = await GROUPS[name](tmp)
+            except Skip as e:
+                skipped[name] = str(e)
+                print(f"⏭️  {name}: {e}")
+                continue
+
+            for case_name, reason in group.skipped.items():
+                skipped[case_name] = reason
+                print(f"⏭️  {case_name}: {reason}")
+
+            try:
+                for case in group.cases:
+                    results[case.name] = await measure(case)
+                    print(f"  {case.name:<58} {results[case.name]['median_ms']:>10.3f} ms")
+            finally:
+                if group.teardown:
+                    await group.teardown()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            metric: str = "min_ms") -> List[str]:
+    """Casos que pioraram mais que `threshold` (fração) em relação à base
+
+    O padrão compara o menor tempo de cada caso, menos sensível a ruído da
+    máquina que a mediana.
+    """
+
+    regressions = []
+    print(f"\n📈 Comparação com {baseline['meta'].get('git') or baseline['meta']['timestamp']} "
+          f"({metric}, limite +{threshold:.0%})")
+
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"  {name:<58} {'novo':>10}")
+            continue
+
+        ratio = result[metric] / reference[metric] if reference[metric] else 1.0
+        regressed = ratio > 1 + threshold
+        marker = "❌" if regressed else "✅"
+        print(f"  {name:<58} {ratio:>9.2f}x {marker}")
+        if regressed:
+            regressions.append(name)
+
+    # Casos da base sem medição agora (dependência ausente neste ambiente)
+    for name in baseline["results"].keys() - current["results"].keys():
+        print(f"  {name:<58} {'ignorado':>10} ⏭️")
+
+    return regressions
+
+def main(groups: List[str], output: Optional[str], baseline_path: Optional[str],
+         threshold: float, metric: str) -> int:
+    print(f"📊 Benchmarks: {', '.join(groups)}")
+    current = asyncio.run(run(groups))
+
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(current, file, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados gravados em {output}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, threshold, metric)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressão(ões) acima de {threshold:.0%}")
+            return 1
+        print("\n✅ Sem regressões")
+
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS), default=list(GROUPS))
+    parser.add_argument("--output", help="Gravar resultados em JSON")
+    parser.add_argument("--compare", dest="baseline", help="JSON de uma execução anterior")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Piora tolerada (fração)")
+    parser.add_argument("--metric", choices=["min_ms", "median_ms", "mean_ms"], default="min_ms")
+    args = parser.parse_args()
+
+    sys.exit(main(args.only, args.output, args.baseline, args.threshold, args.metric))
@@ -0,0 +1,136 @@
+"""
+Benchmark de concorrência do SQLite
+Compara o perfil padrão (rollback journal, commit por escrita) com o perfil
+WAL + PRAGMAs + escritor dedicado com commits em lote
+
+Uso:
+    python -m benchmarks.sqlite_concurrency --writers 20 --readers 20 --seconds 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict
+
+from sqlalchemy import Column, Integer, MetaData, Numeric, String, Table, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.services.database import configure_sqlite_engine, sqlite_pragmas
+from app.services.db_writer import BatchedWriter
+
+metadata = MetaData()
+
+bench_expenses = Table(
+    "bench_expenses", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", String(64), index=True),
+    Column("description", String(255)),
+    Column("amount", Numeric(12, 2)),
+)
+
+async def run_profile(path: str, tuned: bool, writers: int, readers: int, seconds: float,
+                      batch_size: int = settings.SQLITE_WRITE_BATCH_SIZE,
+                      batch_window_ms: float = settings.SQLITE_WRITE_BATCH_WINDOW_MS) -> Dict[str, Any]:
+    """Executar carga mista de leitura e escrita em um perfil"""
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    if tuned:
+        configure_sqlite_engine(engine, sqlite_pragmas())
+
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    writer = BatchedWriter(session_factory, batch_size, batch_window_ms) if tuned else None
+    if writer:
+        await writer.start()
+
+    counters = {"writes": 0, "reads": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    def make_insert(user_id: str):
+        async def operation(session):
+            await session.execute(insert(bench_expenses).values(
+                user_id=user_id,
+                description="Supermercado Pão de Açúcar",
+                amount=random.uniform(1, 500)
+            ))
+        return operation
+
+    async def write_loop(worker: int):
+        while time.perf_counter() < deadline:
+            operation = make_insert(f"user-{worker % 10}")
+            try:
+                if writer:
+                    await writer.submit(operation)
+                else:
+                    async with session_factory() as session:
+                        await operation(session)
+                        await session.commit()
+                counters["writes"] += 1
+            except Exception:
+                counters["errors"] += 1
+
+    async def read_loop(worker: int):
+        query = (
+            select(func.count(), func.sum(bench_expenses.c.amount))
+            .where(bench_expenses.c.user_id == f"user-{worker % 10}")
+        )
+        while time.perf_counter() < deadline:
+            try:
+                async with session_factory() as session:
+                    await session.execute(query)
+                counters["reads"] += 1
+            except Exception:
+                counters["errors"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(write_loop(i) for i in range(writers)),
+        *(read_loop(i) for i in range(readers)),
+    )
+    elapsed = time.perf_counter() - started
+
+    if writer:
+        await writer.stop()
+    await engine.dispose()
+
+    return {
+        "profile": "wal+writer" if tuned else "default",
+        "writes_per_sec": counters["writes"] / elapsed,
+        "reads_per_sec": counters["reads"] / elapsed,
+        "errors": counters["errors"],
+    }
+
+async def main(writers: int, readers: int, seconds: float, batch_size: int, batch_window_ms: float):
+    """Rodar os dois perfis em arquivos temporários"""
+
+    print(f"🔧 SQLite: {writers} escritores, {readers} leitores, {seconds}s por perfil "
+          f"(lote {batch_size}, janela {batch_window_ms}ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for tuned in (False, True):
+            path = os.path.join(tmp, f"bench_{'tuned' if tuned else 'default'}.db")
+            result = await run_profile(path, tuned, writers, readers, seconds, batch_size, batch_window_ms)
+            print(
+                f"  {result['profile']:<12} "
+                f"escritas/s={result['writes_per_sec']:>9.1f}  "
+                f"leituras/s={result['reads_per_sec']:>9.1f}  "
+                f"erros={result['errors']}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=settings.SQLITE_WRITE_BATCH_SIZE)
+    parser.add_argument("--batch-window-ms", type=float, default=settings.SQLITE_WRITE_BATCH_WINDOW_MS)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.writers, args.readers, args.seconds, args.batch_size, args.batch_window_ms))
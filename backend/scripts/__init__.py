@@ -0,0 +1,3 @@
+"""
+Scripts de manutenção do backend FIRE Brasil
+"""
@@ -0,0 +1,93 @@
+"""
+Orçamento de tempo de importação da aplicação
+Roda `python -X importtime -c "import <módulo>"` em um processo limpo,
+mostra os pacotes mais caros e falha (código 1) se o tempo total passar
+do orçamento ou se alguma biblioteca pesada for importada na inicialização.
+O mesmo orçamento é verificado pela suíte em tests/test_import_time.py.
+
+Uso:
+    python -m scripts.check_import_time
+    python -m scripts.check_import_time --module app.agents.document_processor --budget-ms 800
+    python -m scripts.check_import_time --runs 5 --top 20
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Devem ser importadas sob demanda (app.utils.lazy_import)
+FORBIDDEN = ["cv2", "PIL", "pytesseract", "pdfplumber", "pandas", "magic", "openai"]
+
+# Orçamento de `import app.main` (com o custo extra do -X importtime)
+DEFAULT_BUDGET_MS = 2000.0
+
+LINE = re.compile(r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<name>\S+)")
+
+def measure(module: str) -> Tuple[int, Dict[str, int], Dict[str, int]]:
+    """(total µs do módulo, cumulativo por pacote raiz, self por módulo) de uma execução"""
+
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "importtime")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"❌ Falha ao importar {module}:\n{result.stderr[-2000:]}")
+
+    total = 0
+    packages: Dict[str, int] = {}
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        name = match.group("name")
+        modules[name] = int(match.group("self"))
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + int(match.group("self"))
+        if name == module:
+            total = int(match.group("cumulative"))
+    return total, packages, modules
+
+def main(module: str, budget_ms: float, runs: int, top: int) -> int:
+    totals: List[int] = []
+    packages: Dict[str, int] = {}
+    modules: Dict[str, int] = {}
+    for _ in range(runs):
+        total, packages, modules = measure(module)
+        totals.append(total)
+
+    # Mediana entre execuções: a primeira costuma pagar o cache de bytecode
+    total_ms = statistics.median(totals) / 1000
+    print(f"⏱️  import {module}: {total_ms:.0f}ms (mediana de {runs}, orçamento {budget_ms:.0f}ms)")
+
+    print(f"\nPacotes mais caros (tempo próprio, última execução):")
+    for name, micros in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {name:<30} {micros / 1000:8.1f}ms")
+
+    failed = False
+    heavy = [name for name in FORBIDDEN if name in modules]
+    if heavy:
+        failed = True
+        print(f"\n❌ Bibliotecas pesadas importadas na inicialização: {', '.join(heavy)}")
+    if total_ms > budget_ms:
+        failed = True
+        print(f"\n❌ Orçamento excedido em {total_ms - budget_ms:.0f}ms")
+    if not failed:
+        print("\n✅ Dentro do orçamento")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    sys.exit(main(args.module, args.budget_ms, args.runs, args.top))
@@ -0,0 +1,128 @@
+"""
+Coleta das séries históricas do backtest FIRE
+Baixa CDI (SGS 4391, % a.m.) e IPCA (SGS 433, % a.m.) da API do Banco
+Central e combina com fechamentos mensais do Ibovespa informados em CSV
+(o SGS não publica o índice mensal), gravando app/data/market_monthly.csv.gz
+
+Com --sample, gera a série sintética versionada em
+app/data/market_monthly_sample.csv.gz (sem rede; não são dados históricos).
+
+Uso:
+    python -m scripts.fetch_market_history --ibov-csv ibov_mensal.csv
+    python -m scripts.fetch_market_history --ibov-csv ibov.csv --start 1994-07 --output /tmp/market.csv.gz
+    python -m scripts.fetch_market_history --sample
+
+O CSV do Ibovespa deve ter as colunas `date` (AAAA-MM-DD ou AAAA-MM) e
+`close`; o último fechamento de cada mês é usado.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import os
+from datetime import date
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from app.utils.backtest import COLUMNS, DEFAULT_DATA_PATH, PLANO_REAL, SAMPLE_DATA_PATH
+
+SGS_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{code}/dados"
+SGS_CDI = 4391
+SGS_IPCA = 433
+
+def fetch_sgs(code: int, start: str) -> Dict[str, float]:
+    """Série mensal do SGS como {AAAA-MM: valor em %}"""
+
+    year, month = start.split("-")
+    params = {
+        "formato": "json",
+        "dataInicial": f"01/{month}/{year}",
+        "dataFinal": date.today().strftime("%d/%m/%Y")
+    }
+    response = httpx.get(SGS_URL.format(code=code), params=params, timeout=60)
+    response.raise_for_status()
+
+    series = {}
+    for item in response.json():
+        day, month, year = item["data"].split("/")
+        series[f"{year}-{month}"] = float(item["valor"])
+    return series
+
+def read_ibov(path: str) -> Dict[str, float]:
+    """Variação mensal (%) a partir dos fechamentos do CSV"""
+
+    closes = {}
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in sorted(csv.DictReader(file), key=lambda row: row["date"]):
+            closes[row["date"][:7]] = float(row["close"])
+
+    months = sorted(closes)
+    return {
+        month: (closes[month] / closes[previous] - 1) * 100
+        for previous, month in zip(months, months[1:])
+    }
+
+def write_series(output: str, months: List[str], cdi: Dict[str, float], ipca: Dict[str, float],
+                 ibov: Dict[str, float]):
+    """CSV compactado; mtime zerado para o arquivo ser reprodutível"""
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(output, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as compressed:
+        with io.TextIOWrapper(compressed, encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            for month in months:
+                writer.writerow([month, f"{cdi[month]:.6f}", f"{ipca[month]:.6f}", f"{ibov[month]:.6f}"])
+
+    print(f"✅ {len(months)} meses ({months[0]} a {months[-1]}) gravados em {output}")
+
+def write_sample(start: str, end: str, output: str, seed: int = 1994):
+    """Série sintética com ordens de grandeza plausíveis (% a.m.), para a API funcionar sem os dados reais"""
+
+    rng = np.random.default_rng(seed)
+    first_year, first_month = map(int, start.split("-"))
+    last_year, last_month = map(int, end.split("-"))
+    count = (last_year - first_year) * 12 + last_month - first_month + 1
+    months = [f"{first_year + (first_month - 1 + i) // 12}-{(first_month - 1 + i) % 12 + 1:02d}" for i in range(count)]
+
+    cdi = np.clip(rng.normal(0.9, 0.15, count), 0.1, None)
+    ipca = rng.normal(0.5, 0.35, count)
+    ibov = rng.normal(1.0, 7.0, count)
+
+    write_series(output, months, dict(zip(months, cdi)), dict(zip(months, ipca)), dict(zip(months, ibov)))
+
+def main(ibov_csv: str, start: str, output: str):
+    print(f"📥 Baixando CDI (SGS {SGS_CDI}) e IPCA (SGS {SGS_IPCA}) desde {start}...")
+    cdi = fetch_sgs(SGS_CDI, start)
+    ipca = fetch_sgs(SGS_IPCA, start)
+    ibov = read_ibov(ibov_csv)
+
+    # Apenas meses presentes nas três séries
+    months = sorted(set(cdi) & set(ipca) & set(ibov))
+    months = [month for month in months if month >= start]
+    if not months:
+        raise SystemExit("❌ Nenhum mês em comum entre CDI, IPCA e Ibovespa")
+
+    write_series(output, months, cdi, ipca, ibov)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ibov-csv", help="Fechamentos do Ibovespa (colunas date, close)")
+    parser.add_argument("--start", default=PLANO_REAL, help="Primeiro mês (AAAA-MM)")
+    parser.add_argument("--output", help=f"Padrão: {DEFAULT_DATA_PATH} (ou {SAMPLE_DATA_PATH} com --sample)")
+    parser.add_argument("--sample", action="store_true", help="Gerar a série sintética de exemplo")
+    parser.add_argument("--sample-end", default="2024-12", help="Último mês da série sintética (AAAA-MM)")
+    args = parser.parse_args()
+
+    if args.sample:
+        write_sample(args.start, args.sample_end, args.output or SAMPLE_DATA_PATH)
+    elif not args.ibov_csv:
+        parser.error("--ibov-csv é obrigatório (ou use --sample)")
+    else:
+        main(args.ibov_csv, args.start, args.output or DEFAULT_DATA_PATH)
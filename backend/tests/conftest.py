@@ -0,0 +1,38 @@
+"""
+Fixtures compartilhadas dos testes
+Cada teste que usa o banco recebe um SQLite próprio em diretório temporário
+(o stand-in local do PostgreSQL de produção)
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("TESTING", "true")
+
+import pytest
+
+from app.core.config import settings
+
+@pytest.fixture
+def sqlite_url(tmp_path, monkeypatch) -> str:
+    """DATABASE_URL apontando para um arquivo SQLite temporário"""
+
+    url = f"sqlite:///{tmp_path / 'fire_brasil_test.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    return url
+
+@pytest.fixture
+async def database(sqlite_url):
+    """Instância global do banco inicializada no SQLite temporário"""
+
+    from app.services.database import db_service
+    from app.services.expenses import CountCache, expense_service
+
+    # Totais em cache de um teste anterior não valem para o banco novo
+    expense_service.count_cache = CountCache(ttl=settings.EXPENSE_COUNT_CACHE_TTL)
+
+    await db_service.initialize()
+    try:
+        yield db_service
+    finally:
+        await db_service.close()
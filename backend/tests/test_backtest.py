@@ -0,0 +1,98 @@
+"""
+Testes do backtest histórico em janelas móveis
+"""
+
+import httpx
+import numpy as np
+import pytest
+
+from app.api import fire
+from app.utils import backtest
+from app.utils.backtest import MarketHistory, load_market_history, rolling_withdrawal_backtest
+
+def synthetic_history(months: int, seed: int) -> MarketHistory:
+    rng = np.random.default_rng(seed)
+    return MarketHistory(
+        months=[f"{2000 + i // 12}-{i % 12 + 1:02d}" for i in range(months)],
+        cdi=rng.normal(0.009, 0.002, months),
+        ipca=rng.normal(0.005, 0.004, months),
+        ibov=rng.normal(0.01, 0.07, months)
+    )
+
+def window_by_loop(returns, ipca, withdrawal_rate):
+    """Referência: saldo mês a mês, saque no fim do mês corrigido pelo IPCA"""
+
+    balance, withdrawal, prices, peak = 1.0, withdrawal_rate / 12, 1.0, 1.0
+    survived, drawdown = True, 0.0
+    for monthly_return, inflation in zip(returns, ipca):
+        balance = balance * (1 + monthly_return) - withdrawal
+        withdrawal *= 1 + inflation
+        prices *= 1 + inflation
+        survived &= balance >= 0
+
+        real = max(balance / prices, 0.0)
+        peak = max(peak, real)
+        drawdown = max(drawdown, 1 - real / peak)
+    return survived, max(balance / prices, 0.0), drawdown
+
+@pytest.mark.parametrize("seed, equity_weight, withdrawal_rate", [
+    (1, 0.0, 0.04), (2, 0.6, 0.05), (3, 1.0, 0.08), (4, 0.3, 0.12),
+])
+def test_closed_form_matches_monthly_loop(seed, equity_weight, withdrawal_rate):
+    history = synthetic_history(180, seed)
+    months = 120
+    result = rolling_withdrawal_backtest(history, equity_weight, withdrawal_rate, months)
+    returns = history.portfolio_returns(equity_weight)
+
+    assert result.windows == 61
+    for start in range(result.windows):
+        window = slice(start, start + months)
+        survived, ending, drawdown = window_by_loop(returns[window], history.ipca[window], withdrawal_rate)
+
+        assert result.survived[start] == survived
+        assert result.ending_real_balance[start] == pytest.approx(ending, abs=1e-9)
+        assert result.max_drawdown[start] == pytest.approx(drawdown, abs=1e-9)
+
+        # A taxa segura zera o saldo exatamente no fim da janela
+        safe_rate = result.safe_withdrawal_rate[start]
+        assert window_by_loop(returns[window], history.ipca[window], safe_rate)[1] == pytest.approx(0, abs=1e-9)
+
+def test_window_longer_than_history():
+    with pytest.raises(ValueError):
+        rolling_withdrawal_backtest(synthetic_history(24, 0), 0.5, 0.04, 36)
+
+@pytest.fixture
+def without_market_data(monkeypatch, tmp_path):
+    monkeypatch.setattr(backtest, "DEFAULT_DATA_PATH", str(tmp_path / "market_monthly.csv.gz"))
+    load_market_history.cache_clear()
+    yield
+    load_market_history.cache_clear()
+
+def test_sample_used_without_market_data(without_market_data, tmp_path):
+    history = load_market_history()
+    assert history.sample
+    assert history.since("2000-01").sample
+    assert len(history) >= 360
+
+    # Caminho configurado explicitamente não cai para a amostra
+    with pytest.raises(FileNotFoundError):
+        load_market_history(str(tmp_path / "configurado.csv.gz"))
+
+async def test_backtest_route_on_fresh_checkout(without_market_data, monkeypatch):
+    from app.agents.fire_calculator import FireCalculatorAgent
+    from app.core.config import settings
+    from app.main import create_app
+
+    agent = FireCalculatorAgent()
+    monkeypatch.setattr(fire, "get_fire_calculator", lambda: agent)
+    monkeypatch.setattr(settings, "BACKTEST_DATA_PATH", None)
+
+    transport = httpx.ASGITransport(app=create_app(run_warm_up=False))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.post("/fire/backtest", json={"years": 30})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sample_data"] is True
+    assert body["profiles"]
+    assert all(profile["windows"] > 0 for profile in body["profiles"].values())
@@ -0,0 +1,166 @@
+"""
+Testes do cache de respostas FIRE (chaves canônicas, LRU/TTL, disco e ETag)
+"""
+
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.api import fire
+from app.core.config import settings
+from app.schemas.fire import FireCalculationRequest
+from app.services import cache
+from app.services.cache import DiskCacheStore, ResponseCache, canonical_key
+
+FIRE_PAYLOAD = {
+    "current_age": 30,
+    "monthly_income": "10000",
+    "monthly_expenses": "5000",
+    "current_savings": "50000",
+}
+
+def test_canonical_key_ignores_number_spelling_and_order():
+    base = canonical_key("ns", {"a": Decimal("10000"), "b": [1, 0.1]})
+
+    assert canonical_key("ns", {"b": [1, Decimal("0.1")], "a": Decimal("1E+4")}) == base
+    assert canonical_key("ns", {"a": Decimal("10000.00"), "b": [1, 0.10]}) == base
+    assert canonical_key("ns", {"a": Decimal("10001"), "b": [1, 0.1]}) != base
+    assert canonical_key("outro", {"a": Decimal("10000"), "b": [1, 0.1]}) != base
+
+def test_canonical_key_is_stable_for_equivalent_models():
+    first = FireCalculationRequest(**FIRE_PAYLOAD)
+    second = FireCalculationRequest(**{**FIRE_PAYLOAD, "monthly_income": "10000.00", "current_savings": 50000})
+
+    assert canonical_key("fire", first) == canonical_key("fire", second)
+    assert canonical_key("fire", first) == canonical_key("fire", first.model_dump())
+    # Valor fixo: a chave não pode mudar entre processos (cache em disco compartilhado)
+    assert canonical_key("ns", {"x": Decimal("1.50")}) == canonical_key("ns", {"x": "1.5"})
+    assert canonical_key("ns", [1, "a"]).startswith("ns:") and len(canonical_key("ns", [1, "a"])) == 67
+
+async def test_lru_evicts_least_recently_used_by_bytes():
+    lru = ResponseCache("test", ttl=60, max_bytes=25)  # duas entradas de 10 bytes (valor + chave)
+
+    await lru.set("a", b"x" * 9)
+    await lru.set("b", b"x" * 9)
+    assert await lru.get("a") is not None  # "a" passa a ser o mais recente
+    await lru.set("c", b"x" * 9)
+
+    assert await lru.get("b") is None
+    assert await lru.get("a") is not None and await lru.get("c") is not None
+    assert lru.stats()["evictions"] == 1
+    assert lru.stats()["bytes"] == 20
+
+    # Maior que o limite inteiro: não entra
+    await lru.set("d", b"x" * 40)
+    assert await lru.get("d") is None
+
+async def test_ttl_expires_entries(monkeypatch):
+    lru = ResponseCache("test", ttl=10, max_bytes=1024)
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now)
+
+    await lru.set("a", b"1")
+    await lru.set("b", b"2", ttl=100)
+
+    monkeypatch.setattr(cache.time, "time", lambda: now + 50)
+    assert await lru.get("a") is None
+    assert await lru.get("b") == b"2"
+    assert lru.stats()["entries"] == 1
+
+async def test_disk_store_is_shared_and_expires(tmp_path):
+    store = DiskCacheStore(str(tmp_path / "cache.db"))
+    writer = ResponseCache("shared", ttl=60, max_bytes=1024, disk_store=store)
+    reader = ResponseCache("shared", ttl=60, max_bytes=1024, disk_store=store)
+    other = ResponseCache("outro", ttl=60, max_bytes=1024, disk_store=store)
+
+    await writer.set_json("k", {"v": 1})
+    assert await reader.get_json("k") == {"v": 1}
+    assert await other.get("k") is None
+
+    await writer.set("velho", b"x", ttl=-1)
+    assert store.purge_expired() == 1
+
+    await reader.clear()
+    assert await writer.get("k") == b'{"v":1}'  # ainda na memória do writer
+    assert await ResponseCache("shared", 60, 1024, disk_store=store).get("k") is None
+    store.close()
+
+async def test_open_caches_attaches_disk_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "FIRE_CACHE_DISK_PATH", str(tmp_path / "fire_cache.db"))
+
+    assert cache.fire_result_cache.disk_store is None
+    await cache.open_caches()
+    try:
+        assert cache.fire_result_cache.disk_store is cache.fire_insights_cache.disk_store
+        assert cache.fire_result_cache.disk_store.path == settings.FIRE_CACHE_DISK_PATH
+    finally:
+        await cache.close_caches()
+    assert cache.fire_result_cache.disk_store is None
+
+# Rota /fire/calculate: ETag, 304 e cache apenas de respostas com insights da IA
+
+def ai_reply(content: str):
+    async def chat(*args, **kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    return chat
+
+async def ai_down(*args, **kwargs):
+    raise RuntimeError("IA indisponível")
+
+@pytest.fixture
+async def client(monkeypatch):
+    from app.agents import fire_calculator
+    from app.main import create_app
+
+    agent = fire_calculator.FireCalculatorAgent()
+    monkeypatch.setattr(fire, "get_fire_calculator", lambda: agent)
+    await cache.fire_result_cache.clear()
+    await cache.fire_insights_cache.clear()
+
+    transport = httpx.ASGITransport(app=create_app(run_warm_up=False))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http, fire_calculator
+
+async def test_calculate_etag_and_304(client, monkeypatch):
+    http, fire_calculator = client
+    monkeypatch.setattr(fire_calculator.openai_gateway, "chat", ai_reply("Invista no Tesouro IPCA+"))
+
+    first = await http.post("/fire/calculate", json=FIRE_PAYLOAD)
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    assert first.json()["insights"] == ["Invista no Tesouro IPCA+"]
+    assert "insights_fallback" not in first.json()
+
+    # Mesma entrada escrita de outra forma: HIT com o mesmo ETag
+    second = await http.post("/fire/calculate", json={**FIRE_PAYLOAD, "monthly_income": "10000.00"})
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["etag"] == first.headers["etag"]
+
+    not_modified = await http.post(
+        "/fire/calculate", json=FIRE_PAYLOAD, headers={"If-None-Match": f'W/{first.headers["etag"]}, "x"'}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    changed = await http.post("/fire/calculate", json=FIRE_PAYLOAD, headers={"If-None-Match": '"outro"'})
+    assert changed.status_code == 200
+
+async def test_fallback_insights_are_not_cached(client, monkeypatch):
+    http, fire_calculator = client
+    monkeypatch.setattr(fire_calculator.openai_gateway, "chat", ai_down)
+
+    fallback = await http.post("/fire/calculate", json=FIRE_PAYLOAD)
+    assert fallback.status_code == 200
+    assert fallback.headers["x-cache"] == "MISS"
+    assert cache.fire_result_cache.stats()["entries"] == 0
+    assert cache.fire_insights_cache.stats()["entries"] == 0
+
+    # IA de volta: a próxima requisição recalcula e passa a ser cacheada
+    monkeypatch.setattr(fire_calculator.openai_gateway, "chat", ai_reply("Diversifique em FIIs"))
+    recovered = await http.post("/fire/calculate", json=FIRE_PAYLOAD)
+    assert recovered.headers["x-cache"] == "MISS"
+    assert recovered.json()["insights"] == ["Diversifique em FIIs"]
+    assert (await http.post("/fire/calculate", json=FIRE_PAYLOAD)).headers["x-cache"] == "HIT"
@@ -0,0 +1,69 @@
+"""
+Testes da camada assíncrona de banco de dados
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.expense import Expense
+from app.services.database import DatabaseService, build_async_url, get_db
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./fire_brasil.db", "sqlite+aiosqlite:///./fire_brasil.db"),
+    ("sqlite://", "sqlite+aiosqlite://"),
+    ("postgresql://fire:s3nha@db:5432/fire", "postgresql+asyncpg://fire:s3nha@db:5432/fire"),
+    ("postgres://fire:s3nha@db/fire", "postgresql+asyncpg://fire:s3nha@db/fire"),
+    ("postgresql+asyncpg://fire@db/fire", "postgresql+asyncpg://fire@db/fire"),
+    ("sqlite+aiosqlite:///x.db", "sqlite+aiosqlite:///x.db"),
+])
+def test_build_async_url_maps_sync_drivers(url, expected):
+    assert build_async_url(url) == expected
+
+def _expense(user_id: str = "u1") -> Expense:
+    return Expense(user_id=user_id, date=date(2024, 3, 10), description="Mercado", amount=Decimal("12.34"))
+
+async def _count(service: DatabaseService) -> int:
+    async with await service.get_session() as session:
+        return (await session.execute(select(func.count()).select_from(Expense))).scalar_one()
+
+async def test_get_db_commits_on_success(database):
+    dependency = get_db()
+    session = await anext(dependency)
+    session.add(_expense())
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+    assert await _count(database) == 1
+
+async def test_get_db_rolls_back_on_error(database):
+    dependency = get_db()
+    session = await anext(dependency)
+    session.add(_expense())
+    await session.flush()
+
+    with pytest.raises(RuntimeError):
+        await dependency.athrow(RuntimeError("falha no handler"))
+
+    assert await _count(database) == 0
+
+async def test_pool_status_before_initialize():
+    assert DatabaseService().get_pool_status() == {"initialized": False}
+
+async def test_pool_status_on_sqlite_pool(database):
+    status = database.get_pool_status()
+
+    assert status["initialized"] is True
+    assert status["dialect"] == "sqlite"
+    assert status["size"] == settings.DATABASE_POOL_SIZE
+    assert status["capacity"] == settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW
+    assert status["checked_out"] == 0
+
+    async with database.engine.connect():
+        busy = database.get_pool_status()
+    assert busy["checked_out"] == 1
+    assert busy["utilization"] == round(1 / busy["capacity"], 4)
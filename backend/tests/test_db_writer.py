@@ -0,0 +1,104 @@
+"""
+Testes do escritor dedicado com commits em lote
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.services.db_writer import BatchedWriter
+
+metadata = MetaData()
+
+items = Table(
+    "writer_items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(32), unique=True),
+)
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'writer.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+def add(name: str):
+    async def operation(session):
+        await session.execute(insert(items).values(name=name))
+        return name
+    return operation
+
+async def names(session_factory) -> list:
+    async with session_factory() as session:
+        return sorted((await session.execute(select(items.c.name))).scalars())
+
+async def test_batches_concurrent_writes(session_factory):
+    writer = BatchedWriter(session_factory, batch_size=50, batch_window_ms=20)
+    await writer.start()
+
+    results = await asyncio.gather(*(writer.submit(add(f"item-{i}")) for i in range(10)))
+    await writer.stop()
+
+    assert results == [f"item-{i}" for i in range(10)]
+    assert writer.operations_committed == 10
+    assert writer.batches_committed < 10
+    assert len(await names(session_factory)) == 10
+
+async def test_failing_operation_is_isolated_on_replay(session_factory):
+    writer = BatchedWriter(session_factory, batch_size=50, batch_window_ms=20)
+    await writer.start()
+
+    # "dup" repetido viola a UNIQUE no meio do lote
+    results = await asyncio.gather(
+        writer.submit(add("antes")),
+        writer.submit(add("dup")),
+        writer.submit(add("dup")),
+        writer.submit(add("depois")),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "antes"
+    assert results[1] == "dup"
+    assert isinstance(results[2], IntegrityError)
+    assert results[3] == "depois"
+
+    # A tarefa de escrita sobrevive e continua aceitando operações
+    assert writer.running
+    assert await writer.submit(add("seguinte")) == "seguinte"
+    await writer.stop()
+
+    assert await names(session_factory) == ["antes", "depois", "dup", "seguinte"]
+
+async def test_operation_exception_reaches_only_its_caller(session_factory):
+    writer = BatchedWriter(session_factory, batch_size=50, batch_window_ms=20)
+    await writer.start()
+
+    async def broken(session):
+        raise ValueError("operação inválida")
+
+    ok, failed = await asyncio.gather(writer.submit(add("ok")), writer.submit(broken), return_exceptions=True)
+    await writer.stop()
+
+    assert ok == "ok"
+    assert isinstance(failed, ValueError)
+    assert await names(session_factory) == ["ok"]
+
+async def test_submit_requires_running_writer(session_factory):
+    with pytest.raises(RuntimeError):
+        await BatchedWriter(session_factory).submit(add("x"))
+
+async def test_stop_flushes_pending_operations(session_factory):
+    writer = BatchedWriter(session_factory, batch_size=50, batch_window_ms=1000)
+    await writer.start()
+
+    pending = [asyncio.create_task(writer.submit(add(f"p{i}"))) for i in range(3)]
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    assert [task.result() for task in pending] == ["p0", "p1", "p2"]
+    assert len(await names(session_factory)) == 3
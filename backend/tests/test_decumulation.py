@@ -0,0 +1,97 @@
+"""
+Testes do motor de retiradas com tributação brasileira
+"""
+
+import numpy as np
+import pytest
+
+from app.utils.decumulation import (
+    COME_COTAS_RATE, DAYS_PER_MONTH, STOCK_EXEMPTION, STOCK_RATE,
+    regime_codes, regressive_rate, simulate_withdrawals, sustainable_withdrawal_rate
+)
+
+@pytest.mark.parametrize("days, rate", [
+    (0, 0.225), (180, 0.225), (181, 0.20), (360, 0.20),
+    (361, 0.175), (720, 0.175), (721, 0.15), (5000, 0.15),
+])
+def test_regressive_brackets(days, rate):
+    assert regressive_rate(days) == pytest.approx(rate)
+
+@pytest.mark.parametrize("holding_days, rate", [
+    (0, 0.225),                           # 1º mês: até 180 dias
+    (200, 0.20),                          # 181 a 360 dias
+    (400, 0.175),                         # 361 a 720 dias
+    (720 - DAYS_PER_MONTH + 1, 0.15),     # passa de 720 dias no saque
+])
+def test_regressive_withdrawal_taxes_gain_share(holding_days, rate):
+    # Metade do saldo é ganho: o imposto efetivo é metade da alíquota
+    result = simulate_withdrawals([[1000.0]], [[500.0]], regime_codes(["regressivo"]), [0.0],
+                                  monthly_withdrawal=100.0, months=1, holding_days=holding_days)
+
+    assert result.gross_withdrawn[0] - result.taxes_paid[0] == pytest.approx(100.0)
+    assert result.effective_tax_rate[0] == pytest.approx(rate / 2)
+
+def test_exempt_bucket_pays_no_tax():
+    result = simulate_withdrawals([[1000.0]], [[100.0]], regime_codes(["isento"]), [0.01],
+                                  monthly_withdrawal=50.0, months=12)
+
+    assert result.taxes_paid[0] == 0
+    assert result.survived[0]
+
+def test_come_cotas_in_may_and_november():
+    monthly = 0.01
+    result = simulate_withdrawals([[1000.0]], [[1000.0]], regime_codes(["come_cotas"]), [monthly],
+                                  monthly_withdrawal=0.0, months=12, start_month=1)
+
+    # Maio: 15% do rendimento desde a aplicação; novembro: desde maio
+    may = 1000.0 * (1 + monthly) ** 5
+    may_tax = COME_COTAS_RATE * (may - 1000.0)
+    may_after = may - may_tax
+    november = may_after * (1 + monthly) ** 6
+    november_tax = COME_COTAS_RATE * (november - may_after)
+
+    assert result.taxes_paid[0] == pytest.approx(may_tax + november_tax)
+    assert result.final_balance[0] == pytest.approx((november - november_tax) * (1 + monthly))
+
+def test_come_cotas_skipped_outside_may_and_november():
+    result = simulate_withdrawals([[1000.0]], [[1000.0]], regime_codes(["come_cotas"]), [0.01],
+                                  monthly_withdrawal=0.0, months=4, start_month=1)
+    assert result.taxes_paid[0] == 0
+
+def test_stock_sales_up_to_exemption_are_tax_free():
+    result = simulate_withdrawals([[100_000.0]], [[50_000.0]], regime_codes(["acoes"]), [0.0],
+                                  monthly_withdrawal=STOCK_EXEMPTION, months=1)
+
+    assert result.taxes_paid[0] == 0
+    assert result.gross_withdrawn[0] == pytest.approx(STOCK_EXEMPTION)
+
+def test_stock_sales_above_exemption_pay_on_whole_gain_share():
+    result = simulate_withdrawals([[100_000.0]], [[50_000.0]], regime_codes(["acoes"]), [0.0],
+                                  monthly_withdrawal=30_000.0, months=1)
+
+    assert result.gross_withdrawn[0] - result.taxes_paid[0] == pytest.approx(30_000.0)
+    assert result.effective_tax_rate[0] == pytest.approx(STOCK_RATE / 2)
+
+def test_sustainable_rate_is_the_survival_boundary():
+    regimes = regime_codes(["regressivo", "acoes"])
+    values, cost_basis = [[600_000.0, 400_000.0]], [[400_000.0, 300_000.0]]
+    returns, months = [0.007, 0.009], 360
+
+    rate = sustainable_withdrawal_rate(values, cost_basis, regimes, returns, months, tolerance=1e-5)[0]
+
+    def survives(annual_rate):
+        return simulate_withdrawals(values, cost_basis, regimes, returns,
+                                    monthly_withdrawal=annual_rate * 1_000_000 / 12, months=months).survived[0]
+
+    assert survives(rate)
+    assert not survives(rate + 2e-5)
+
+def test_sustainable_rate_widens_past_initial_bracket():
+    # Sem rendimento, 12 meses: sacar 100% ao ano esgota exatamente no fim
+    rate = sustainable_withdrawal_rate([[1000.0]], [[1000.0]], regime_codes(["isento"]), [0.0], 12)
+    assert rate[0] == pytest.approx(1.0, abs=1e-3)
+    assert rate[0] > 0.25
+
+def test_sustainable_rate_rejects_unbounded_returns():
+    with pytest.raises(ValueError):
+        sustainable_withdrawal_rate([[1000.0]], [[1000.0]], regime_codes(["isento"]), [1.5], 12)
@@ -0,0 +1,104 @@
+"""
+Testes da listagem paginada por cursor e dos filtros de tags
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.schemas.expense import ExpenseCreate, ExpenseFilter, ExpenseUpdate
+from app.services.expenses import decode_cursor, encode_cursor, expense_service
+
+USER = "listing-user"
+
+async def seed(count: int, days: int = 4):
+    """Despesas com várias por dia, para exercitar o desempate por id"""
+    created = []
+    for i in range(count):
+        created.append(await expense_service.create_expense(USER, ExpenseCreate(
+            date=date(2024, 1, 1) + timedelta(days=i % days),
+            description=f"Despesa {i}",
+            amount=Decimal(i + 1),
+        )))
+    return created
+
+async def all_pages(filters: ExpenseFilter, per_page: int):
+    pages, cursor = [], None
+    while True:
+        result = await expense_service.list_expenses(USER, filters, cursor=cursor, per_page=per_page)
+        pages.append(result)
+        cursor = result.next_cursor
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("expense_date, expense_id", [
+    (date(2024, 1, 31), 1), (date(1999, 12, 31), 123456789), (date(2030, 6, 1), 0),
+])
+def test_cursor_round_trip(expense_date, expense_id):
+    assert decode_cursor(encode_cursor(expense_date, expense_id)) == (expense_date, expense_id)
+
+@pytest.mark.parametrize("cursor", ["", "nao-e-cursor", encode_cursor(date(2024, 1, 1), 1)[:-3]])
+def test_invalid_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+async def test_cursor_pages_cover_every_row_once_in_order(database):
+    created = await seed(23)
+
+    pages = await all_pages(ExpenseFilter(), per_page=5)
+    items = [item for page in pages for item in page.items]
+
+    expected = sorted(created, key=lambda e: (e.date, e.id), reverse=True)
+    assert [item.id for item in items] == [e.id for e in expected]
+    assert [len(page.items) for page in pages] == [5, 5, 5, 5, 3]
+    assert all(page.total == 23 and page.pages == 5 for page in pages)
+
+async def test_page_without_cursor_matches_cursor_pages(database):
+    await seed(12)
+
+    by_cursor = await all_pages(ExpenseFilter(), per_page=5)
+    third = await expense_service.list_expenses(USER, ExpenseFilter(), per_page=5, page=3)
+
+    assert third.page == 3
+    assert [item.id for item in third.items] == [item.id for item in by_cursor[2].items]
+    assert third.next_cursor is None
+
+async def test_page_with_cursor_is_rejected(database):
+    await seed(6)
+    first = await expense_service.list_expenses(USER, ExpenseFilter(), per_page=2)
+
+    with pytest.raises(ValueError):
+        await expense_service.list_expenses(USER, ExpenseFilter(), cursor=first.next_cursor, per_page=2, page=2)
+
+async def test_tags_filter_requires_all_tags(database):
+    both = await expense_service.create_expense(USER, ExpenseCreate(
+        date=date(2024, 2, 1), description="Jantar viagem", amount=Decimal("80"), tags=["Viagem", " comida "]
+    ))
+    await expense_service.create_expense(USER, ExpenseCreate(
+        date=date(2024, 2, 2), description="Hotel", amount=Decimal("300"), tags=["viagem"]
+    ))
+    await expense_service.create_expense(USER, ExpenseCreate(
+        date=date(2024, 2, 3), description="Mercado", amount=Decimal("120"), tags=["comida"]
+    ))
+
+    # Tags normalizadas na escrita e no filtro
+    assert both.tags == ["comida", "viagem"]
+    result = await expense_service.list_expenses(USER, ExpenseFilter(tags=["VIAGEM", "comida"]))
+    assert [item.id for item in result.items] == [both.id]
+    assert result.total == 1
+
+    viagem = await expense_service.list_expenses(USER, ExpenseFilter(tags=["viagem"]))
+    assert viagem.total == 2
+
+    # Tags substituídas na atualização
+    await expense_service.update_expense(USER, both.id, ExpenseUpdate(tags=["trabalho"]))
+    assert (await expense_service.list_expenses(USER, ExpenseFilter(tags=["viagem"]))).total == 1
+    assert (await expense_service.list_expenses(USER, ExpenseFilter(tags=["trabalho"]))).total == 1
+
+async def test_count_cache_invalidated_by_writes(database):
+    await seed(3)
+    assert (await expense_service.list_expenses(USER, ExpenseFilter())).total == 3
+
+    await seed(1)
+    assert (await expense_service.list_expenses(USER, ExpenseFilter())).total == 4
@@ -0,0 +1,121 @@
+"""
+Testes da manutenção incremental do rollup mensal
+Após cada escrita o rollup deve ser igual ao agregado recalculado das despesas
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.expense import Expense, ExpenseMonthlyRollup
+from app.schemas.expense import ExpenseCategory, ExpenseCreate, ExpenseUpdate, PaymentMethod
+from app.services.expense_rollup import RollupSummary, expense_rollup_service
+from app.services.expenses import expense_service
+from app.utils.expense_frame import ExpenseFrame
+from app.utils.money import to_cents
+
+USER = "rollup-user"
+
+async def rollup_cells(database):
+    async with await database.get_session() as session:
+        rows = (await session.execute(select(ExpenseMonthlyRollup))).scalars().all()
+    return {
+        (cell.user_id, cell.month, cell.type, cell.category, cell.payment_method):
+            (cell.total_cents, cell.count, cell.min_cents, cell.max_cents)
+        for cell in rows
+    }
+
+async def recomputed_cells(database):
+    async with await database.get_session() as session:
+        expenses = (await session.execute(select(Expense))).scalars().all()
+
+    cells = {}
+    for expense in expenses:
+        key = (expense.user_id, expense.date.strftime("%Y-%m"), expense.type,
+               expense.category or "", expense.payment_method or "")
+        cents = to_cents(expense.amount)
+        total, count, low, high = cells.get(key, (0, 0, cents, cents))
+        cells[key] = (total + cents, count + 1, min(low, cents), max(high, cents))
+    return cells
+
+async def assert_consistent(database):
+    assert await rollup_cells(database) == await recomputed_cells(database)
+
+async def create(amount: str, day: date = date(2024, 3, 10), **fields):
+    return await expense_service.create_expense(USER, ExpenseCreate(
+        date=day, description="Despesa de teste", amount=Decimal(amount), **fields
+    ))
+
+async def test_insert_accumulates_cells(database):
+    await create("10.00", category=ExpenseCategory.ALIMENTACAO, payment_method=PaymentMethod.PIX)
+    await create("25.50", category=ExpenseCategory.ALIMENTACAO, payment_method=PaymentMethod.PIX)
+    await create("7.25")
+
+    await assert_consistent(database)
+    cells = await rollup_cells(database)
+    assert cells[(USER, "2024-03", "expense", "alimentacao", "pix")] == (3550, 2, 1000, 2550)
+    assert cells[(USER, "2024-03", "expense", "", "")] == (725, 1, 725, 725)
+
+async def test_update_moves_between_months_and_categories(database):
+    low = await create("5.00", category=ExpenseCategory.LAZER)
+    high = await create("50.00", category=ExpenseCategory.LAZER)
+    await create("20.00", category=ExpenseCategory.LAZER)
+
+    # Valor muda dentro da mesma célula: mínimo precisa ser recalculado
+    await expense_service.update_expense(USER, low.id, ExpenseUpdate(amount=Decimal("30.00")))
+    await assert_consistent(database)
+
+    # Troca de categoria
+    await expense_service.update_expense(USER, high.id, ExpenseUpdate(category=ExpenseCategory.SAUDE))
+    await assert_consistent(database)
+
+    # Troca de mês e de valor ao mesmo tempo
+    await expense_service.update_expense(USER, low.id, ExpenseUpdate(
+        date=date(2024, 4, 2), amount=Decimal("12.34")
+    ))
+    await assert_consistent(database)
+
+    cells = await rollup_cells(database)
+    assert cells[(USER, "2024-03", "expense", "lazer", "")] == (2000, 1, 2000, 2000)
+    assert cells[(USER, "2024-03", "expense", "saude", "")] == (5000, 1, 5000, 5000)
+    assert cells[(USER, "2024-04", "expense", "lazer", "")] == (1234, 1, 1234, 1234)
+
+async def test_delete_removes_empty_cells(database):
+    first = await create("10.00", category=ExpenseCategory.TRANSPORTE)
+    second = await create("40.00", category=ExpenseCategory.TRANSPORTE)
+
+    assert await expense_service.delete_expense(USER, second.id)
+    await assert_consistent(database)
+    assert (await rollup_cells(database))[(USER, "2024-03", "expense", "transporte", "")] == (1000, 1, 1000, 1000)
+
+    assert await expense_service.delete_expense(USER, first.id)
+    assert await rollup_cells(database) == {}
+
+async def test_summary_matches_frame_labels(database):
+    await create("10.00")
+    await create("20.00", category=ExpenseCategory.OUTROS, payment_method=PaymentMethod.DEBITO)
+    await create("30.00", category=ExpenseCategory.MORADIA)
+
+    async with await database.get_session() as session:
+        summary = await expense_rollup_service.get_summary(session, USER)
+        rows = (await session.execute(
+            select(Expense.date, Expense.amount, Expense.category, Expense.subcategory, Expense.payment_method)
+        )).all()
+    frame = ExpenseFrame.from_columns(*zip(*rows))
+
+    # Sem categoria e "outros" caem no mesmo rótulo nas duas representações
+    breakdown = summary.category_breakdown()
+    assert set(breakdown) == set(frame.group_by("category")) == {"outros", "moradia"}
+    assert breakdown["outros"]["amount"] == 30.0
+    assert set(frame.group_by("payment_method")) == set(summary.to_expense_stats().by_payment_method)
+
+@pytest.mark.parametrize("cells, expected", [
+    ([], {"total": 0, "count": 0, "average": 0}),
+    ([ExpenseMonthlyRollup(user_id=USER, month="2024-03", type="expense", category="", payment_method="",
+                           total_cents=1001, count=2, min_cents=1, max_cents=1000)],
+     {"total": 10.01, "count": 2, "average": 5.005, "min": 0.01, "max": 10.0, "currency": "BRL"}),
+])
+def test_comprehensive_stats(cells, expected):
+    assert RollupSummary(cells=cells).comprehensive_stats() == expected
@@ -0,0 +1,151 @@
+"""
+Testes da busca textual de despesas (FTS5 sem acentos e fallback LIKE)
+"""
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.schemas.expense import ExpenseCreate, ExpenseFilter, ExpenseUpdate
+from app.services.expense_search import (
+    expense_search_service, highlight, normalize_search_text, normalize_sql, search_terms
+)
+from app.services.expenses import expense_service
+
+USER = "search-user"
+
+async def create(description: str, notes: str = None, day: int = 1):
+    return await expense_service.create_expense(USER, ExpenseCreate(
+        date=date(2024, 5, day), description=description, amount=Decimal("10"), notes=notes
+    ))
+
+async def found(query: str):
+    return [hit.expense.description for hit in await expense_service.search_expenses(USER, query)]
+
+@pytest.fixture
+def like_fallback(monkeypatch):
+    monkeypatch.setattr(expense_search_service, "enabled", False)
+
+def test_highlight_escapes_html_before_marking():
+    assert highlight("<b>Pão</b> & café", ["pao"]) == "&lt;b&gt;<mark>Pão</mark>&lt;/b&gt; &amp; café"
+    assert highlight("<script>", ["xyz"]) == "&lt;script&gt;"
+    assert highlight("a<mark>b", []) == "a&lt;mark&gt;b"
+
+def test_highlight_merges_overlapping_terms():
+    assert highlight("Supermercado", search_terms("merc super")) == "<mark>Supermerc</mark>ado"
+
+async def test_accent_insensitive_match(database):
+    await create("Supermercado Pão de Açúcar")
+    await create("Farmácia São João")
+
+    assert await found("acucar") == ["Supermercado Pão de Açúcar"]
+    assert await found("PAO ACÚCAR") == ["Supermercado Pão de Açúcar"]
+    assert await found("farmacia sao") == ["Farmácia São João"]
+    assert await found("inexistente") == []
+
+async def test_notes_are_searched_and_highlighted(database):
+    await create("Mercado", notes="Compra do <churrasco> de sábado")
+
+    hits = await expense_service.search_expenses(USER, "sabado")
+
+    assert len(hits) == 1
+    assert hits[0].highlight == "Mercado"
+    assert hits[0].notes_highlight == "Compra do &lt;churrasco&gt; de <mark>sábado</mark>"
+
+async def test_ranking_prefers_denser_matches(database):
+    await create("Uber viagem aeroporto com bagagem extra e pedágio", day=3)
+    await create("Uber Uber", day=1)
+
+    hits = await expense_service.search_expenses(USER, "uber")
+
+    assert [hit.expense.description for hit in hits] == ["Uber Uber", "Uber viagem aeroporto com bagagem extra e pedágio"]
+    assert hits[0].rank > hits[1].rank
+
+async def test_index_follows_updates_and_deletes(database):
+    expense = await create("Academia")
+
+    await expense_service.update_expense(USER, expense.id, ExpenseUpdate(description="Natação"))
+    assert await found("academia") == []
+    assert await found("natacao") == ["Natação"]
+
+    await expense_service.delete_expense(USER, expense.id)
+    assert await found("natacao") == []
+
+async def test_short_terms_and_listing_filter(database):
+    await create("Pag*Padaria Real", notes="pão na chapa")
+    await create("Posto BR", notes="gasolina")
+
+    # Termo com menos de 3 letras não gera trigramas: filtrado com LIKE
+    assert await found("br") == ["Posto BR"]
+
+    listing = await expense_service.list_expenses(USER, ExpenseFilter(search="padaria"))
+    assert [item.description for item in listing.items] == ["Pag*Padaria Real"]
+
+async def test_other_connections_keep_index_in_sync(database, sqlite_url):
+    """Triggers normalizam em SQL puro: escritas fora do ExpenseService também indexam"""
+
+    await create("Cinema")
+
+    with sqlite3.connect(sqlite_url.removeprefix("sqlite:///")) as conn:
+        conn.execute(
+            "INSERT INTO expenses (user_id, date, description, amount, type, created_at) "
+            "VALUES (?, '2024-05-02', 'Teatro São Pedro', 50, 'expense', '2024-05-02 10:00:00')", (USER,)
+        )
+        conn.execute("UPDATE expenses SET description = 'Cinema Pátio' WHERE description = 'Cinema'")
+
+    assert await found("SAO PEDRO") == ["Teatro São Pedro"]
+    assert await found("patio") == ["Cinema Pátio"]
+
+    with sqlite3.connect(sqlite_url.removeprefix("sqlite:///")) as conn:
+        conn.execute("DELETE FROM expenses WHERE description = 'Cinema Pátio'")
+
+    assert await found("cinema") == []
+
+def test_python_and_sql_normalization_agree():
+    samples = ["Pão de AÇÚCAR", "Crème Brûlée Ñandú", "Cafe\u0301 Łódź", "Øresund ß", "50% off_"]
+
+    with sqlite3.connect(":memory:") as conn:
+        for sample in samples:
+            (normalized,) = conn.execute(f"SELECT {normalize_sql('?')}", (sample,)).fetchone()
+            assert normalized == normalize_search_text(sample)
+
+async def test_wildcards_are_literal(database):
+    await create("Desconto 50% loja")
+    await create("Desconto 500 loja")
+    await create("conta_luz")
+    await create("conta luz")
+
+    assert await found("50%") == ["Desconto 50% loja"]
+    assert await found("_l") == ["conta_luz"]
+
+async def test_like_fallback(database, like_fallback):
+    await create("Restaurante Sabor", notes="Almoço com CLIENTES")
+    await create("Posto Ipiranga")
+    await create("Café Pão de Açúcar", notes="desconto 100%")
+    await create("Café Pão de Açúcar 1000")
+
+    assert await found("restaurante") == ["Restaurante Sabor"]
+    assert await found("clientes") == ["Restaurante Sabor"]
+    assert await found("IPIRANGA") == ["Posto Ipiranga"]
+    assert await found("almoco") == ["Restaurante Sabor"]
+
+    # Mesma normalização e termos do FTS; % e _ são literais
+    assert sorted(await found("cafe acucar")) == ["Café Pão de Açúcar", "Café Pão de Açúcar 1000"]
+    assert await found("100%") == ["Café Pão de Açúcar"]
+    assert await found("_") == []
+
+    hits = await expense_service.search_expenses(USER, "sabor")
+    assert hits[0].rank == 0.0
+    assert hits[0].highlight == "Restaurante <mark>Sabor</mark>"
+
+async def test_install_rebuilds_empty_index(database):
+    await create("Livraria Cultura", notes="Presente de aniversário")
+
+    async with database.engine.begin() as conn:
+        await conn.exec_driver_sql("DELETE FROM expenses_fts")
+        await expense_search_service.install(conn)
+
+    assert await found("livraria") == ["Livraria Cultura"]
+    assert await found("aniversario") == ["Livraria Cultura"]
@@ -0,0 +1,70 @@
+"""
+Testes do consultor financeiro sobre dados reais (janela de análise e rótulos)
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.agents.financial_advisor import FinancialAdvisorAgent
+from app.core.config import settings
+from app.schemas.expense import ExpenseCategory, ExpenseCreate
+from app.services.expenses import expense_service
+
+USER = "advisor-user"
+
+@pytest.fixture
+def advisor(monkeypatch):
+    agent = FinancialAdvisorAgent()
+
+    async def no_ai(stats, user_id):
+        return []
+
+    monkeypatch.setattr(agent, "_generate_ai_insights", no_ai)
+    return agent
+
+@pytest.mark.parametrize("today, months, expected", [
+    (date(2024, 3, 15), 12, (date(2023, 4, 1), date(2024, 3, 31))),
+    (date(2024, 12, 31), 12, (date(2024, 1, 1), date(2024, 12, 31))),
+    (date(2024, 2, 10), 1, (date(2024, 2, 1), date(2024, 2, 29))),
+    (date(2024, 1, 5), 25, (date(2022, 1, 1), date(2024, 1, 31))),
+])
+def test_analysis_window(monkeypatch, today, months, expected):
+    monkeypatch.setattr(settings, "ADVISOR_ANALYSIS_MONTHS", months)
+    assert FinancialAdvisorAgent()._analysis_window(today) == expected
+
+async def test_insights_ignore_expenses_outside_window(database, advisor):
+    today = date.today()
+    for day, amount, category in [
+        (today, "100.00", ExpenseCategory.ALIMENTACAO),
+        (today.replace(day=1), "50.00", None),
+        (today - timedelta(days=3 * 365), "9999.00", ExpenseCategory.LAZER),
+    ]:
+        await expense_service.create_expense(USER, ExpenseCreate(
+            date=day, description="Despesa", amount=Decimal(amount), category=category
+        ))
+
+    insights = await advisor.generate_insights(USER)
+
+    stats = insights["expense_stats"]
+    assert (stats["total"], stats["count"], stats["median"]) == (150.0, 2, 75.0)
+    assert set(insights["pattern_analysis"]["category_patterns"]) == {"alimentacao", "outros"}
+
+async def test_next_month_projection_uses_average_expense(database, advisor, monkeypatch):
+    async def no_analysis(stats, comparison, user_id):
+        return {}
+
+    monkeypatch.setattr(advisor, "_generate_monthly_analysis", no_analysis)
+
+    # Histórico mais caro em outro mês não altera a projeção
+    for day, amount in [(date(2024, 3, 5), "100.00"), (date(2024, 3, 20), "300.00"),
+                        (date(2024, 1, 10), "5000.00")]:
+        await expense_service.create_expense(USER, ExpenseCreate(
+            date=day, description="Despesa", amount=Decimal(amount), category=ExpenseCategory.ALIMENTACAO
+        ))
+
+    report = await advisor.generate_monthly_report(USER, "2024-03")
+
+    assert report["monthly_stats"]["average"] == 200.0
+    assert report["projections"]["projected_total"] == pytest.approx(200.0 * 1.05)
@@ -0,0 +1,131 @@
+"""
+Testes das fórmulas fechadas de acumulação e do goal seek
+"""
+
+import math
+from decimal import Decimal
+
+import pytest
+from hypothesis import assume, given, strategies as st
+
+from app.agents import fire_calculator
+from app.agents.fire_calculator import FireCalculatorAgent
+from app.schemas.fire import FireCalculationRequest, FireGoalSeekRequest, GoalSeekTarget
+from app.utils.fire_math import (
+    future_value, monthly_rate, months_to_target, required_contribution, solve_increasing
+)
+
+def months_by_loop(target, present_value, contribution, r, max_months=600):
+    """Referência: laço mês a mês"""
+    value, months = present_value, 0
+    while value < target and months < max_months:
+        value = value * (1 + r) + contribution
+        months += 1
+    return months
+
+# Valores em reais com centavos, como chegam das requisições
+def reais(low: int, high: int):
+    return st.integers(min_value=low * 100, max_value=high * 100).map(lambda cents: cents / 100)
+
+returns = st.floats(min_value=-0.004, max_value=0.02)
+amounts = reais(0, 5_000_000)
+contributions = reais(50, 50_000)
+
+@given(amounts, amounts, contributions, returns)
+def test_months_to_target_matches_monthly_loop(target, present_value, contribution, r):
+    assert months_to_target(target, present_value, contribution, r) == months_by_loop(
+        target, present_value, contribution, r
+    )
+
+@given(reais(10_000, 10_000_000), amounts, returns, st.integers(min_value=1, max_value=600))
+def test_required_contribution_inverts_months_to_target(target, present_value, r, months):
+    assume(present_value < target)
+    contribution = required_contribution(target, present_value, r, months)
+    assume(contribution > 1)
+
+    # O aporte mínimo atinge o alvo exatamente no prazo; um pouco menos, não
+    assert future_value(present_value, contribution, r, months) == pytest.approx(target, rel=1e-9)
+    assert months_to_target(target, present_value, contribution * (1 + 1e-9), r) == months
+    assert future_value(present_value, contribution * (1 - 1e-6), r, months) < target
+
+def test_required_contribution_edges():
+    assert required_contribution(100.0, 200.0, 0.01, 12) == 0.0
+    assert required_contribution(100.0, 50.0, 0.01, 0) == math.inf
+    assert required_contribution(1200.0, 0.0, 0.0, 12) == pytest.approx(100.0)
+
+@pytest.mark.parametrize("func, low, high, root", [
+    (lambda x: x ** 3 - 2, 0.0, 2.0, 2 ** (1 / 3)),
+    (lambda x: math.exp(x) - 5, -1.0, 3.0, math.log(5)),
+    (lambda x: x - 0.25, 0.0, 1.0, 0.25),
+])
+def test_solve_increasing_converges(func, low, high, root):
+    calls = []
+
+    def counted(x):
+        calls.append(x)
+        return func(x)
+
+    found, evaluations = solve_increasing(counted, low, high, value_tolerance=1e-12)
+
+    assert found == pytest.approx(root, abs=1e-9)
+    assert evaluations == len(calls)
+    assert evaluations < 100
+
+def test_solve_increasing_reuses_bracket_values():
+    calls = []
+
+    def func(x):
+        calls.append(x)
+        return x - 0.3
+
+    found, evaluations = solve_increasing(func, 0.0, 1.0, f_low=-0.3, f_high=0.7, value_tolerance=1e-12)
+
+    assert found == pytest.approx(0.3)
+    assert 0.0 not in calls and 1.0 not in calls
+    assert evaluations == len(calls)
+
+def test_solve_increasing_rejects_bad_bracket():
+    with pytest.raises(ValueError):
+        solve_increasing(lambda x: x + 1, 0.0, 1.0)
+
+BASE = dict(current_age=30, current_savings=Decimal("100000"), monthly_income=Decimal("15000"),
+            monthly_expenses=Decimal("7000"))
+
+def test_goal_seek_return_counts_every_evaluation(monkeypatch):
+    agent = FireCalculatorAgent()
+    calls = []
+    original = fire_calculator.future_value
+
+    def counted(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(fire_calculator, "future_value", counted)
+    result = agent.goal_seek(FireGoalSeekRequest(**BASE, target_age=50, solve_for=GoalSeekTarget.EXPECTED_RETURN))
+
+    assert result.feasible
+    assert result.evaluations == len(calls)
+    contribution = float(result.monthly_contribution)
+    reached = original(100000.0, contribution, monthly_rate(float(result.expected_return)), result.months_to_target)
+    # Retorno arredondado a 6 casas na resposta
+    assert reached == pytest.approx(float(result.fire_number), rel=1e-5)
+
+def test_goal_seek_contribution_reaches_fire_number():
+    agent = FireCalculatorAgent()
+    result = agent.goal_seek(FireGoalSeekRequest(**BASE, target_age=45))
+
+    r = monthly_rate(float(result.expected_return))
+    reached = future_value(100000.0, float(result.monthly_contribution), r, result.months_to_target)
+    assert reached >= float(result.fire_number)
+    assert future_value(100000.0, float(result.monthly_contribution) - 0.01, r, result.months_to_target) < float(result.fire_number)
+
+def test_target_age_does_not_override_time_to_fire():
+    agent = FireCalculatorAgent()
+    plain = FireCalculationRequest(**BASE)
+    with_target = FireCalculationRequest(**BASE, target_age=40)
+
+    assumptions = agent._calculate_assumptions(plain)
+    fire_number = agent._calculate_fire_number(plain, assumptions)
+
+    assert agent._calculate_time_to_fire(with_target, fire_number, assumptions) == \
+        agent._calculate_time_to_fire(plain, fire_number, assumptions)
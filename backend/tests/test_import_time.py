@@ -0,0 +1,17 @@
+"""
+Orçamento de tempo de importação (python -X importtime em processo limpo)
+"""
+
+from scripts.check_import_time import DEFAULT_BUDGET_MS, FORBIDDEN, measure
+
+def test_app_main_import_budget():
+    # Melhor de 3 execuções: a primeira paga o cache de bytecode e a
+    # máquina de CI oscila; o orçamento vale para o caso sem ruído
+    runs = [measure("app.main") for _ in range(3)]
+    total_ms = min(total for total, _, _ in runs) / 1000
+
+    assert total_ms <= DEFAULT_BUDGET_MS, f"import app.main levou {total_ms:.0f}ms (orçamento {DEFAULT_BUDGET_MS:.0f}ms)"
+
+    modules = runs[-1][2]
+    heavy = [name for name in FORBIDDEN if name in modules]
+    assert not heavy, f"Bibliotecas pesadas importadas na inicialização: {', '.join(heavy)}"
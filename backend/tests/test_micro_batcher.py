@@ -0,0 +1,49 @@
+"""
+Testes do micro-batcher de requisições
+"""
+
+import asyncio
+
+from app.services.micro_batcher import MicroBatcher
+
+def recording_batcher(**kwargs):
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    return MicroBatcher("teste", handler, **kwargs), batches
+
+async def test_batches_by_size():
+    batcher, batches = recording_batcher(batch_size=3, batch_window_ms=10_000)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+    await batcher.stop()
+
+    assert results == [i * 10 for i in range(6)]
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+
+async def test_stop_mid_window_dispatches_forming_batch():
+    # Janela longa: os itens ficam no lote em formação até o stop()
+    batcher, batches = recording_batcher(batch_size=10, batch_window_ms=60_000)
+
+    submits = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+    while batcher._queue is None or not batcher._queue.empty():
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(batcher.stop(), timeout=5)
+    results = await asyncio.wait_for(asyncio.gather(*submits), timeout=5)
+
+    assert results == [0, 10, 20]
+    assert batches == [[0, 1, 2]]
+    assert not batcher.running
+
+async def test_submit_after_stop_restarts():
+    batcher, _ = recording_batcher(batch_size=10, batch_window_ms=1)
+    assert await batcher.submit(1) == 10
+    await batcher.stop()
+
+    assert await batcher.submit(2) == 20
+    await batcher.stop()
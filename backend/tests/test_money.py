@@ -0,0 +1,83 @@
+"""
+Testes de propriedade das conversões monetárias em centavos
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st
+
+from app.utils.expense_frame import ExpenseFrame
+from app.utils.money import (
+    cents_to_float, divide_cents, float_to_cents, float_to_cents_array, from_cents, to_cents
+)
+
+# Até R$ 100 bilhões: bem abaixo do limite de inteiros exatos em float (2^53)
+cents_values = st.integers(min_value=-10**13, max_value=10**13)
+money = st.decimals(min_value=-10**11, max_value=10**11, places=2, allow_nan=False, allow_infinity=False)
+
+@given(cents_values)
+def test_from_cents_round_trip(cents):
+    assert to_cents(from_cents(cents)) == cents
+
+@given(money)
+def test_to_cents_round_trip(value):
+    assert from_cents(to_cents(value)) == value
+
+@given(money)
+def test_to_cents_accepts_str_and_float_as_typed(value):
+    cents = to_cents(value)
+    assert to_cents(str(value)) == cents
+    # float pela representação mais curta: o valor digitado, não o binário
+    assert to_cents(float(value)) == cents
+
+@given(cents_values)
+def test_float_round_trip_is_stable(cents):
+    value = cents_to_float(cents)
+    assert float_to_cents(value) == cents
+    assert float_to_cents(cents_to_float(float_to_cents(value))) == cents
+
+@given(st.lists(cents_values, min_size=1, max_size=50))
+def test_vectorized_float_to_cents_matches_scalar(cents):
+    values = np.array([cents_to_float(c) * 1.0 for c in cents])
+    assert float_to_cents_array(values).tolist() == [float_to_cents(v) for v in values]
+
+@given(cents_values, st.integers(min_value=-1000, max_value=1000), st.integers(min_value=1, max_value=1000))
+def test_divide_cents_rounds_half_away_from_zero(cents, numerator, denominator):
+    exact = Fraction(cents * numerator, denominator)
+    result = divide_cents(cents, numerator, denominator)
+
+    assert abs(result - exact) <= Fraction(1, 2)
+    if abs(result - exact) == Fraction(1, 2):
+        assert abs(result) > abs(exact)
+    assert divide_cents(-cents, numerator, denominator) == -result
+
+@given(cents_values, st.integers(min_value=1, max_value=240))
+def test_divide_cents_parts_sum_to_total(total, parts):
+    # Parcela i = fração acumulada até i+1 menos a acumulada até i
+    split = [divide_cents(total, i + 1, parts) - divide_cents(total, i, parts) for i in range(parts)]
+
+    assert sum(split) == total
+    # Resto espalhado: parcelas diferem no máximo em um centavo
+    assert max(split) - min(split) <= 1
+    # Determinístico: mesma entrada, mesma divisão
+    assert split == [divide_cents(total, i + 1, parts) - divide_cents(total, i, parts) for i in range(parts)]
+
+def test_divide_cents_rejects_non_positive_denominator():
+    with pytest.raises(ValueError):
+        divide_cents(100, 1, 0)
+
+@given(st.lists(st.integers(min_value=1, max_value=10**9), min_size=1, max_size=200))
+def test_frame_stats_are_whole_cents(cents):
+    frame = ExpenseFrame.from_columns(["2024-01-01"] * len(cents), [cents_to_float(c) for c in cents], [None] * len(cents))
+    stats = frame.stats_cents()
+
+    ordered = sorted(cents)
+    half = len(cents) // 2
+    median = ordered[half] if len(cents) % 2 else divide_cents(ordered[half - 1] + ordered[half], 1, 2)
+
+    assert all(isinstance(value, int) for value in stats.values())
+    assert stats["median"] == median
+    assert stats["average"] == divide_cents(sum(cents), 1, len(cents))
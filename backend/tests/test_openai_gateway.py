@@ -0,0 +1,96 @@
+"""
+Testes do circuit breaker do gateway OpenAI
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.openai_gateway import CircuitOpenError, OpenAIGateway
+
+MODEL = "modelo-teste"
+
+class BadRequest(Exception):
+    status_code = 400
+
+class ServerError(Exception):
+    status_code = 503
+
+def fake_client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+def raising(error: Exception):
+    async def create(**kwargs):
+        raise error
+    return fake_client(create)
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 0)
+    monkeypatch.setattr(settings, "OPENAI_SINGLE_FLIGHT", False)
+    gateway = OpenAIGateway()
+
+    # Circuito aberto há mais que o cooldown: a próxima chamada é o teste
+    breaker = gateway.breaker(MODEL)
+    breaker.state = "open"
+    breaker.failures = settings.OPENAI_BREAKER_THRESHOLD
+    breaker.opened_at = time.monotonic() - settings.OPENAI_BREAKER_COOLDOWN - 1
+    return gateway
+
+async def chat(gateway, client):
+    return await gateway.chat("teste", client=client, model=MODEL, messages=[])
+
+async def test_probe_success_closes_circuit(gateway):
+    async def create(**kwargs):
+        return SimpleNamespace(usage=None)
+
+    await chat(gateway, fake_client(create))
+    assert gateway.breaker(MODEL).state == "closed"
+
+async def test_probe_retryable_failure_reopens(gateway):
+    with pytest.raises(ServerError):
+        await chat(gateway, raising(ServerError()))
+
+    assert gateway.breaker(MODEL).state == "open"
+    with pytest.raises(CircuitOpenError):
+        await chat(gateway, raising(ServerError()))
+
+async def test_probe_non_retryable_api_error_closes_circuit(gateway):
+    # A API respondeu 400: o serviço está de pé
+    with pytest.raises(BadRequest):
+        await chat(gateway, raising(BadRequest()))
+
+    assert gateway.breaker(MODEL).state == "closed"
+
+async def test_probe_local_error_releases_probe(gateway):
+    with pytest.raises(ValueError):
+        await chat(gateway, raising(ValueError("parâmetro inválido")))
+
+    breaker = gateway.breaker(MODEL)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+async def test_cancelled_probe_releases_probe(gateway):
+    started = asyncio.Event()
+
+    async def create(**kwargs):
+        started.set()
+        await asyncio.sleep(3600)
+
+    task = asyncio.create_task(chat(gateway, fake_client(create)))
+    await started.wait()
+
+    # Enquanto o teste está em voo, as demais chamadas são rejeitadas
+    with pytest.raises(CircuitOpenError):
+        await chat(gateway, raising(ServerError()))
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    breaker = gateway.breaker(MODEL)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
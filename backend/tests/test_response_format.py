@@ -0,0 +1,84 @@
+"""
+Testes da negociação de formato das rotas de projeção
+"""
+
+import json
+
+import httpx
+import pytest
+
+from app.api import fire
+from app.utils import response_format
+from app.utils.response_format import COMPACT_JSON, JSON, MSGPACK, negotiate
+
+PAYLOAD = {
+    "current_age": 30,
+    "monthly_income": "10000",
+    "monthly_expenses": "5000",
+    "current_savings": "50000",
+    "years": 5,
+}
+
+@pytest.fixture
+def without_msgpack(monkeypatch):
+    monkeypatch.setattr(response_format, "msgpack", None)
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("", JSON),
+    ("*/*", JSON),
+    ("application/*", JSON),
+    (COMPACT_JSON, COMPACT_JSON),
+    (f"{JSON};q=0.5, {COMPACT_JSON}", COMPACT_JSON),
+    (f"{COMPACT_JSON};q=0, text/html, */*;q=0.1", JSON),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+def test_negotiate_without_msgpack(without_msgpack):
+    assert negotiate(MSGPACK) is None
+    assert negotiate("application/x-msgpack") is None
+    assert negotiate("text/html") is None
+    # Alternativa aceitável no mesmo Accept
+    assert negotiate(f"{MSGPACK}, {JSON};q=0.5") == JSON
+
+@pytest.fixture
+async def client(monkeypatch):
+    from app.agents.fire_calculator import FireCalculatorAgent
+    from app.main import create_app
+
+    agent = FireCalculatorAgent()
+    monkeypatch.setattr(fire, "get_fire_calculator", lambda: agent)
+
+    transport = httpx.ASGITransport(app=create_app(run_warm_up=False))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+
+async def test_projections_compact_matches_json(client):
+    default = await client.post("/fire/projections", json=PAYLOAD)
+    compact = await client.post("/fire/projections", json=PAYLOAD, headers={"Accept": COMPACT_JSON})
+
+    assert default.headers["content-type"].startswith(JSON)
+    assert compact.headers["content-type"].startswith(COMPACT_JSON)
+    assert compact.headers["vary"] == "Accept"
+
+    rows = default.json()["projections"]
+    columns = json.loads(compact.content)["projections"]
+    assert columns["year"] == [row["year"] for row in rows]
+    assert columns["accumulated_amount"] == pytest.approx([float(row["accumulated_amount"]) for row in rows])
+
+async def test_msgpack_unavailable_is_406(client, without_msgpack):
+    response = await client.post("/fire/projections", json=PAYLOAD, headers={"Accept": MSGPACK})
+    assert response.status_code == 406
+    assert MSGPACK not in response.json()["detail"]
+
+async def test_openapi_documents_negotiated_routes(client):
+    schema = (await client.get("/openapi.json")).json()
+
+    for path, model in (("/fire/projections", "FireProjectionResponse"),
+                        ("/fire/calculate", "FireCalculationResponse")):
+        responses = schema["paths"][path]["post"]["responses"]
+        content = responses["200"]["content"]
+        assert content[JSON]["schema"]["$ref"] == f"#/components/schemas/{model}"
+        assert {COMPACT_JSON, MSGPACK} <= content.keys()
+        assert "406" in responses